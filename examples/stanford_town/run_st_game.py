@@ -21,7 +21,13 @@ from metagpt.logs import logger
 
 
 async def startup(
-    idea: str, fork_sim_code: str, sim_code: str, temp_storage_path: str, investment: float = 30.0, n_round: int = 500
+    idea: str,
+    fork_sim_code: str,
+    sim_code: str,
+    temp_storage_path: str,
+    investment: float = 30.0,
+    n_round: int = 500,
+    headless: bool = False,
 ):
     town = StanfordTown()
     logger.info("StanfordTown init environment")
@@ -45,6 +51,7 @@ async def startup(
             curr_time=reverie_meta.get("curr_time"),
             sec_per_step=reverie_meta.get("sec_per_step"),
             has_inner_voice=has_inner_voice,
+            headless=headless,
         )
         roles.append(role)
 
@@ -67,6 +74,7 @@ def main(
     temp_storage_path: Optional[str] = None,
     investment: float = 30.0,
     n_round: int = 500,
+    headless: bool = False,
 ):
     """
     Args:
@@ -76,6 +84,7 @@ def main(
         temp_storage_path: generative_agents temp_storage path inside `environment/frontend_server` to interact.
         investment: the investment of running agents
         n_round: rounds to run agents
+        headless: run without the generative_agents frontend, as fast as the LLM allows
     """
 
     asyncio.run(
@@ -86,6 +95,7 @@ def main(
             temp_storage_path=temp_storage_path,
             investment=investment,
             n_round=n_round,
+            headless=headless,
         )
     )
 
@@ -8,21 +8,25 @@
 NOTE: You should use typing.List instead of list to do type annotation. Because in the markdown extraction process,
   we can use typing to extract the type of the node, but we cannot use built-in list to extract.
 """
+import asyncio
+import hashlib
 import json
 import typing
+import weakref
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
 
-from pydantic import BaseModel, Field, create_model, model_validator
+from pydantic import BaseModel, Field, TypeAdapter, create_model, model_validator
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 
 from metagpt.actions.action_outcls_registry import register_action_outcls
 from metagpt.const import USE_CONFIG_TIMEOUT
 from metagpt.llm import BaseLLM
-from metagpt.logs import logger
+from metagpt.logs import llm_stream_listener, logger
 from metagpt.provider.postprocess.llm_output_postprocess import llm_output_postprocess
 from metagpt.utils.common import OutputParser, general_after_log
 from metagpt.utils.human_interaction import HumanInteraction
+from metagpt.utils.stream_output_parser import StreamAborted, StreamOutputParser
 
 
 class ReviewMode(Enum):
@@ -38,6 +42,11 @@ class ReviseMode(Enum):
 
 TAG = "CONTENT"
 
+# The attributes defining the output class of a node, changing them clears the cached output classes.
+STRUCTURE_ATTRS = {"key", "expected_type", "instruction", "example", "children"}
+OUTPUT_CLASS_CACHE_SIZE = 32  # output classes cached per node, by class name, mode and excluded keys
+COMPLEX_FILL_CONCURRENCY = 4  # children filled at the same time by the complex strategy, 0 for unlimited
+
 LANGUAGE_CONSTRAINT = "Language: Please use the same language as Human INPUT."
 FORMAT_CONSTRAINT = f"Format: output wrapped inside [{TAG}][/{TAG}] like format example, nothing else."
 
@@ -113,6 +122,17 @@ Follow format example's {prompt_schema} format, generate output and make sure it
 """
 
 
+FILL_MISSING_TEMPLATE = """{prompt}
+
+## generated nodes
+The nodes below are done, do not output them again:
+{generated}
+
+## missing nodes
+Output only the nodes {missing}, following the format example, wrapped inside [{tag}][/{tag}].
+"""
+
+
 def dict_to_markdown(d, prefix="- ", kv_sep="\n", postfix="\n"):
     markdown_str = ""
     for key, value in d.items():
@@ -157,16 +177,44 @@ class ActionNode:
         children: dict[str, "ActionNode"] = None,
         schema: str = "",
     ):
+        self._parents = weakref.WeakSet()
+        self._structure_hash = None
+        self._outcls_cache: Dict[tuple, Tuple[Dict, Type[BaseModel]]] = {}
+        self._schema_cache: Dict[Type[BaseModel], Dict] = {}
+        self._adapter_cache: Dict[Type[BaseModel], Dict[str, TypeAdapter]] = {}
         self.key = key
         self.expected_type = expected_type
         self.instruction = instruction
         self.example = example
         self.content = content
         self.children = children if children is not None else {}
+        for child in self.children.values():
+            child._parents.add(self)
         self.schema = schema
         self.prevs = []
         self.nexts = []
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in STRUCTURE_ATTRS:
+            self.clear_output_class_cache()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_parents", None)  # weak references can be neither pickled nor deep-copied
+        for name in ("_structure_hash", "_outcls_cache", "_schema_cache", "_adapter_cache"):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        # Set through __dict__ to skip the cache invalidation of __setattr__; the parents are rebuilt from the children
+        # since a child may be restored after its parent.
+        self.__dict__.update(state)
+        self.__dict__.setdefault("_parents", weakref.WeakSet())
+        self.__dict__.update(_structure_hash=None, _outcls_cache={}, _schema_cache={}, _adapter_cache={})
+        for child in self.__dict__.get("children", {}).values():
+            child.__dict__.setdefault("_parents", weakref.WeakSet()).add(self)
+
     def __str__(self):
         return (
             f"{self.key}, {repr(self.expected_type)}, {self.instruction}, {self.example}"
@@ -187,6 +235,8 @@ class ActionNode:
     def add_child(self, node: "ActionNode"):
         """增加子ActionNode"""
         self.children[node.key] = node
+        node._parents.add(self)
+        self.clear_output_class_cache()
 
     def get_child(self, key: str) -> Union["ActionNode", None]:
         return self.children.get(key, None)
@@ -203,6 +253,24 @@ class ActionNode:
         obj.add_children(nodes)
         return obj
 
+    @property
+    def structure_hash(self) -> str:
+        """Hash of the keys, types, instructions and examples of the node and its children, computed once per change."""
+        if self._structure_hash is None:
+            children = ",".join(f"{k}={v.structure_hash}" for k, v in self.children.items())
+            text = f"{self.key}|{self.expected_type!r}|{self.instruction}|{self.example!r}|{children}"
+            self._structure_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return self._structure_hash
+
+    def clear_output_class_cache(self):
+        """Forget the cached output classes of the node and its ancestors, done when the structure changes."""
+        self._structure_hash = None
+        self._outcls_cache.clear()
+        self._schema_cache.clear()
+        self._adapter_cache.clear()
+        for parent in list(self._parents):
+            parent.clear_output_class_cache()
+
     def _get_children_mapping(self, exclude=None) -> Dict[str, Any]:
         """获得子ActionNode的字典，以key索引，支持多级结构。"""
         exclude = exclude or []
@@ -271,14 +339,28 @@ class ActionNode:
 
     def create_class(self, mode: str = "auto", class_name: str = None, exclude=None):
         class_name = class_name if class_name else f"{self.key}_AN"
-        mapping = self.get_mapping(mode=mode, exclude=exclude)
-        return self.create_model_class(class_name, mapping)
+        return self._get_output_class(class_name, mode=mode, exclude=exclude)[1]
 
     def _create_children_class(self, exclude=None):
         """使用object内有的字段直接生成model_class"""
-        class_name = f"{self.key}_AN"
-        mapping = self._get_children_mapping(exclude=exclude)
-        return self.create_model_class(class_name, mapping)
+        return self._get_output_class(f"{self.key}_AN", mode="children", exclude=exclude)[1]
+
+    def _get_output_class(self, class_name: str, mode: str = "auto", exclude=None) -> Tuple[Dict, Type[BaseModel]]:
+        """Return the mapping and the output class under mode, cached on the node by its structure."""
+        key = (self.structure_hash, class_name, mode, tuple(sorted(exclude or [])))
+        entry = self._outcls_cache.get(key)
+        if entry is None:
+            mapping = self.get_mapping(mode=mode, exclude=exclude)
+            entry = (mapping, self.create_model_class(class_name, mapping))
+            if len(self._outcls_cache) >= OUTPUT_CLASS_CACHE_SIZE:
+                self._outcls_cache.pop(next(iter(self._outcls_cache)))
+            self._outcls_cache[key] = entry
+        return entry
+
+    def _get_output_schema(self, output_class: Type[BaseModel]) -> Dict:
+        if output_class not in self._schema_cache:
+            self._schema_cache[output_class] = output_class.model_json_schema()
+        return self._schema_cache[output_class]
 
     def to_dict(self, format_func=None, mode="auto", exclude=None) -> Dict:
         """将当前节点与子节点都按照node: format的格式组织成字典"""
@@ -408,11 +490,6 @@ class ActionNode:
         )
         return prompt
 
-    @retry(
-        wait=wait_random_exponential(min=1, max=20),
-        stop=stop_after_attempt(6),
-        after=general_after_log(logger),
-    )
     async def _aask_v1(
         self,
         prompt: str,
@@ -422,23 +499,85 @@ class ActionNode:
         system_msgs: Optional[list[str]] = None,
         schema="markdown",  # compatible to original format
         timeout=USE_CONFIG_TIMEOUT,
+        on_field: Optional[Callable[[str, Any], None]] = None,
+        output_class: Optional[Type[BaseModel]] = None,
     ) -> (str, BaseModel):
-        """Use ActionOutput to wrap the output of aask"""
-        content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
-        logger.debug(f"llm raw output:\n{content}")
-        output_class = self.create_model_class(output_class_name, output_data_mapping)
-
-        if schema == "json":
-            parsed_data = llm_output_postprocess(
-                output=content, schema=output_class.model_json_schema(), req_key=f"[/{TAG}]"
-            )
-        else:  # using markdown parser
-            parsed_data = OutputParser.parse_data_with_mapping(content, output_data_mapping)
+        """Use ActionOutput to wrap the output of aask.
 
-        logger.debug(f"parsed_data:\n{parsed_data}")
-        instruct_content = output_class(**parsed_data)
+        The output is parsed while the LLM streams it, `on_field` is called with each field as soon as it is complete.
+        On an invalid field the stream is stopped, and only the missing or invalid fields are asked for again.
+        """
+        output_class = output_class or self.create_model_class(output_class_name, output_data_mapping)
+        required_keys = [
+            k for k, v in output_data_mapping.items() if isinstance(v, dict) or not self.is_optional_type(v[0])
+        ]
+        parser = StreamOutputParser(
+            output_class,
+            output_data_mapping,
+            required_keys=required_keys,
+            schema=schema,
+            tag=TAG,
+            on_field=on_field,
+            adapters=self._adapter_cache.setdefault(output_class, {}),
+        )
+        await self._aask_fields(prompt, parser, images=images, system_msgs=system_msgs, timeout=timeout)
+        instruct_content = output_class(**parser.fields)
+        if len(parser.contents) == 1:
+            content = parser.contents[0]
+        else:  # merged from several attempts
+            nodes = instruct_content.model_dump(mode="json")
+            text = self.compile_to(nodes, "json", kv_sep="\n") if schema == "json" else dict_to_markdown(nodes, "## ")
+            content = self.tagging(text, schema, TAG)
         return content, instruct_content
 
+    @retry(
+        wait=wait_random_exponential(min=1, max=20),
+        stop=stop_after_attempt(6),
+        after=general_after_log(logger),
+    )
+    async def _aask_fields(
+        self,
+        prompt: str,
+        parser: StreamOutputParser,
+        images: Optional[Union[str, list[str]]] = None,
+        system_msgs: Optional[list[str]] = None,
+        timeout=USE_CONFIG_TIMEOUT,
+    ):
+        """Ask for the fields `parser` misses, raise to retry if any is still missing."""
+        if parser.fields:
+            prompt = FILL_MISSING_TEMPLATE.format(
+                prompt=prompt,
+                generated=json.dumps(parser.dump_fields(), indent=4, ensure_ascii=False),
+                missing=", ".join(parser.missing),
+                tag=TAG,
+            )
+        parser.reset()
+        try:
+            with llm_stream_listener(parser.feed):
+                content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
+        except StreamAborted as e:
+            logger.warning(f"Stop the LLM stream early: {e}")
+            content = parser.text
+        logger.debug(f"llm raw output:\n{content}")
+        parser.close(content)
+
+        if parser.missing and not parser.aborted:
+            # fall back to the lenient parsers of the whole content, which repair common format errors
+            try:
+                if parser.schema == "json":
+                    parsed_data = llm_output_postprocess(
+                        output=content, schema=self._get_output_schema(parser.output_class), req_key=f"[/{TAG}]"
+                    )
+                else:  # using markdown parser
+                    parsed_data = OutputParser.parse_data_with_mapping(content, parser.mapping)
+                logger.debug(f"parsed_data:\n{parsed_data}")
+                parser.add_fields(parsed_data)
+            except Exception as e:
+                logger.warning(f"Parse llm output failed: {e}")
+
+        if parser.missing:
+            raise ValueError(f"Missing fields: {parser.missing}, invalid fields: {parser.invalid}")
+
     def get(self, key):
         return self.instruct_content.model_dump()[key]
 
@@ -454,14 +593,36 @@ class ActionNode:
         self.set_recursive("context", context)
 
     async def simple_fill(
-        self, schema, mode, images: Optional[Union[str, list[str]]] = None, timeout=USE_CONFIG_TIMEOUT, exclude=None
+        self,
+        schema,
+        mode,
+        images: Optional[Union[str, list[str]]] = None,
+        timeout=USE_CONFIG_TIMEOUT,
+        exclude=None,
+        on_field: Optional[Callable[[str, Any], None]] = None,
     ):
         prompt = self.compile(context=self.context, schema=schema, mode=mode, exclude=exclude)
         if schema != "raw":
-            mapping = self.get_mapping(mode, exclude=exclude)
             class_name = f"{self.key}_AN"
+            mapping, output_class = self._get_output_class(class_name, mode=mode, exclude=exclude)
+            fields = {}
+
+            def _on_field(key, value):
+                # fill `instruct_content` as the fields arrive, it is validated once all of them are done
+                fields[key] = value
+                self.instruct_content = output_class.model_construct(**fields)
+                if on_field:
+                    on_field(key, value)
+
             content, scontent = await self._aask_v1(
-                prompt, class_name, mapping, images=images, schema=schema, timeout=timeout
+                prompt,
+                class_name,
+                mapping,
+                images=images,
+                schema=schema,
+                timeout=timeout,
+                on_field=_on_field,
+                output_class=output_class,
             )
             self.content = content
             self.instruct_content = scontent
@@ -481,6 +642,8 @@ class ActionNode:
         images: Optional[Union[str, list[str]]] = None,
         timeout=USE_CONFIG_TIMEOUT,
         exclude=[],
+        on_field: Optional[Callable[[str, Any], None]] = None,
+        max_concurrency: int = COMPLEX_FILL_CONCURRENCY,
     ):
         """Fill the node(s) with mode.
 
@@ -496,10 +659,13 @@ class ActionNode:
          - root: fill root's node and gather output
         :param strgy: simple/complex
          - simple: run only once
-         - complex: run each node
+         - complex: run each node, concurrently unless ordered by `add_prev`/`add_next` or an ActionGraph
         :param images: the list of image url or base64 for gpt4-v
         :param timeout: Timeout for llm invocation.
         :param exclude: The keys of ActionNode to exclude.
+        :param on_field: Called with the key and value of each field as soon as it is parsed from the LLM stream,
+            before the whole output arrives. Schedule a task in it for async work.
+        :param max_concurrency: The max children filled at the same time by the complex strategy, 0 for unlimited.
         :return: self
         """
         self.set_llm(llm)
@@ -508,19 +674,77 @@ class ActionNode:
             schema = self.schema
 
         if strgy == "simple":
-            return await self.simple_fill(schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude)
+            return await self.simple_fill(
+                schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude, on_field=on_field
+            )
         elif strgy == "complex":
             # 这里隐式假设了拥有children
+            children = [i for i in self.children.values() if not (exclude and i.key in exclude)]
+            await self._fill_children(
+                children,
+                max_concurrency,
+                schema=schema,
+                mode=mode,
+                images=images,
+                timeout=timeout,
+                exclude=exclude,
+                on_field=on_field,
+            )
             tmp = {}
-            for _, i in self.children.items():
-                if exclude and i.key in exclude:
-                    continue
-                child = await i.simple_fill(schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude)
+            for child in children:  # merged in the order of the children, whichever finished first
                 tmp.update(child.instruct_content.model_dump())
-            cls = self._create_children_class()
+            cls = self._create_children_class(exclude=exclude)
             self.instruct_content = cls(**tmp)
             return self
 
+    @staticmethod
+    def _get_fill_order(children: List["ActionNode"]) -> Dict[int, List["ActionNode"]]:
+        """Return the children each child must be filled after, by the id of the child. Raise on cyclic ordering."""
+        ids = {id(i) for i in children}
+        prevs = {id(i): [j for j in i.prevs if id(j) in ids] for i in children}
+        for i in children:
+            for j in i.nexts:
+                if id(j) in ids and i not in prevs[id(j)]:
+                    prevs[id(j)].append(i)
+
+        visiting, visited = set(), set()
+
+        def visit(node: "ActionNode"):
+            if id(node) in visited:
+                return
+            if id(node) in visiting:
+                raise ValueError(f"Cyclic ordering of the children: {node.key}")
+            visiting.add(id(node))
+            for prev in prevs[id(node)]:
+                visit(prev)
+            visiting.discard(id(node))
+            visited.add(id(node))
+
+        for i in children:
+            visit(i)
+        return prevs
+
+    async def _fill_children(self, children: List["ActionNode"], max_concurrency: int = 0, **kwargs):
+        """Fill `children` concurrently by `simple_fill`, each after the children ordered before it."""
+        prevs = self._get_fill_order(children)
+        semaphore = asyncio.Semaphore(max_concurrency if max_concurrency > 0 else max(len(children), 1))
+        tasks: Dict[int, asyncio.Task] = {}
+
+        async def _fill(child: "ActionNode"):
+            if prevs[id(child)]:
+                await asyncio.gather(*[tasks[id(i)] for i in prevs[id(child)]])
+            async with semaphore:
+                await child.simple_fill(**kwargs)
+
+        for child in children:
+            tasks[id(child)] = asyncio.create_task(_fill(child))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
     async def human_review(self) -> dict[str, str]:
         review_comments = HumanInteraction().interact_with_instruct_content(
             instruct_content=self.instruct_content, interact_type="review"
@@ -569,7 +793,7 @@ class ActionNode:
         output_class_name = f"{self.key}_AN_REVIEW"
         output_class = self.create_class(class_name=output_class_name, exclude=exclude_keys)
         parsed_data = llm_output_postprocess(
-            output=content, schema=output_class.model_json_schema(), req_key=f"[/{TAG}]"
+            output=content, schema=self._get_output_schema(output_class), req_key=f"[/{TAG}]"
         )
         instruct_content = output_class(**parsed_data)
         return instruct_content.model_dump()
@@ -653,10 +877,14 @@ class ActionNode:
         )
 
         # step2, use `_aask_v1` to get revise structure result
-        output_mapping = self.get_mapping(mode="auto", exclude=exclude_keys)
         output_class_name = f"{self.key}_AN_REVISE"
+        output_mapping, output_class = self._get_output_class(output_class_name, mode="auto", exclude=exclude_keys)
         content, scontent = await self._aask_v1(
-            prompt=prompt, output_class_name=output_class_name, output_data_mapping=output_mapping, schema="json"
+            prompt=prompt,
+            output_class_name=output_class_name,
+            output_data_mapping=output_mapping,
+            schema="json",
+            output_class=output_class,
         )
 
         # re-fill the ActionNode
@@ -3,9 +3,12 @@
 # @Desc   : registry to store Dynamic Model from ActionNode.create_model_class to keep it as same Class
 #           with same class name and mapping
 
+from collections import OrderedDict
 from functools import wraps
 
-action_outcls_registry = dict()
+ACTION_OUTCLS_REGISTRY_SIZE = 1024  # the least recently used classes are dropped beyond it
+
+action_outcls_registry = OrderedDict()
 
 
 def register_action_outcls(func):
@@ -33,10 +36,13 @@ def register_action_outcls(func):
         outcls_id = outcls_id.replace("typing.List", "list").replace("typing.Dict", "dict")
 
         if outcls_id in action_outcls_registry:
+            action_outcls_registry.move_to_end(outcls_id)
             return action_outcls_registry[outcls_id]
 
         out_cls = func(*args, **kwargs)
         action_outcls_registry[outcls_id] = out_cls
+        if len(action_outcls_registry) > ACTION_OUTCLS_REGISTRY_SIZE:
+            action_outcls_registry.popitem(last=False)
         return out_cls
 
     return decorater
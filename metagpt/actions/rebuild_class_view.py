@@ -23,7 +23,7 @@ from metagpt.const import (
     GRAPH_REPO_FILE_REPO,
 )
 from metagpt.logs import logger
-from metagpt.repo_parser import DotClassInfo, RepoParser
+from metagpt.repo_parser import DotClassInfo, RepoParser, get_symbol_cache_dir
 from metagpt.schema import UMLClassView
 from metagpt.utils.common import concat_namespace, split_namespace
 from metagpt.utils.di_graph_repository import DiGraphRepository
@@ -50,7 +50,7 @@ class RebuildClassView(Action):
         """
         graph_repo_pathname = self.context.git_repo.workdir / GRAPH_REPO_FILE_REPO / self.context.git_repo.workdir.name
         self.graph_db = await DiGraphRepository.load_from(str(graph_repo_pathname.with_suffix(".json")))
-        repo_parser = RepoParser(base_directory=Path(self.i_context))
+        repo_parser = RepoParser(base_directory=Path(self.i_context), cache_dir=get_symbol_cache_dir(self.config))
         # use pylint
         class_views, relationship_views, package_root = await repo_parser.rebuild_class_views(path=Path(self.i_context))
         await GraphRepository.update_graph_db_with_class_views(self.graph_db, class_views)
@@ -21,11 +21,21 @@ from pydantic import Field
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 
 from metagpt.actions.action import Action
-from metagpt.actions.project_management_an import REFINED_TASK_LIST, TASK_LIST
+from metagpt.actions.project_management_an import (
+    LOGIC_ANALYSIS,
+    REFINED_LOGIC_ANALYSIS,
+    REFINED_TASK_LIST,
+    TASK_LIST,
+)
 from metagpt.actions.write_code_plan_and_change_an import REFINED_TEMPLATE
 from metagpt.const import BUGFIX_FILENAME, REQUIREMENT_FILENAME
 from metagpt.logs import logger
 from metagpt.schema import CodingContext, Document, RunCodeResult
+from metagpt.utils.code_context import (
+    CodeContextPacker,
+    CodeFile,
+    get_code_token_budget,
+)
 from metagpt.utils.common import CodeParser
 from metagpt.utils.project_repo import ProjectRepo
 
@@ -107,13 +117,20 @@ class WriteCode(Action):
             code_context = coding_context.code_doc.content
         elif self.config.inc:
             code_context = await self.get_codes(
-                coding_context.task_doc, exclude=self.i_context.filename, project_repo=self.repo, use_inc=True
+                coding_context.task_doc,
+                exclude=self.i_context.filename,
+                project_repo=self.repo,
+                use_inc=True,
+                token_budget=get_code_token_budget(self.config),
+                model=self.config.llm.model,
             )
         else:
             code_context = await self.get_codes(
                 coding_context.task_doc,
                 exclude=self.i_context.filename,
                 project_repo=self.repo.with_src_path(self.context.src_workspace),
+                token_budget=get_code_token_budget(self.config),
+                model=self.config.llm.model,
             )
 
         if self.config.inc:
@@ -148,7 +165,14 @@ class WriteCode(Action):
         return coding_context
 
     @staticmethod
-    async def get_codes(task_doc: Document, exclude: str, project_repo: ProjectRepo, use_inc: bool = False) -> str:
+    async def get_codes(
+        task_doc: Document,
+        exclude: str,
+        project_repo: ProjectRepo,
+        use_inc: bool = False,
+        token_budget: int = 0,
+        model: str = "gpt-4o",
+    ) -> str:
         """
         Get codes for generating the exclude file in various scenarios.
 
@@ -157,6 +181,9 @@ class WriteCode(Action):
             exclude (str): The file to be generated. Specifies the filename to be excluded from the code snippets.
             project_repo (ProjectRepo): ProjectRepo object of the project.
             use_inc (bool): Indicates whether the scenario involves incremental development. Defaults to False.
+            token_budget (int): The max tokens of the codes, beyond which the codes less relevant to the exclude file
+                are reduced to signatures or elided. Defaults to 0 for unlimited.
+            model (str): The LLM model to count tokens for.
 
         Returns:
             str: Codes for generating the exclude file.
@@ -190,14 +217,17 @@ class WriteCode(Action):
                     # If the file is in the src workspace, skip it
                     else:
                         continue
-                    codes.insert(0, f"-----Now, {filename} to be rewritten\n```{doc.content}```\n=====")
+                    text = f"-----Now, {filename} to be rewritten\n```{doc.content}```\n====="
+                    codes.insert(0, CodeFile(filename=filename, content=doc.content, text=text, pinned=True))
                 # The code snippets are generated from the src workspace
                 else:
                     doc = await src_file_repo.get(filename=filename)
                     # If the file does not exist in the src workspace, skip it
                     if not doc:
                         continue
-                    codes.append(f"----- {filename}\n```{doc.content}```")
+                    codes.append(
+                        CodeFile(filename=filename, content=doc.content, text=f"----- {filename}\n```{doc.content}```")
+                    )
 
         # Normal scenario
         else:
@@ -208,6 +238,18 @@ class WriteCode(Action):
                 doc = await src_file_repo.get(filename=filename)
                 if not doc:
                     continue
-                codes.append(f"----- {filename}\n```{doc.content}```")
-
-        return "\n".join(codes)
+                codes.append(
+                    CodeFile(filename=filename, content=doc.content, text=f"----- {filename}\n```{doc.content}```")
+                )
+
+        packer = CodeContextPacker(target=exclude, token_budget=token_budget, model=model)
+        packed = packer.fit(codes)
+        if packed:
+            return packed.text
+        # Over budget, gather what ranks the files by relevance to the file being written.
+        logic_analysis = m.get(LOGIC_ANALYSIS.key) or m.get(REFINED_LOGIC_ANALYSIS.key) or []
+        packer.target_description = " ".join(" ".join(i[1:]) for i in logic_analysis if i and i[0] == exclude)
+        target_doc = await src_file_repo.get(filename=exclude)
+        packer.target_code = target_doc.content if target_doc else ""
+        packer.recent = set(src_file_repo.changed_files.keys())
+        return packer.pack(codes).text
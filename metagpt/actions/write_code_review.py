@@ -16,6 +16,7 @@ from metagpt.actions.action import Action
 from metagpt.const import REQUIREMENT_FILENAME
 from metagpt.logs import logger
 from metagpt.schema import CodingContext
+from metagpt.utils.code_context import get_code_token_budget
 from metagpt.utils.common import CodeParser
 
 PROMPT_TEMPLATE = """
@@ -156,6 +157,8 @@ class WriteCodeReview(Action):
                 exclude=self.i_context.filename,
                 project_repo=self.repo.with_src_path(self.context.src_workspace),
                 use_inc=self.config.inc,
+                token_budget=get_code_token_budget(self.config),
+                model=self.config.llm.model,
             )
 
             ctx_list = [
@@ -14,6 +14,7 @@ from pydantic import BaseModel, model_validator
 from metagpt.configs.browser_config import BrowserConfig
 from metagpt.configs.embedding_config import EmbeddingConfig
 from metagpt.configs.file_parser_config import OmniParseConfig
+from metagpt.configs.http_config import HTTPConfig
 from metagpt.configs.llm_config import LLMConfig, LLMType
 from metagpt.configs.mermaid_config import MermaidConfig
 from metagpt.configs.redis_config import RedisConfig
@@ -62,6 +63,7 @@ class Config(CLIParams, YamlModel):
     search: SearchConfig = SearchConfig()
     browser: BrowserConfig = BrowserConfig()
     mermaid: MermaidConfig = MermaidConfig()
+    http: HTTPConfig = HTTPConfig()
 
     # Storage Parameters
     s3: Optional[S3Config] = None
@@ -73,6 +75,8 @@ class Config(CLIParams, YamlModel):
     workspace: WorkspaceConfig = WorkspaceConfig()
     enable_longterm_memory: bool = False
     code_review_k_times: int = 2
+    code_context_token_budget: int = 0  # max tokens of other code in WriteCode prompts, 0: half the context window
+    symbol_cache: bool = True  # cache the parsed symbols and class views of projects under ~/.metagpt/symbol_cache
     agentops_api_key: str = ""
 
     # Will be removed in the future
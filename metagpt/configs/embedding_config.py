@@ -35,6 +35,11 @@ class EmbeddingConfig(YamlModel):
     base_url: "YOU_BASE_URL"
     model: "YOU_MODEL"
     dimensions: "YOUR_MODEL_DIMENSIONS"
+
+    Optional, cache embeddings on disk and embed in concurrent batches:
+    cache: true
+    cache_path: "~/.metagpt/embedding_cache.sqlite3"
+    max_concurrency: 4
     """
 
     api_type: Optional[EmbeddingType] = None
@@ -46,6 +51,10 @@ class EmbeddingConfig(YamlModel):
     embed_batch_size: Optional[int] = None
     dimensions: Optional[int] = None  # output dimension of embedding model
 
+    cache: bool = False  # cache embeddings by content hash, shared by all RAG engines and memory storages
+    cache_path: Optional[str] = None  # default ~/.metagpt/embedding_cache.sqlite3
+    max_concurrency: int = 4  # concurrent batch requests to the embedding api
+
     @field_validator("api_type", mode="before")
     @classmethod
     def check_api_type(cls, v):
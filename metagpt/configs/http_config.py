@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : http_config.py
+@Desc    : Config of the HTTP sessions shared by tools, search engines and `ahttp_client`.
+"""
+from metagpt.utils.yaml_model import YamlModel
+
+
+class HTTPConfig(YamlModel):
+    """Config for the shared HTTP connection pools"""
+
+    limit: int = 100  # total connections of a pool, 0 for unlimited
+    limit_per_host: int = 10  # connections to the same host, 0 for unlimited
+    keepalive_timeout: float = 30  # seconds an idle connection is kept alive
+    connect_timeout: float = 10
+    timeout: float = 300  # total seconds of a request
+    max_retries: int = 2  # retries of connection errors, timeouts, 429 and 5xx responses
+    retry_min_wait: float = 1
+    retry_max_wait: float = 10
@@ -6,10 +6,12 @@
 @File    : llm_config.py
 """
 from enum import Enum
+from pathlib import Path
 from typing import Optional
 
 from pydantic import field_validator
 
+from metagpt.configs.redis_config import RedisConfig
 from metagpt.const import CONFIG_ROOT, LLM_API_TIMEOUT, METAGPT_ROOT
 from metagpt.utils.yaml_model import YamlModel
 
@@ -39,6 +41,32 @@ class LLMType(Enum):
         return self.OPENAI
 
 
+class LLMCacheType(Enum):
+    MEMORY = "memory"  # in-process LRU
+    SQLITE = "sqlite"  # on-disk, shared between processes
+    REDIS = "redis"
+
+
+class LLMCacheConfig(YamlModel):
+    """Config for the LLM response cache, disabled by default.
+
+    Examples:
+    ---------
+    enabled: true
+    backend: "sqlite"
+    path: "~/.metagpt/llm_cache.sqlite3"
+    ttl: 86400
+    max_entries: 10000
+    """
+
+    enabled: bool = False
+    backend: LLMCacheType = LLMCacheType.MEMORY
+    path: Optional[Path] = None  # sqlite file, defaults to `CONFIG_ROOT / "llm_cache.sqlite3"`
+    ttl: int = 0  # seconds, 0 means never expire
+    max_entries: int = 1024  # 0 means unlimited, ignored by redis which relies on its own eviction policy
+    redis: Optional[RedisConfig] = None
+
+
 class LLMConfig(YamlModel):
     """Config for LLM
 
@@ -90,6 +118,18 @@ class LLMConfig(YamlModel):
     # Cost Control
     calc_usage: bool = True
 
+    # Response Cache
+    cache: Optional[LLMCacheConfig] = None
+
+    # Rate Limit, shared by all LLM instances of the same endpoint. 0 means unlimited.
+    rpm: int = 0  # requests per minute
+    tpm: int = 0  # prompt tokens per minute
+    max_concurrency: int = 0  # concurrent requests
+
+    # Connection Pool, shared by all LLM instances of the same config. 0 means the SDK default.
+    max_connections: int = 0
+    keepalive_expiry: float = 0  # seconds an idle connection is kept alive
+
     @field_validator("api_key")
     @classmethod
     def check_llm_key(cls, v):
@@ -13,3 +13,6 @@ class S3Config(YamlModelWithoutDefault):
     secret_key: str
     endpoint: str
     bucket: str
+    multipart_threshold: int = 8 * 1024 * 1024
+    part_size: int = 8 * 1024 * 1024
+    max_concurrency: int = 4
@@ -18,7 +18,7 @@ from pydantic import BaseModel, ConfigDict, Field
 from tqdm import tqdm
 
 from metagpt.logs import logger
-from metagpt.repo_parser import RepoParser
+from metagpt.repo_parser import RepoParser, get_symbol_cache_dir
 
 
 def validate_cols(content_col: str, df: pd.DataFrame):
@@ -231,5 +231,5 @@ class Repo(BaseModel):
     def eda(self) -> RepoMetadata:
         n_docs = sum(len(i) for i in [self.docs, self.codes, self.assets])
         n_chars = sum(sum(len(j.content) for j in i.values()) for i in [self.docs, self.codes, self.assets])
-        symbols = RepoParser(base_directory=self.path).generate_symbols()
+        symbols = RepoParser(base_directory=self.path, cache_dir=get_symbol_cache_dir()).generate_symbols()
         return RepoMetadata(name=self.name, n_docs=n_docs, n_chars=n_chars, symbols=symbols)
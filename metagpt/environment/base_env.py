@@ -3,14 +3,26 @@
 # @Desc   : base env of executing environment
 
 import asyncio
+import time
 from abc import abstractmethod
+from collections import deque
 from enum import Enum
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Set, Union
 
 from gymnasium import spaces
 from gymnasium.core import ActType, ObsType
-from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    SerializeAsAny,
+    computed_field,
+    model_validator,
+)
 
+from metagpt.const import MESSAGE_ROUTE_TO_ALL
 from metagpt.context import Context
 from metagpt.environment.api.env_api import (
     EnvAPIAbstract,
@@ -20,7 +32,7 @@ from metagpt.environment.api.env_api import (
 from metagpt.environment.base_env_space import BaseEnvAction, BaseEnvObsParams
 from metagpt.logs import logger
 from metagpt.schema import Message
-from metagpt.utils.common import get_function_schema, is_coroutine_func, is_send_to
+from metagpt.utils.common import get_function_schema, is_coroutine_func
 
 if TYPE_CHECKING:
     from metagpt.roles.role import Role  # noqa: F401
@@ -121,9 +133,26 @@ class ExtEnv(BaseModel):
         """Implement this to feed a action and then get new observation from the env"""
 
 
+class EnvRoundStats(BaseModel):
+    """Statistics of one `Environment.run` round"""
+
+    round: int = 0
+    roles_woken: int = 0  # roles whose `run` was launched
+    idle_skips: int = 0  # roles skipped because they had no pending messages
+    idle_runs: int = 0  # woken roles that found nothing to react to
+    wall_time: float = 0.0  # seconds
+
+
 class Environment(ExtEnv):
     """环境，承载一批角色，角色可以向环境发布消息，可以被其他角色观察到
     Environment, hosting a batch of roles, roles can publish messages to the environment, and can be observed by other roles
+
+    When `event_driven` is True, `run` only wakes the roles that have pending messages instead of every role, with at
+    most `max_concurrency` roles running at once (0 means unlimited).
+
+    Messages are routed through an address -> roles index maintained by `set_addresses`. The debug `history` keeps
+    only the latest `max_history` messages (0 means unlimited); set `history_file` to also append every message to a
+    file.
     """
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -131,8 +160,16 @@ class Environment(ExtEnv):
     desc: str = Field(default="")  # 环境描述
     roles: dict[str, SerializeAsAny["Role"]] = Field(default_factory=dict, validate_default=True)
     member_addrs: Dict["Role", Set] = Field(default_factory=dict, exclude=True)
-    history: str = ""  # For debug
     context: Context = Field(default_factory=Context, exclude=True)
+    event_driven: bool = False
+    max_concurrency: int = 0
+    max_history: int = 1000
+    history_file: Optional[Path] = Field(default=None, exclude=True)
+
+    _routes: dict[str, dict["Role", None]] = PrivateAttr(default_factory=dict)  # address -> ordered set of roles
+    _history: deque = PrivateAttr(default_factory=deque)
+    _ready_roles: dict["Role", None] = PrivateAttr(default_factory=dict)  # ordered set of roles with pending messages
+    _round_stats: list[EnvRoundStats] = PrivateAttr(default_factory=list)
 
     def reset(
         self,
@@ -148,11 +185,28 @@ class Environment(ExtEnv):
     def step(self, action: BaseEnvAction) -> tuple[dict[str, Any], float, bool, bool, dict[str, Any]]:
         pass
 
+    @model_validator(mode="wrap")
+    @classmethod
+    def load_history(cls, data: Any, handler):
+        if not isinstance(data, dict):
+            return handler(data)
+        data = dict(data)
+        history = data.pop("history", "")
+        env = handler(data)
+        env._history = deque([history] if history else [], maxlen=env.max_history or None)
+        return env
+
     @model_validator(mode="after")
     def init_roles(self):
         self.add_roles(self.roles.values())
         return self
 
+    @computed_field
+    @property
+    def history(self) -> str:
+        """The latest published messages, for debug."""
+        return "".join(self._history)
+
     def add_role(self, role: "Role"):
         """增加一个在当前环境的角色
         Add a role in the current environment
@@ -160,6 +214,7 @@ class Environment(ExtEnv):
         self.roles[role.profile] = role
         role.set_env(self)
         role.context = self.context
+        self._check_pending(role)
 
     def add_roles(self, roles: Iterable["Role"]):
         """增加一批在当前环境的角色
@@ -171,6 +226,7 @@ class Environment(ExtEnv):
         for role in roles:  # setup system message with roles
             role.context = self.context
             role.set_env(self)
+            self._check_pending(role)
 
     def publish_message(self, message: Message, peekable: bool = True) -> bool:
         """
@@ -182,15 +238,16 @@ class Environment(ExtEnv):
         in RFC 113.
         """
         logger.debug(f"publish_message: {message.dump()}")
-        found = False
         # According to the routing feature plan in Chapter 2.2.3.2 of RFC 113
-        for role, addrs in self.member_addrs.items():
-            if is_send_to(message, addrs):
-                role.put_message(message)
-                found = True
-        if not found:
+        if MESSAGE_ROUTE_TO_ALL in message.send_to:
+            recipients = list(self.member_addrs.keys())
+        else:
+            recipients = list({role: None for addr in message.send_to for role in self._routes.get(addr, {})})
+        for role in recipients:
+            role.put_message(message)
+        if not recipients:
             logger.warning(f"Message no recipients: {message.dump()}")
-        self.history += f"\n{message}"  # For debug
+        self._record_history(message)
 
         return True
 
@@ -199,6 +256,9 @@ class Environment(ExtEnv):
         Process all Role runs at once
         """
         for _ in range(k):
+            if self.event_driven:
+                await self._run_ready_roles()
+                continue
             futures = []
             for role in self.roles.values():
                 future = role.run()
@@ -207,6 +267,42 @@ class Environment(ExtEnv):
             await asyncio.gather(*futures)
             logger.debug(f"is idle: {self.is_idle}")
 
+    def mark_ready(self, role: "Role"):
+        """Mark a role as having pending messages, so that the event-driven scheduler wakes it in the next round."""
+        self._ready_roles[role] = None
+
+    @property
+    def round_stats(self) -> list[EnvRoundStats]:
+        """Statistics of the rounds run by the event-driven scheduler."""
+        return self._round_stats
+
+    async def _run_ready_roles(self):
+        start = time.perf_counter()
+        ready = [role for role in self._ready_roles if role.rc.env is self]
+        self._ready_roles = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency > 0 else None
+
+        async def _run(role: "Role"):
+            if not semaphore:
+                return await role.run()
+            async with semaphore:
+                return await role.run()
+
+        rsps = await asyncio.gather(*[_run(role) for role in ready])
+        stats = EnvRoundStats(
+            round=len(self._round_stats) + 1,
+            roles_woken=len(ready),
+            idle_skips=len(self.roles) - len(ready),
+            idle_runs=sum(1 for rsp in rsps if rsp is None),
+            wall_time=time.perf_counter() - start,
+        )
+        self._round_stats.append(stats)
+        logger.debug(f"round stats: {stats}, is idle: {self.is_idle}")
+
+    def _check_pending(self, role: "Role"):
+        if not role.rc.msg_buffer.empty() or (role.recovered and role.latest_observed_msg):
+            self.mark_ready(role)
+
     def get_roles(self) -> dict[str, "Role"]:
         """获得环境内的所有角色
         Process all Role runs at once
@@ -225,6 +321,8 @@ class Environment(ExtEnv):
     @property
     def is_idle(self):
         """If true, all actions have been executed."""
+        if self.event_driven:
+            return not self._ready_roles
         for r in self.roles.values():
             if not r.is_idle:
                 return False
@@ -236,7 +334,22 @@ class Environment(ExtEnv):
 
     def set_addresses(self, obj, addresses):
         """Set the addresses of the object"""
+        for addr in self.member_addrs.get(obj, set()):
+            roles = self._routes.get(addr, {})
+            roles.pop(obj, None)
+            if not roles:
+                self._routes.pop(addr, None)
         self.member_addrs[obj] = addresses
+        for addr in addresses:
+            self._routes.setdefault(addr, {})[obj] = None
+
+    def _record_history(self, message: Message):
+        entry = f"\n{message}"
+        self._history.append(entry)  # For debug
+        if self.history_file:
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.history_file, "a", encoding="utf-8") as writer:
+                writer.write(entry)
 
     def archive(self, auto_archive=True):
         if auto_archive and self.context.git_repo:
@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 # @Desc   : StanfordTown Action
+import asyncio
 import json
-import time
 from abc import abstractmethod
 from pathlib import Path
 from typing import Any, Optional, Union
@@ -74,7 +74,7 @@ class STAction(Action):
                     return self._func_cleanup(llm_resp, prompt)
             except Exception as exp:
                 logger.warning(f"Action: {self.cls_name} _run_gpt35_max_tokens exp: {exp}")
-                time.sleep(5)
+                await asyncio.sleep(5)
         return self.fail_default_resp
 
     async def _run_gpt35(
@@ -98,7 +98,7 @@ class STAction(Action):
                     return self._func_cleanup(llm_resp, prompt)
             except Exception as exp:
                 logger.warning(f"Action: {self.cls_name} _run_gpt35 exp: {exp}")
-                time.sleep(5)  # usually avoid `Rate limit`
+                await asyncio.sleep(5)  # usually avoid `Rate limit`
         return False
 
     async def _run_gpt35_wo_extra_prompt(self, prompt: str, retry: int = 3) -> str:
@@ -111,7 +111,7 @@ class STAction(Action):
                     return self._func_cleanup(llm_resp, prompt)
             except Exception as exp:
                 logger.warning(f"Action: {self.cls_name} _run_gpt35_wo_extra_prompt exp: {exp}")
-                time.sleep(5)  # usually avoid `Rate limit`
+                await asyncio.sleep(5)  # usually avoid `Rate limit`
         return self.fail_default_resp
 
     async def run(self, *args, **kwargs):
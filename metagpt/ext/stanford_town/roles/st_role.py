@@ -10,9 +10,9 @@ Do the steps following:
 - reflect, do the High-level thinking based on memories and re-add into the memory
 - execute, move or else in the Maze
 """
+import asyncio
 import math
 import random
-import time
 from datetime import datetime, timedelta
 from operator import itemgetter
 from pathlib import Path
@@ -42,6 +42,7 @@ from metagpt.ext.stanford_town.utils.mg_ga_transform import (
     get_role_environment,
     save_environment,
     save_movement,
+    wait_role_environment,
 )
 from metagpt.ext.stanford_town.utils.utils import get_embedding, path_finder
 from metagpt.logs import logger
@@ -89,6 +90,8 @@ class STRole(Role):
     game_obj_cleanup: dict = Field(default_factory=dict)
     inner_voice: bool = Field(default=False)
     has_inner_voice: bool = Field(default=False)
+    # run without the generative_agents frontend: don't wait for it, nor pause between steps to let it render
+    headless: bool = Field(default=False)
 
     role_storage_path: Optional[Path] = Field(default=None)
 
@@ -544,7 +547,7 @@ class STRole(Role):
         return execution
 
     async def update_role_env(self) -> bool:
-        role_env = get_role_environment(self.sim_code, self.name, self.step)
+        role_env = await wait_role_environment(self.sim_code, self.name, self.step, timeout=0 if self.headless else 1)
         ret = True
         if role_env:
             for key, val in self.game_obj_cleanup.items():
@@ -584,10 +587,7 @@ class STRole(Role):
             self.rc.scratch.curr_tile = new_tile
         else:
             ret = False
-            time.sleep(1)
-            logger.warning(
-                f"{self.sim_code}/environment/{self.step}.json not exist or parses failed, " f"sleep 1s and re-check"
-            )
+            logger.warning(f"{self.sim_code}/environment/{self.step}.json not exist or parses failed, re-check later")
         return ret
 
     async def _react(self) -> Message:
@@ -633,7 +633,8 @@ class STRole(Role):
         self.curr_time += timedelta(seconds=self.sec_per_step)
         self.inner_voice = False
 
-        time.sleep(0.5)
+        if not self.headless:
+            await asyncio.sleep(0.5)
         return DummyMessage()
 
 
@@ -2,12 +2,25 @@
 # -*- coding: utf-8 -*-
 # @Desc   : data transform of mg <-> ga under storage
 
+import asyncio
 from pathlib import Path
 from typing import Optional
 
 from metagpt.ext.stanford_town.utils.const import STORAGE_PATH, TEMP_STORAGE_PATH
 from metagpt.logs import logger
-from metagpt.utils.common import read_json_file, write_json_file
+from metagpt.utils.common import pop_closed_loops, read_json_file, write_json_file
+
+# Events set when an environment is saved in this process, keyed by (sim_code, step), per event loop since the events
+# are bound to the loop they are awaited in. A set event is replaced, so that each save wakes up the waiters once.
+# An awaited event references its loop, so the events of closed loops are dropped when a new loop first waits.
+_environment_events: dict[asyncio.AbstractEventLoop, dict[tuple[str, int], asyncio.Event]] = {}
+
+
+def _get_environment_events(loop: asyncio.AbstractEventLoop) -> dict[tuple[str, int], asyncio.Event]:
+    if loop not in _environment_events:
+        pop_closed_loops(_environment_events)
+        _environment_events[loop] = {}
+    return _environment_events[loop]
 
 
 def get_reverie_meta(sim_code: str) -> dict:
@@ -43,6 +56,17 @@ def save_environment(role_name: str, step: int, sim_code: str, movement: list[in
     environment[role_name] = {"maze": "the_ville", "x": movement[0], "y": movement[1]}
     write_json_file(environment_path, environment)
     logger.info(f"save_environment at step: {step}")
+    _notify_environment_saved(sim_code, step)
+
+
+def _notify_environment_saved(sim_code: str, step: int):
+    try:
+        events = _environment_events.get(asyncio.get_running_loop(), {})
+    except RuntimeError:  # no running event loop, so no waiters
+        return
+    event = events.pop((sim_code, step), None)
+    if event:
+        event.set()
 
 
 def get_role_environment(sim_code: str, role_name: str, step: int = 0) -> dict:
@@ -55,6 +79,29 @@ def get_role_environment(sim_code: str, role_name: str, step: int = 0) -> dict:
     return role_env
 
 
+async def wait_role_environment(
+    sim_code: str, role_name: str, step: int = 0, timeout: float = 0, poll_interval: float = 1
+) -> Optional[dict]:
+    """Wait until the environment of the role at the step exists, or return None after `timeout` seconds.
+
+    Environments saved by `save_environment` in this process wake the waiters at once; the ones written by the
+    generative_agents frontend are polled for every `poll_interval` seconds, without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        role_env = get_role_environment(sim_code, role_name, step)
+        remaining = deadline - loop.time()
+        if role_env or remaining <= 0:
+            return role_env
+        events = _get_environment_events(loop)
+        event = events.setdefault((sim_code, step), asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=min(poll_interval, remaining))
+        except asyncio.TimeoutError:
+            pass
+
+
 def write_curr_sim_code(curr_sim_code: dict, temp_storage_path: Optional[Path] = None):
     if temp_storage_path is None:
         temp_storage_path = TEMP_STORAGE_PATH
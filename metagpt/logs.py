@@ -7,7 +7,10 @@
 """
 
 import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
+from typing import Callable, Optional
 
 from loguru import logger as _logger
 
@@ -34,8 +37,24 @@ def define_log_level(print_level="INFO", logfile_level="DEBUG", name: str = None
 logger = define_log_level()
 
 
+_llm_stream_listener: ContextVar[Optional[Callable[[str], None]]] = ContextVar("llm_stream_listener", default=None)
+
+
 def log_llm_stream(msg):
     _llm_stream_log(msg)
+    if listener := _llm_stream_listener.get():
+        listener(msg)
+
+
+@contextmanager
+def llm_stream_listener(func: Callable[[str], None]):
+    """Call `func` with every LLM stream message logged in the scope of the current task, e.g. to parse the output
+    while it streams. Exceptions raised by `func` propagate to the LLM call, so it can stop the stream early."""
+    token = _llm_stream_listener.set(func)
+    try:
+        yield
+    finally:
+        _llm_stream_listener.reset(token)
 
 
 def set_llm_stream_logfunc(func):
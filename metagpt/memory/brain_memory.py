@@ -8,11 +8,14 @@
 @Modified By: mashenquan, 2023/9/4. + redis memory cache.
 @Modified By: mashenquan, 2023/12/25. Simplify Functionality.
 """
+import asyncio
+import hashlib
 import json
 import re
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from metagpt.config2 import config
 from metagpt.const import DEFAULT_MAX_TOKENS, DEFAULT_TOKEN_SIZE
@@ -21,6 +24,14 @@ from metagpt.provider import MetaGPTLLM
 from metagpt.provider.base_llm import BaseLLM
 from metagpt.schema import Message, SimpleMessage
 from metagpt.utils.redis import Redis
+from metagpt.utils.token_counter import get_encoding
+
+# The max number of windows summarized concurrently.
+SUMMARY_CONCURRENCY = 4
+# Summaries of recently summarized windows, keyed by (model, max words, keep language, content hash), so that
+# re-summarizing a history that only grew at the tail only summarizes the new windows.
+SUMMARY_CACHE_SIZE = 1024
+_summary_cache: OrderedDict[Tuple[str, int, bool, str], str] = OrderedDict()
 
 
 class BrainMemory(BaseModel):
@@ -33,6 +44,9 @@ class BrainMemory(BaseModel):
     cacheable: bool = True
     llm: Optional[BaseLLM] = Field(default=None, exclude=True)
 
+    # The number of history messages in the Redis history list, None if unknown and to be rewritten.
+    _history_offset: Optional[int] = PrivateAttr(default=None)
+
     class Config:
         arbitrary_types_allowed = True
 
@@ -56,33 +70,68 @@ class BrainMemory(BaseModel):
 
     @staticmethod
     async def loads(redis_key: str) -> "BrainMemory":
-        redis = Redis(config.redis)
         if not redis_key:
             return BrainMemory()
-        v = await redis.get(key=redis_key)
-        logger.debug(f"REDIS GET {redis_key} {v}")
-        if v:
-            bm = BrainMemory.parse_raw(v)
+        memories = await BrainMemory.loads_many([redis_key])
+        return memories[0]
+
+    @staticmethod
+    async def loads_many(redis_keys: List[str]) -> List["BrainMemory"]:
+        """Load many chat sessions in two round trips, one for their summaries and one for their histories."""
+        redis = Redis(config.redis)
+        values = await redis.mget(redis_keys) or [None] * len(redis_keys)
+        histories = await redis.lrange_many([BrainMemory.to_history_key(k) for k in redis_keys])
+        memories = []
+        for i, (redis_key, v) in enumerate(zip(redis_keys, values)):
+            logger.debug(f"REDIS GET {redis_key} {v}")
+            if not v:
+                memories.append(BrainMemory())
+                continue
+            m = json.loads(v)
+            if "history" in m:  # saved whole by earlier versions, rewritten as a list on the next dump
+                bm = BrainMemory(**m)
+            elif histories is None:
+                logger.warning(f"Load history of {redis_key} failed")
+                memories.append(BrainMemory())
+                continue
+            else:
+                bm = BrainMemory(**m, history=[json.loads(h) for h in histories[i]])
+                bm._history_offset = len(bm.history)
             bm.is_dirty = False
-            return bm
-        return BrainMemory()
+            memories.append(bm)
+        return memories
 
     async def dumps(self, redis_key: str, timeout_sec: int = 30 * 60):
+        """Save the memory, appending only the history messages added since the last load or dump to the history list
+        unless the history was rewritten."""
         if not self.is_dirty:
             return
         redis = Redis(config.redis)
         if not redis_key:
             return False
-        v = self.model_dump_json()
         if self.cacheable:
-            await redis.set(key=redis_key, data=v, timeout_sec=timeout_sec)
-            logger.debug(f"REDIS SET {redis_key} {v}")
+            history_key = self.to_history_key(redis_key)
+            offset = self._history_offset
+            deletes = []
+            if offset is None or offset > len(self.history):
+                deletes, offset = [history_key], 0
+            history = [m.model_dump_json() for m in self.history[offset:]]
+            v = self.model_dump_json(exclude={"history"})
+            if await redis.write(
+                sets={redis_key: v}, appends={history_key: history}, deletes=deletes, timeout_sec=timeout_sec
+            ):
+                self._history_offset = len(self.history)
+            logger.debug(f"REDIS SET {redis_key} {v}, RPUSH {history_key} {history}")
         self.is_dirty = False
 
     @staticmethod
     def to_redis_key(prefix: str, user_id: str, chat_id: str):
         return f"{prefix}:{user_id}:{chat_id}"
 
+    @staticmethod
+    def to_history_key(redis_key: str):
+        return f"{redis_key}:history"
+
     async def set_history_summary(self, history_summary, redis_key):
         if self.historical_summary == history_summary:
             if self.is_dirty:
@@ -92,6 +141,8 @@ class BrainMemory(BaseModel):
 
         self.historical_summary = history_summary
         self.history = []
+        self._history_offset = None
+        self.is_dirty = True
         await self.dumps(redis_key=redis_key)
         self.is_dirty = False
 
@@ -163,6 +214,7 @@ class BrainMemory(BaseModel):
             total_length += delta
         msgs.reverse()
         self.history = msgs
+        self._history_offset = None
         self.is_dirty = True
         await self.dumps(redis_key=config.redis.key)
         self.is_dirty = False
@@ -268,36 +320,61 @@ class BrainMemory(BaseModel):
 
         return "\n".join(texts)
 
-    async def _summarize(self, text: str, max_words=200, keep_language: bool = False, limit: int = -1) -> str:
+    async def _summarize(
+        self,
+        text: str,
+        max_words=200,
+        keep_language: bool = False,
+        limit: int = -1,
+        max_concurrency: int = SUMMARY_CONCURRENCY,
+    ) -> str:
+        """Summarize the text by map-reduce.
+
+        The text is split into windows of `DEFAULT_MAX_TOKENS` tokens, which are summarized concurrently, and the
+        summaries are merged and summarized again the same way until they fit into one window. Window summaries are
+        cached by content, so re-summarizing a text that only grew at the tail only summarizes the new windows.
+        """
         max_token_count = DEFAULT_MAX_TOKENS
         max_count = 100
         text_length = len(text)
         if limit > 0 and text_length < limit:
             return text
+        model = self._get_model()
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def summarize_window(window: str, words: int) -> str:
+            key = (model, words, keep_language, hashlib.sha256(window.encode("utf-8", "surrogatepass")).hexdigest())
+            if key in _summary_cache:
+                _summary_cache.move_to_end(key)
+                return _summary_cache[key]
+            async with semaphore:
+                response = await self._get_summary(text=window, max_words=words, keep_language=keep_language)
+            _summary_cache[key] = response
+            while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+                _summary_cache.popitem(last=False)
+            return response
+
         summary = ""
         while max_count > 0:
-            if text_length < max_token_count:
+            text_windows = self.split_tokens(text, window_size=max_token_count, model=model)
+            if len(text_windows) == 1:
                 summary = await self._get_summary(text=text, max_words=max_words, keep_language=keep_language)
                 break
 
-            padding_size = 20 if max_token_count > 20 else 0
-            text_windows = self.split_texts(text, window_size=max_token_count - padding_size)
-            part_max_words = min(int(max_words / len(text_windows)) + 1, 100)
-            summaries = []
-            for ws in text_windows:
-                response = await self._get_summary(text=ws, max_words=part_max_words, keep_language=keep_language)
-                summaries.append(response)
-            if len(summaries) == 1:
-                summary = summaries[0]
-                break
+            # The same words for each window however many there are, so that cached window summaries stay valid
+            # when the text grows. Too many window summaries to fit into one window are reduced in another round.
+            part_max_words = min(max_words, 100)
+            summaries = await asyncio.gather(*[summarize_window(ws, part_max_words) for ws in text_windows])
 
             # Merged and retry
             text = "\n".join(summaries)
-            text_length = len(text)
 
             max_count -= 1  # safeguard
         return summary
 
+    def _get_model(self) -> str:
+        return getattr(self.llm, "model", None) or getattr(getattr(self.llm, "config", None), "model", "") or ""
+
     async def _get_summary(self, text: str, max_words=20, keep_language: bool = False):
         """Generate text summary"""
         if len(text) < max_words:
@@ -312,6 +389,29 @@ class BrainMemory(BaseModel):
         logger.debug(f"{text}\nsummary rsp: {response}")
         return response
 
+    @staticmethod
+    def split_tokens(text: str, window_size: int, model: str = "") -> List[str]:
+        """Splitting long text into sliding windows of `window_size` tokens, or characters if the tokenizer of the model
+        is unavailable"""
+        if window_size <= 0:
+            window_size = DEFAULT_TOKEN_SIZE
+        try:
+            encoding = get_encoding(model)
+            tokens = encoding.encode(text, disallowed_special=())
+        except Exception as e:  # the encoding may not be available offline
+            logger.warning(f"Tokenize failed: {e}, split by characters instead")
+            return BrainMemory.split_texts(text, window_size=window_size)
+        if len(tokens) <= window_size:
+            return [text]
+        padding_size = 20 if window_size > 20 else 0
+        data_len = window_size - padding_size
+        windows = []
+        for idx in range(0, len(tokens), data_len):
+            windows.append(encoding.decode(tokens[idx : idx + window_size]))
+            if idx + window_size >= len(tokens):
+                break
+        return windows
+
     @staticmethod
     def split_texts(text: str, window_size) -> List[str]:
         """Splitting long text into sliding windows text"""
@@ -6,30 +6,49 @@
 @File    : memory.py
 @Modified By: mashenquan, 2023-11-1. According to RFC 116: Updated the type of index key.
 """
+import re
 from collections import defaultdict
-from typing import DefaultDict, Iterable, Set
+from typing import DefaultDict, Iterable, Optional, Set
 
-from pydantic import BaseModel, Field, SerializeAsAny
+from pydantic import BaseModel, Field, PrivateAttr, SerializeAsAny
 
 from metagpt.const import IGNORED_MESSAGE_ID
 from metagpt.schema import Message
 from metagpt.utils.common import any_to_str, any_to_str_set
 
+_TOKEN_PATTERN = re.compile(r"\w+")
+
 
 class Memory(BaseModel):
-    """The most basic memory: super-memory"""
+    """The most basic memory: super-memory
+
+    Messages are keyed by `Message.id` (or by their serialized form when `ignore_id` is set). Besides the serialized
+    `storage` list and `cause_by` `index`, the memory keeps in-process indexes by key, `role` and `sent_from`, and
+    optionally an inverted token index for `try_remember`/`get_by_content`, so lookups do not scan the whole storage.
+    """
 
     storage: list[SerializeAsAny[Message]] = []
     index: DefaultDict[str, list[SerializeAsAny[Message]]] = Field(default_factory=lambda: defaultdict(list))
     ignore_id: bool = False
+    enable_token_index: bool = Field(default=False, exclude=True)
+
+    _messages: dict[str, Message] = PrivateAttr(default_factory=dict)
+    _role_index: DefaultDict[str, dict[str, Message]] = PrivateAttr(default_factory=lambda: defaultdict(dict))
+    _sent_from_index: DefaultDict[str, dict[str, Message]] = PrivateAttr(default_factory=lambda: defaultdict(dict))
+    _token_index: DefaultDict[str, dict[str, None]] = PrivateAttr(default_factory=lambda: defaultdict(dict))
+
+    def model_post_init(self, __context):
+        self._rebuild_indexes()
 
     def add(self, message: Message):
         """Add a new message to storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        if message in self.storage:
+        key = self._key(message)
+        if key in self._messages:
             return
         self.storage.append(message)
+        self._index_message(key, message)
         if message.cause_by:
             self.index[message.cause_by].append(message)
 
@@ -37,20 +56,29 @@ class Memory(BaseModel):
         for message in messages:
             self.add(message)
 
+    def contains(self, message: Message) -> bool:
+        """Return True if the message has already been stored"""
+        return self._key(message) in self._messages
+
     def get_by_role(self, role: str) -> list[Message]:
         """Return all messages of a specified role"""
-        return [message for message in self.storage if message.role == role]
+        return list(self._role_index.get(role, {}).values())
+
+    def get_by_sent_from(self, sent_from) -> list[Message]:
+        """Return all messages sent from a specified role"""
+        return list(self._sent_from_index.get(any_to_str(sent_from), {}).values())
 
     def get_by_content(self, content: str) -> list[Message]:
         """Return all messages containing a specified content"""
-        return [message for message in self.storage if content in message.content]
+        return [message for message in self._candidates(content) if content in message.content]
 
     def delete_newest(self) -> "Message":
         """delete the newest message from the storage"""
         if len(self.storage) > 0:
             newest_msg = self.storage.pop()
-            if newest_msg.cause_by and newest_msg in self.index[newest_msg.cause_by]:
-                self.index[newest_msg.cause_by].remove(newest_msg)
+            self._unindex_message(self._key(newest_msg), newest_msg)
+            if newest_msg.cause_by:
+                self._remove_from_list(self.index[newest_msg.cause_by], newest_msg)
         else:
             newest_msg = None
         return newest_msg
@@ -59,14 +87,18 @@ class Memory(BaseModel):
         """Delete the specified message from storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        self.storage.remove(message)
-        if message.cause_by and message in self.index[message.cause_by]:
-            self.index[message.cause_by].remove(message)
+        key = self._key(message)
+        if key not in self._messages or not self._remove_from_list(self.storage, message):
+            raise ValueError(f"Message {key} not in memory")
+        self._unindex_message(key, message)
+        if message.cause_by:
+            self._remove_from_list(self.index[message.cause_by], message)
 
     def clear(self):
         """Clear storage and index"""
         self.storage = []
         self.index = defaultdict(list)
+        self._rebuild_indexes()
 
     def count(self) -> int:
         """Return the number of messages in storage"""
@@ -74,7 +106,7 @@ class Memory(BaseModel):
 
     def try_remember(self, keyword: str) -> list[Message]:
         """Try to recall all messages containing a specified keyword"""
-        return [message for message in self.storage if keyword in message.content]
+        return [message for message in self._candidates(keyword) if keyword in message.content]
 
     def get(self, k=0) -> list[Message]:
         """Return the most recent k memories, return all when k=0"""
@@ -82,13 +114,11 @@ class Memory(BaseModel):
 
     def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """find news (previously unseen messages) from the the most recent k memories, from all memories when k=0"""
-        already_observed = self.get(k)
-        news: list[Message] = []
-        for i in observed:
-            if i in already_observed:
-                continue
-            news.append(i)
-        return news
+        if k:
+            already_observed = {self._key(i) for i in self.get(k)}
+        else:
+            already_observed = self._messages.keys()
+        return [i for i in observed if self._key(i) not in already_observed]
 
     def get_by_action(self, action) -> list[Message]:
         """Return all messages triggered by a specified Action"""
@@ -104,3 +134,66 @@ class Memory(BaseModel):
                 continue
             rsp += self.index[action]
         return rsp
+
+    def _key(self, message: Message) -> str:
+        """Return the deduplication key of a message."""
+        return message.dump() if self.ignore_id else message.id
+
+    def _index_message(self, key: str, message: Message):
+        self._messages[key] = message
+        self._role_index[message.role][key] = message
+        self._sent_from_index[message.sent_from][key] = message
+        if self.enable_token_index:
+            for token in set(_TOKEN_PATTERN.findall(message.content)):
+                self._token_index[token][key] = None
+
+    def _unindex_message(self, key: str, message: Message):
+        message = self._messages.pop(key, message)
+        self._pop_from(self._role_index, message.role, key)
+        self._pop_from(self._sent_from_index, message.sent_from, key)
+        if self.enable_token_index:
+            for token in set(_TOKEN_PATTERN.findall(message.content)):
+                self._pop_from(self._token_index, token, key)
+
+    def _rebuild_indexes(self):
+        self._messages = {}
+        self._role_index = defaultdict(dict)
+        self._sent_from_index = defaultdict(dict)
+        self._token_index = defaultdict(dict)
+        for message in self.storage:
+            self._index_message(self._key(message), message)
+
+    def _candidates(self, text: str) -> Iterable[Message]:
+        """Narrow down the messages that may contain `text` using the token index.
+
+        Only tokens enclosed by non-word characters inside `text` are guaranteed to be whole tokens of a matching
+        message, so partial tokens at the edges are ignored. Falls back to the full storage when nothing can be used.
+        """
+        tokens = self._whole_tokens(text) if self.enable_token_index else []
+        if not tokens:
+            return self.storage
+        postings = sorted((self._token_index.get(token, {}) for token in tokens), key=len)
+        first, others = postings[0], postings[1:]
+        return [self._messages[key] for key in first if all(key in posting for posting in others)]
+
+    @staticmethod
+    def _whole_tokens(text: str) -> list[str]:
+        return [m.group() for m in _TOKEN_PATTERN.finditer(text) if m.start() > 0 and m.end() < len(text)]
+
+    def _remove_from_list(self, messages: list[Message], message: Message) -> bool:
+        """Remove the latest entry with the same key as `message`, searching from the tail."""
+        key = self._key(message)
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i] is message or self._key(messages[i]) == key:
+                del messages[i]
+                return True
+        return False
+
+    @staticmethod
+    def _pop_from(index: DefaultDict[str, dict], name: Optional[str], key: str):
+        bucket = index.get(name)
+        if bucket is None:
+            return
+        bucket.pop(key, None)
+        if not bucket:
+            del index[name]
@@ -58,6 +58,13 @@ class MemoryStorage(object):
         self.faiss_engine.add_objs([message])
         logger.info(f"Role {self.role_id}'s memory_storage add a message")
 
+    def add_batch(self, messages: list[Message]):
+        """add messages into memory storage, embedding them in batches"""
+        if not messages:
+            return
+        self.faiss_engine.add_objs(messages)
+        logger.info(f"Role {self.role_id}'s memory_storage add {len(messages)} messages")
+
     async def search_similar(self, message: Message, k=4) -> list[Message]:
         """search for similar messages"""
         # filter the result which score is smaller than the threshold
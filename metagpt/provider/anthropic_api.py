@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from typing import Union
+
 from anthropic import AsyncAnthropic
 from anthropic.types import Message, Usage
 
@@ -35,8 +37,9 @@ class AnthropicLLM(BaseLLM):
                 kwargs["system"] = messages[0]["content"]  # set system prompt here
         return kwargs
 
-    def _update_costs(self, usage: Usage, model: str = None, local_calc_usage: bool = True):
-        usage = {"prompt_tokens": usage.input_tokens, "completion_tokens": usage.output_tokens}
+    def _update_costs(self, usage: Union[Usage, dict], model: str = None, local_calc_usage: bool = True):
+        if isinstance(usage, Usage):
+            usage = {"prompt_tokens": usage.input_tokens, "completion_tokens": usage.output_tokens}
         super()._update_costs(usage, model)
 
     def get_choice_text(self, resp: Message) -> str:
@@ -54,17 +57,18 @@ class AnthropicLLM(BaseLLM):
         stream = await self.aclient.messages.create(**self._const_kwargs(messages, stream=True))
         collected_content = []
         usage = Usage(input_tokens=0, output_tokens=0)
-        async for event in stream:
-            event_type = event.type
-            if event_type == "message_start":
-                usage.input_tokens = event.message.usage.input_tokens
-                usage.output_tokens = event.message.usage.output_tokens
-            elif event_type == "content_block_delta":
-                content = event.delta.text
-                log_llm_stream(content)
-                collected_content.append(content)
-            elif event_type == "message_delta":
-                usage.output_tokens = event.usage.output_tokens  # update final output_tokens
+        async with self._closing_stream(stream, messages, collected_content):
+            async for event in stream:
+                event_type = event.type
+                if event_type == "message_start":
+                    usage.input_tokens = event.message.usage.input_tokens
+                    usage.output_tokens = event.message.usage.output_tokens
+                elif event_type == "content_block_delta":
+                    content = event.delta.text
+                    collected_content.append(content)
+                    log_llm_stream(content)
+                elif event_type == "message_delta":
+                    usage.output_tokens = event.usage.output_tokens  # update final output_tokens
 
         log_llm_stream("\n")
         self._update_costs(usage)
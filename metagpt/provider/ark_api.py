@@ -79,13 +79,14 @@ class ArkLLM(OpenAILLM):
         )
         usage = None
         collected_messages = []
-        async for chunk in response:
-            chunk_message = chunk.choices[0].delta.content or "" if chunk.choices else ""  # extract the message
-            log_llm_stream(chunk_message)
-            collected_messages.append(chunk_message)
-            if chunk.usage:
-                # 火山方舟的流式调用会在最后一个chunk中返回usage,最后一个chunk的choices为[]
-                usage = chunk.usage
+        async with self._closing_stream(response, messages, collected_messages):
+            async for chunk in response:
+                chunk_message = chunk.choices[0].delta.content or "" if chunk.choices else ""  # extract the message
+                collected_messages.append(chunk_message)
+                log_llm_stream(chunk_message)
+                if chunk.usage:
+                    # 火山方舟的流式调用会在最后一个chunk中返回usage,最后一个chunk的choices为[]
+                    usage = chunk.usage
 
         log_llm_stream("\n")
         full_reply_content = "".join(collected_messages)
@@ -8,8 +8,10 @@
 """
 from __future__ import annotations
 
+import inspect
 import json
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
 from typing import Optional, Union
 
 from openai import AsyncOpenAI
@@ -25,9 +27,12 @@ from tenacity import (
 from metagpt.configs.llm_config import LLMConfig
 from metagpt.const import LLM_API_TIMEOUT, USE_CONFIG_TIMEOUT
 from metagpt.logs import logger
+from metagpt.provider.llm_scheduler import schedule_completion_text
+from metagpt.provider.response_cache import cache_completion_text
 from metagpt.schema import Message
 from metagpt.utils.common import log_and_reraise
 from metagpt.utils.cost_manager import CostManager, Costs
+from metagpt.utils.token_counter import count_input_tokens, count_output_tokens
 
 
 class BaseLLM(ABC):
@@ -125,6 +130,37 @@ class BaseLLM(ABC):
             return Costs(0, 0, 0, 0)
         return self.cost_manager.get_costs()
 
+    def _estimate_usage(self, messages: list[dict], rsp: str) -> dict:
+        """Estimate the usage of a reply the service did not report it for, e.g. a stream stopped early."""
+        model = self.pricing_plan or self.model
+        try:
+            try:
+                prompt_tokens = count_input_tokens(messages, model)
+            except NotImplementedError:  # not an OpenAI model, a reference count is close enough
+                prompt_tokens = count_input_tokens(messages, "open-llm-model")
+            return {"prompt_tokens": prompt_tokens, "completion_tokens": count_output_tokens(rsp, model)}
+        except Exception as e:
+            logger.warning(f"usage estimation failed: {e}")
+            return {}
+
+    @asynccontextmanager
+    async def _closing_stream(self, stream, messages: list[dict], collected_content: list[str]):
+        """Guard the iteration of a completion stream. If it stops early, e.g. by a stream listener raising
+        `StreamAborted`, close the stream to release its connection and count the estimated usage of the partial
+        reply, since the service reports the usage only at the end of the stream.
+        """
+        try:
+            yield stream
+        except BaseException:
+            close = getattr(stream, "aclose", None) or getattr(stream, "close", None)
+            try:
+                if close and inspect.isawaitable(result := close()):
+                    await result
+            except Exception as e:
+                logger.warning(f"close the stream failed: {e}")
+            self._update_costs(self._estimate_usage(messages, "".join(collected_content)))
+            raise
+
     async def aask(
         self,
         msg: Union[str, list[dict[str, str]]],
@@ -187,6 +223,7 @@ class BaseLLM(ABC):
     async def _achat_completion_stream(self, messages: list[dict], timeout: int = USE_CONFIG_TIMEOUT) -> str:
         """_achat_completion_stream implemented by inherited class"""
 
+    @cache_completion_text
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_random_exponential(min=1, max=60),
@@ -194,6 +231,7 @@ class BaseLLM(ABC):
         retry=retry_if_exception_type(ConnectionError),
         retry_error_callback=log_and_reraise,
     )
+    @schedule_completion_text
     async def acompletion_text(
         self, messages: list[dict], stream: bool = False, timeout: int = USE_CONFIG_TIMEOUT
     ) -> str:
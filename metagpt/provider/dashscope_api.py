@@ -216,12 +216,13 @@ class DashScopeLLM(BaseLLM):
         resp = await self.aclient.acall(**self._const_kwargs(messages, stream=True))
         collected_content = []
         usage = {}
-        async for chunk in resp:
-            self._check_response(chunk)
-            content = chunk.output.choices[0]["message"]["content"]
-            usage = dict(chunk.usage)  # each chunk has usage
-            log_llm_stream(content)
-            collected_content.append(content)
+        async with self._closing_stream(resp, messages, collected_content):
+            async for chunk in resp:
+                self._check_response(chunk)
+                content = chunk.output.choices[0]["message"]["content"]
+                usage = dict(chunk.usage)  # each chunk has usage
+                collected_content.append(content)
+                log_llm_stream(content)
         log_llm_stream("\n")
         self._update_costs(usage)
         full_content = "".join(collected_content)
@@ -142,14 +142,15 @@ class GeminiLLM(BaseLLM):
             **self._const_kwargs(messages, stream=True)
         )
         collected_content = []
-        async for chunk in resp:
-            try:
-                content = chunk.text
-            except Exception as e:
-                logger.warning(f"messages: {messages}\nerrors: {e}\n{BlockedPromptException(str(chunk))}")
-                raise BlockedPromptException(str(chunk))
-            log_llm_stream(content)
-            collected_content.append(content)
+        async with self._closing_stream(resp, messages, collected_content):
+            async for chunk in resp:
+                try:
+                    content = chunk.text
+                except Exception as e:
+                    logger.warning(f"messages: {messages}\nerrors: {e}\n{BlockedPromptException(str(chunk))}")
+                    raise BlockedPromptException(str(chunk))
+                collected_content.append(content)
+                log_llm_stream(content)
         log_llm_stream("\n")
 
         full_content = "".join(collected_content)
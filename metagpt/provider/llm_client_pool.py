@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : llm_client_pool.py
+@Desc    : Pool of LLM clients shared by all callers of the same config. Each caller gets a lightweight view of a
+    pooled LLM instance: the view has its own config object and cost manager, but shares the underlying SDK client,
+    and thus the HTTP connection pool, with the other views, instead of opening a new transport for every role.
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+from typing import Optional
+
+from pydantic import BaseModel
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.logs import logger
+from metagpt.provider.base_llm import BaseLLM
+from metagpt.provider.llm_provider_registry import create_llm_instance
+
+
+class LLMClientPoolStats(BaseModel):
+    """Metrics of a pool: clients opened for new configs, reused by views of the same config, and closed"""
+
+    opened: int = 0
+    reused: int = 0
+    closed: int = 0
+
+
+class LLMClientPool:
+    """LLM instances keyed by the normalized config, handing out per-caller views of them."""
+
+    def __init__(self):
+        self.stats = LLMClientPoolStats()
+        self._clients: dict[str, BaseLLM] = {}
+
+    @staticmethod
+    def make_key(config: LLMConfig) -> str:
+        """All the fields of the config, defaults included, so equal configs share a key however they were set."""
+        return config.model_dump_json()
+
+    def get(self, config: LLMConfig) -> BaseLLM:
+        """Return a view of the LLM instance of `config`, creating the instance on first use."""
+        key = self.make_key(config)
+        client = self._clients.get(key)
+        if client is None:
+            # A private copy, so callers changing their config later (e.g. `with_model`) cannot change the key.
+            client = create_llm_instance(config.model_copy(deep=True))
+            self._clients[key] = client
+            self.stats.opened += 1
+        else:
+            self.stats.reused += 1
+        return self._make_view(client, config)
+
+    @staticmethod
+    def _make_view(client: BaseLLM, config: LLMConfig) -> BaseLLM:
+        view = copy.copy(client)
+        view.config = config
+        if client.cost_manager is not None:  # some providers set their own cost manager, don't share its counters
+            view.cost_manager = client.cost_manager.model_copy(deep=True)
+        return view
+
+    async def aclose(self):
+        """Close the SDK clients of the pool. Views handed out before are not usable afterwards."""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            close = getattr(getattr(client, "aclient", None), "close", None)
+            if close and asyncio.iscoroutinefunction(close):
+                try:
+                    await close()
+                except Exception as e:
+                    logger.warning(f"Close LLM client of {client.config.model} failed: {e}")
+            self.stats.closed += 1
+        if clients:
+            logger.info(f"LLM client pool closed: {self.stats}")
+
+
+_pool: Optional[LLMClientPool] = None
+
+
+def get_llm_client_pool() -> LLMClientPool:
+    """Return the LLM client pool of the process."""
+    global _pool
+    if _pool is None:
+        _pool = LLMClientPool()
+    return _pool
@@ -5,9 +5,35 @@
 @Author  : alexanderwu
 @File    : llm_provider_registry.py
 """
+import importlib
+
 from metagpt.configs.llm_config import LLMConfig, LLMType
 from metagpt.provider.base_llm import BaseLLM
 
+# The module registering each provider, imported on first use so that only the SDKs of the configured providers
+# are loaded.
+PROVIDER_MODULES = {
+    LLMType.OPENAI: "metagpt.provider.openai_api",
+    LLMType.FIREWORKS: "metagpt.provider.openai_api",
+    LLMType.OPEN_LLM: "metagpt.provider.openai_api",
+    LLMType.MOONSHOT: "metagpt.provider.openai_api",
+    LLMType.MISTRAL: "metagpt.provider.openai_api",
+    LLMType.YI: "metagpt.provider.openai_api",
+    LLMType.OPENROUTER: "metagpt.provider.openai_api",
+    LLMType.AZURE: "metagpt.provider.azure_openai_api",
+    LLMType.ANTHROPIC: "metagpt.provider.anthropic_api",
+    LLMType.CLAUDE: "metagpt.provider.anthropic_api",
+    LLMType.SPARK: "metagpt.provider.spark_api",
+    LLMType.ZHIPUAI: "metagpt.provider.zhipuai_api",
+    LLMType.GEMINI: "metagpt.provider.google_gemini_api",
+    LLMType.METAGPT: "metagpt.provider.metagpt_api",
+    LLMType.OLLAMA: "metagpt.provider.ollama_api",
+    LLMType.QIANFAN: "metagpt.provider.qianfan_api",
+    LLMType.DASHSCOPE: "metagpt.provider.dashscope_api",
+    LLMType.BEDROCK: "metagpt.provider.bedrock_api",
+    LLMType.ARK: "metagpt.provider.ark_api",
+}
+
 
 class LLMProviderRegistry:
     def __init__(self):
@@ -17,7 +43,9 @@ class LLMProviderRegistry:
         self.providers[key] = provider_cls
 
     def get_provider(self, enum: LLMType):
-        """get provider instance according to the enum"""
+        """get provider instance according to the enum, importing its module on first use"""
+        if enum not in self.providers and enum in PROVIDER_MODULES:
+            importlib.import_module(PROVIDER_MODULES[enum])
         return self.providers[enum]
 
 
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : llm_scheduler.py
+@Desc    : Request scheduler shared by all LLM instances of the same endpoint. It keeps requests under the
+    requests/minute and tokens/minute limits of `LLMConfig` with token buckets, serves higher priority classes first
+    and interleaves requests of different owners (roles) fairly, instead of letting bursts hit provider 429s.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Optional
+
+from pydantic import BaseModel
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.const import USE_CONFIG_TIMEOUT
+from metagpt.logs import logger
+from metagpt.utils.token_counter import count_input_tokens, count_output_tokens
+
+
+class LLMPriority(IntEnum):
+    """Priority classes of LLM requests, lower values are served first."""
+
+    HIGH = 0  # e.g. planners, whose output unblocks other roles
+    NORMAL = 1
+    LOW = 2  # e.g. reviewers
+
+
+_request_priority = contextvars.ContextVar("llm_request_priority", default=LLMPriority.NORMAL)
+_request_owner = contextvars.ContextVar("llm_request_owner", default="")
+
+
+@contextmanager
+def llm_request_scope(owner: Optional[str] = None, priority: Optional[LLMPriority] = None):
+    """Tag the LLM requests issued inside the scope with an owner for fair queuing and a priority class."""
+    tokens = []
+    if owner is not None:
+        tokens.append((_request_owner, _request_owner.set(owner)))
+    if priority is not None:
+        tokens.append((_request_priority, _request_priority.set(priority)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class LLMSchedulerStats(BaseModel):
+    """Queue metrics of a scheduler"""
+
+    requests: int = 0
+    waiting: int = 0
+    running: int = 0
+    total_wait_time: float = 0.0
+    max_wait_time: float = 0.0
+
+    @property
+    def avg_wait_time(self) -> float:
+        return self.total_wait_time / self.requests if self.requests else 0.0
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate_per_minute`, holding at most one minute of capacity."""
+
+    def __init__(self, rate_per_minute: int):
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self._rate = rate_per_minute / 60.0
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available, 0 if they are available now."""
+        self._refill()
+        amount = min(amount, self.capacity)  # a single oversized request must still be served eventually
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self._rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class LLMRequestScheduler:
+    """Admission control for the requests sent to one LLM endpoint."""
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, max_concurrency: int = 0):
+        self.max_concurrency = max_concurrency
+        self.stats = LLMSchedulerStats()
+        self._request_bucket = TokenBucket(rpm) if rpm > 0 else None
+        self._token_bucket = TokenBucket(tpm) if tpm > 0 else None
+        self._queue: list[tuple[int, float, int]] = []  # (priority, virtual start time, seq)
+        self._owner_tags: dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._condition: Optional[asyncio.Condition] = None
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0, priority: Optional[LLMPriority] = None, owner: Optional[str] = None):
+        """Wait for a turn to send a request estimated to use `tokens` tokens."""
+        priority = _request_priority.get() if priority is None else priority
+        owner = _request_owner.get() if owner is None else owner
+        await self._acquire(tokens, priority, owner)
+        try:
+            yield
+        finally:
+            await self._release()
+
+    async def _acquire(self, tokens: int, priority: int, owner: str):
+        # Start-time fair queuing: each owner advances its own virtual clock by one per request, so a role that
+        # floods the queue does not starve the others of the same priority.
+        tag = max(self._virtual_time, self._owner_tags.get(owner, 0.0))
+        self._owner_tags[owner] = tag + 1
+        entry = (int(priority), tag, next(self._seq))
+        start = time.monotonic()
+        condition = self._get_condition()
+        async with condition:
+            heapq.heappush(self._queue, entry)
+            self.stats.waiting += 1
+            condition.notify_all()
+            try:
+                while True:
+                    delay = self._admission_delay(tokens) if self._queue[0] == entry else None
+                    if delay == 0:
+                        break
+                    try:
+                        await asyncio.wait_for(condition.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self.stats.waiting -= 1
+                condition.notify_all()  # let the next request in the queue check its turn
+
+            self._virtual_time = tag
+            if self._request_bucket:
+                self._request_bucket.consume(1)
+            if self._token_bucket:
+                self._token_bucket.consume(tokens)
+            wait_time = time.monotonic() - start
+            self.stats.running += 1
+            self.stats.requests += 1
+            self.stats.total_wait_time += wait_time
+            self.stats.max_wait_time = max(self.stats.max_wait_time, wait_time)
+
+    def charge(self, tokens: int):
+        """Count the completion tokens of a finished request against tokens/minute limits, which providers apply to
+        the prompt and the completion together."""
+        if self._token_bucket and tokens > 0:
+            self._token_bucket.consume(tokens)
+
+    async def _release(self):
+        condition = self._get_condition()
+        async with condition:
+            self.stats.running -= 1
+            condition.notify_all()
+
+    def _get_condition(self) -> asyncio.Condition:
+        """The condition is bound to the running event loop, recreate it when the scheduler outlives a loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._condition = asyncio.Condition()
+            self._queue = []
+            self.stats.running = self.stats.waiting = 0
+        return self._condition
+
+    def _admission_delay(self, tokens: int) -> Optional[float]:
+        """Return 0 if the head request can start now, the seconds to wait for the buckets, or None to wait for a
+        running request to finish."""
+        if self.max_concurrency and self.stats.running >= self.max_concurrency:
+            return None
+        delay = 0.0
+        if self._request_bucket:
+            delay = max(delay, self._request_bucket.wait_time(1))
+        if self._token_bucket:
+            delay = max(delay, self._token_bucket.wait_time(tokens))
+        return delay
+
+
+_schedulers: dict[tuple, LLMRequestScheduler] = {}
+
+
+def get_llm_scheduler(config: LLMConfig) -> Optional[LLMRequestScheduler]:
+    """Return the scheduler shared by the LLM instances of the same endpoint, or None if it is not rate limited."""
+    if not config or not (config.rpm or config.tpm or config.max_concurrency):
+        return None
+    key = (config.api_type, config.base_url, config.api_key, config.model)
+    if key not in _schedulers:
+        _schedulers[key] = LLMRequestScheduler(rpm=config.rpm, tpm=config.tpm, max_concurrency=config.max_concurrency)
+    return _schedulers[key]
+
+
+def estimate_tokens(messages: list[dict], model: str) -> int:
+    """Estimate the prompt tokens a request counts against tokens/minute limits."""
+    try:
+        prompt_tokens = count_input_tokens(messages, model)
+    except Exception as e:
+        logger.debug(f"estimate tokens of {model} by length: {e}")
+        prompt_tokens = sum(len(str(i.get("content", ""))) for i in messages) // 4
+    return prompt_tokens
+
+
+def estimate_completion_tokens(rsp: str, model: str) -> int:
+    """Estimate the completion tokens of a reply."""
+    try:
+        return count_output_tokens(rsp, model)
+    except Exception as e:
+        logger.debug(f"estimate tokens of {model} by length: {e}")
+        return len(rsp) // 4
+
+
+def schedule_completion_text(func):
+    """Send `acompletion_text` requests through the scheduler of `LLMConfig` when rate limits are configured."""
+
+    @functools.wraps(func)
+    async def wrapper(self, messages: list[dict], stream=False, timeout=USE_CONFIG_TIMEOUT) -> str:
+        scheduler = get_llm_scheduler(self.config)
+        if not scheduler:
+            return await func(self, messages, stream=stream, timeout=timeout)
+        model = self.model or self.config.model
+        async with scheduler.slot(tokens=estimate_tokens(messages, model)):
+            rsp = await func(self, messages, stream=stream, timeout=timeout)
+        scheduler.charge(estimate_completion_tokens(rsp, model))
+        return rsp
+
+    return wrapper
@@ -76,16 +76,17 @@ class OllamaLLM(BaseLLM):
 
         collected_content = []
         usage = {}
-        async for raw_chunk in stream_resp:
-            chunk = self._decode_and_load(raw_chunk)
-
-            if not chunk.get("done", False):
-                content = self.get_choice_text(chunk)
-                collected_content.append(content)
-                log_llm_stream(content)
-            else:
-                # stream finished
-                usage = self.get_usage(chunk)
+        async with self._closing_stream(stream_resp, messages, collected_content):
+            async for raw_chunk in stream_resp:
+                chunk = self._decode_and_load(raw_chunk)
+
+                if not chunk.get("done", False):
+                    content = self.get_choice_text(chunk)
+                    collected_content.append(content)
+                    log_llm_stream(content)
+                else:
+                    # stream finished
+                    usage = self.get_usage(chunk)
         log_llm_stream("\n")
 
         self._update_costs(usage)
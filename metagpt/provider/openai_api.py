@@ -12,7 +12,13 @@ import json
 import re
 from typing import Optional, Union
 
-from openai import APIConnectionError, AsyncOpenAI, AsyncStream
+import httpx
+from openai import (
+    DEFAULT_CONNECTION_LIMITS,
+    APIConnectionError,
+    AsyncOpenAI,
+    AsyncStream,
+)
 from openai._base_client import AsyncHttpxClientWrapper
 from openai.types import CompletionUsage
 from openai.types.chat import ChatCompletion, ChatCompletionChunk
@@ -30,6 +36,8 @@ from metagpt.logs import log_llm_stream, logger
 from metagpt.provider.base_llm import BaseLLM
 from metagpt.provider.constant import GENERAL_FUNCTION_SCHEMA
 from metagpt.provider.llm_provider_registry import register_provider
+from metagpt.provider.llm_scheduler import schedule_completion_text
+from metagpt.provider.response_cache import cache_completion_text
 from metagpt.utils.common import CodeParser, decode_image, log_and_reraise
 from metagpt.utils.cost_manager import CostManager
 from metagpt.utils.exceptions import handle_exception
@@ -71,12 +79,23 @@ class OpenAILLM(BaseLLM):
     def _make_client_kwargs(self) -> dict:
         kwargs = {"api_key": self.config.api_key, "base_url": self.config.base_url}
 
-        # to use proxy, openai v1 needs http_client
-        if proxy_params := self._get_proxy_params():
-            kwargs["http_client"] = AsyncHttpxClientWrapper(**proxy_params)
+        # to use proxy or connection limits, openai v1 needs http_client
+        if http_client_params := self._get_http_client_params():
+            kwargs["http_client"] = AsyncHttpxClientWrapper(**http_client_params)
 
         return kwargs
 
+    def _get_http_client_params(self) -> dict:
+        params = self._get_proxy_params()
+        if self.config.max_connections or self.config.keepalive_expiry:
+            params["limits"] = httpx.Limits(
+                max_connections=self.config.max_connections or DEFAULT_CONNECTION_LIMITS.max_connections,
+                max_keepalive_connections=self.config.max_connections
+                or DEFAULT_CONNECTION_LIMITS.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry or DEFAULT_CONNECTION_LIMITS.keepalive_expiry,
+            )
+        return params
+
     def _get_proxy_params(self) -> dict:
         params = {}
         if self.config.proxy:
@@ -92,26 +111,29 @@ class OpenAILLM(BaseLLM):
         )
         usage = None
         collected_messages = []
-        async for chunk in response:
-            chunk_message = chunk.choices[0].delta.content or "" if chunk.choices else ""  # extract the message
-            finish_reason = (
-                chunk.choices[0].finish_reason if chunk.choices and hasattr(chunk.choices[0], "finish_reason") else None
-            )
-            log_llm_stream(chunk_message)
-            collected_messages.append(chunk_message)
-            if finish_reason:
-                if hasattr(chunk, "usage") and chunk.usage is not None:
-                    # Some services have usage as an attribute of the chunk, such as Fireworks
-                    if isinstance(chunk.usage, CompletionUsage):
-                        usage = chunk.usage
-                    else:
-                        usage = CompletionUsage(**chunk.usage)
-                elif hasattr(chunk.choices[0], "usage"):
-                    # The usage of some services is an attribute of chunk.choices[0], such as Moonshot
-                    usage = CompletionUsage(**chunk.choices[0].usage)
-                elif "openrouter.ai" in self.config.base_url:
-                    # due to it get token cost from api
-                    usage = await get_openrouter_tokens(chunk)
+        async with self._closing_stream(response, messages, collected_messages):
+            async for chunk in response:
+                chunk_message = chunk.choices[0].delta.content or "" if chunk.choices else ""  # extract the message
+                finish_reason = (
+                    chunk.choices[0].finish_reason
+                    if chunk.choices and hasattr(chunk.choices[0], "finish_reason")
+                    else None
+                )
+                collected_messages.append(chunk_message)
+                log_llm_stream(chunk_message)
+                if finish_reason:
+                    if hasattr(chunk, "usage") and chunk.usage is not None:
+                        # Some services have usage as an attribute of the chunk, such as Fireworks
+                        if isinstance(chunk.usage, CompletionUsage):
+                            usage = chunk.usage
+                        else:
+                            usage = CompletionUsage(**chunk.usage)
+                    elif hasattr(chunk.choices[0], "usage"):
+                        # The usage of some services is an attribute of chunk.choices[0], such as Moonshot
+                        usage = CompletionUsage(**chunk.choices[0].usage)
+                    elif "openrouter.ai" in self.config.base_url:
+                        # due to it get token cost from api
+                        usage = await get_openrouter_tokens(chunk)
 
         log_llm_stream("\n")
         full_reply_content = "".join(collected_messages)
@@ -145,6 +167,7 @@ class OpenAILLM(BaseLLM):
     async def acompletion(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT) -> ChatCompletion:
         return await self._achat_completion(messages, timeout=self.get_timeout(timeout))
 
+    @cache_completion_text
     @retry(
         wait=wait_random_exponential(min=1, max=60),
         stop=stop_after_attempt(6),
@@ -152,6 +175,7 @@ class OpenAILLM(BaseLLM):
         retry=retry_if_exception_type(APIConnectionError),
         retry_error_callback=log_and_reraise,
     )
+    @schedule_completion_text
     async def acompletion_text(self, messages: list[dict], stream=False, timeout=USE_CONFIG_TIMEOUT) -> str:
         """when streaming, print each token in place."""
         if stream:
@@ -123,11 +123,12 @@ class QianFanLLM(BaseLLM):
         resp = await self.aclient.ado(**self._const_kwargs(messages=messages, stream=True))
         collected_content = []
         usage = {}
-        async for chunk in resp:
-            content = chunk.body.get("result", "")
-            usage = chunk.body.get("usage", {})
-            log_llm_stream(content)
-            collected_content.append(content)
+        async with self._closing_stream(resp, messages, collected_content):
+            async for chunk in resp:
+                content = chunk.body.get("result", "")
+                usage = chunk.body.get("usage", {})
+                collected_content.append(content)
+                log_llm_stream(content)
         log_llm_stream("\n")
 
         self._update_costs(usage)
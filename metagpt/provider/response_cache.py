@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : response_cache.py
+@Desc    : Content-addressed cache of LLM responses. The key is a canonical hash of everything that determines a
+    completion (api type, model, messages, temperature, max tokens and tool schema), so replaying an unchanged prompt
+    returns the stored text instead of calling the provider again.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from metagpt.configs.llm_config import LLMCacheConfig, LLMCacheType
+from metagpt.const import CONFIG_ROOT, USE_CONFIG_TIMEOUT
+from metagpt.logs import log_llm_stream, logger
+from metagpt.utils.redis import Redis
+from metagpt.utils.token_counter import count_input_tokens, count_output_tokens
+
+
+class BaseResponseCache(ABC):
+    """Storage backend of the LLM response cache."""
+
+    def __init__(self, config: LLMCacheConfig):
+        self.config = config
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None if it is missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: str):
+        """Store a response."""
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: list[dict],
+        temperature: float = None,
+        max_tokens: int = None,
+        tools: list[dict] = None,
+        api_type: str = "",
+        base_url: str = "",
+        tool_choice=None,
+    ) -> str:
+        """Return the canonical hash of a completion request."""
+        payload = {
+            "api_type": api_type,
+            "base_url": base_url,
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "tools": tools,
+            "tool_choice": tool_choice,
+        }
+        data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _expired(self, created: float) -> bool:
+        return bool(self.config.ttl) and time.time() - created > self.config.ttl
+
+
+class MemoryResponseCache(BaseResponseCache):
+    """In-process LRU cache."""
+
+    def __init__(self, config: LLMCacheConfig):
+        super().__init__(config)
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created, value = entry
+        if self._expired(created):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str):
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while self.config.max_entries and len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteResponseCache(BaseResponseCache):
+    """On-disk cache in a SQLite file, evicting the least recently used entries beyond `max_entries`."""
+
+    def __init__(self, config: LLMCacheConfig):
+        super().__init__(config)
+        path = config.path or CONFIG_ROOT / "llm_cache.sqlite3"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed)")
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str):
+        await asyncio.to_thread(self._set, key, value)
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self._expired(created):
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (time.time(), key))
+            return value
+
+    def _set(self, key: str, value: str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.config.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.config.max_entries,),
+                )
+
+
+class RedisResponseCache(BaseResponseCache):
+    """Cache in Redis through `metagpt.utils.redis`, expiring entries by `ttl`."""
+
+    KEY_PREFIX = "metagpt:llm_cache:"
+
+    def __init__(self, config: LLMCacheConfig):
+        super().__init__(config)
+        self._redis = Redis(config.redis)
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self._redis.get(self.KEY_PREFIX + key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: str):
+        await self._redis.set(self.KEY_PREFIX + key, value, timeout_sec=self.config.ttl or None)
+
+
+_CACHE_BACKENDS = {
+    LLMCacheType.MEMORY: MemoryResponseCache,
+    LLMCacheType.SQLITE: SQLiteResponseCache,
+    LLMCacheType.REDIS: RedisResponseCache,
+}
+_caches: dict[str, BaseResponseCache] = {}
+
+
+def get_response_cache(config: LLMCacheConfig) -> Optional[BaseResponseCache]:
+    """Return the cache shared by all LLM instances with the same cache config, or None if caching is disabled."""
+    if not config or not config.enabled:
+        return None
+    cache_key = config.model_dump_json()
+    if cache_key not in _caches:
+        _caches[cache_key] = _CACHE_BACKENDS[config.backend](config)
+    return _caches[cache_key]
+
+
+def cache_completion_text(func):
+    """Serve `acompletion_text` from the response cache configured by `LLMConfig.cache`.
+
+    On a hit the stored text is returned (and replayed to the stream log when `stream=True`) and the cached tokens
+    are reported to the cost manager separately from billed tokens.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, messages: list[dict], stream=False, timeout=USE_CONFIG_TIMEOUT, **kwargs) -> str:
+        cache = get_response_cache(getattr(self.config, "cache", None))
+        if not cache:
+            return await func(self, messages, stream=stream, timeout=timeout, **kwargs)
+
+        model = self.model or self.config.model
+        key = cache.make_key(
+            model=model,
+            messages=messages,
+            temperature=self.config.temperature,
+            max_tokens=self.config.max_token,
+            tools=kwargs.get("tools"),
+            api_type=self.config.api_type.value,
+            base_url=self.config.base_url,
+            tool_choice=kwargs.get("tool_choice"),
+        )
+        rsp = await cache.get(key)
+        if rsp is not None:
+            if stream:
+                log_llm_stream(rsp)
+                log_llm_stream("\n")
+            if self.cost_manager:
+                self.cost_manager.update_cache_hit(*_count_tokens(messages, rsp, model))
+            return rsp
+
+        if self.cost_manager:
+            self.cost_manager.update_cache_miss()
+        rsp = await func(self, messages, stream=stream, timeout=timeout, **kwargs)
+        if rsp is not None:
+            await cache.set(key, rsp)
+        return rsp
+
+    return wrapper
+
+
+def _count_tokens(messages: list[dict], rsp: str, model: str) -> tuple[int, int]:
+    try:
+        return count_input_tokens(messages, model), count_output_tokens(rsp, model)
+    except Exception as e:
+        logger.debug(f"count cached tokens failed: {e}")
+        return 0, 0
@@ -73,11 +73,12 @@ class SparkLLM(BaseLLM):
         response = await self.acreate(messages, stream=True)
         collected_content = []
         usage = {}
-        async for chunk in response:
-            collected_content.append(chunk.content)
-            log_llm_stream(chunk.content)
-            if hasattr(chunk, "additional_kwargs"):
-                usage = chunk.additional_kwargs.get("token_usage", {})
+        async with self._closing_stream(response, messages, collected_content):
+            async for chunk in response:
+                collected_content.append(chunk.content)
+                log_llm_stream(chunk.content)
+                if hasattr(chunk, "additional_kwargs"):
+                    usage = chunk.additional_kwargs.get("token_usage", {})
 
         log_llm_stream("\n")
         self._update_costs(usage)
@@ -73,14 +73,15 @@ class ZhiPuAILLM(BaseLLM):
         response = await self.llm.acreate_stream(**self._const_kwargs(messages, stream=True))
         collected_content = []
         usage = {}
-        async for chunk in response.stream():
-            finish_reason = chunk.get("choices")[0].get("finish_reason")
-            if finish_reason == "stop":
-                usage = chunk.get("usage", {})
-            else:
-                content = self.get_choice_delta_text(chunk)
-                collected_content.append(content)
-                log_llm_stream(content)
+        async with self._closing_stream(response.stream(), messages, collected_content) as stream:
+            async for chunk in stream:
+                finish_reason = chunk.get("choices")[0].get("finish_reason")
+                if finish_reason == "stop":
+                    usage = chunk.get("usage", {})
+                else:
+                    content = self.get_choice_delta_text(chunk)
+                    collected_content.append(content)
+                    log_llm_stream(content)
 
         log_llm_stream("\n")
 
@@ -0,0 +1,240 @@
+"""Cached and batched embedding.
+
+`CachedEmbedding` wraps a LlamaIndex embedding model:
+- Embeddings are cached on disk by the hash of (model, text), and the cache is shared by every `SimpleEngine` and
+  `MemoryStorage` using the same cache file, so re-ingesting a mostly unchanged corpus only embeds the changes.
+- Cache misses are sent in batches of the wrapped model's `embed_batch_size`, at most `max_concurrency` batches at a
+  time. Concurrent async requests are coalesced into shared batches, identical pending texts are embedded once.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Union
+
+import numpy as np
+from llama_index.core.base.embeddings.base import Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.embeddings import BaseEmbedding
+
+from metagpt.config2 import config
+from metagpt.const import CONFIG_ROOT
+
+# The wrapper hands every text to `_get_text_embeddings` at once, and batches the cache misses itself.
+_UNBATCHED = 2048
+
+
+class EmbeddingCache:
+    """Embeddings stored as float32 blobs in a SQLite file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS embedding_cache (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+
+    def get_many(self, keys: list[str]) -> dict[str, Embedding]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):  # keep under the SQLite variable limit
+                chunk = keys[i : i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM embedding_cache WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update({key: np.frombuffer(value, dtype=np.float32).tolist() for key, value in rows})
+        return found
+
+    def set_many(self, items: dict[str, Embedding]):
+        rows = [(key, np.asarray(value, dtype=np.float32).tobytes()) for key, value in items.items()]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO embedding_cache (key, value) VALUES (?, ?)", rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+
+_caches: dict[Path, EmbeddingCache] = {}
+
+
+def get_embedding_cache(path: Optional[Union[str, Path]] = None) -> EmbeddingCache:
+    """Return the cache shared by all users of the same cache file."""
+    path = Path(path or CONFIG_ROOT / "embedding_cache.sqlite3").resolve()
+    if path not in _caches:
+        _caches[path] = EmbeddingCache(path)
+    return _caches[path]
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests into batches of `batch_size`, running at most `max_concurrency`
+    batches at a time."""
+
+    def __init__(
+        self,
+        embed_batch: Callable[[list[str]], Awaitable[list[Embedding]]],
+        batch_size: int,
+        max_concurrency: int = 4,
+        max_wait: float = 0.01,
+    ):
+        self.embed_batch = embed_batch
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait  # seconds a partial batch waits for more requests
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def embed(self, texts: list[str]) -> list[Embedding]:
+        self._bind_loop()
+        futures = []
+        for text in texts:
+            future = self._futures.get(text)
+            if future is None:
+                future = self._futures[text] = self._loop.create_future()
+                self._pending.append(text)
+            futures.append(future)
+
+        if len(self._pending) >= self.batch_size:
+            self._flush(full_only=True)
+        if self._pending and self._timer is None:
+            self._timer = self._loop.call_later(self.max_wait, self._flush)
+        # Shielded, since other requests may wait for the same futures.
+        return list(await asyncio.gather(*[asyncio.shield(i) for i in futures]))
+
+    def _bind_loop(self):
+        """Futures and semaphores are bound to an event loop, start over in a new one."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._pending: list[str] = []
+            self._futures: dict[str, asyncio.Future] = {}
+            self._timer: Optional[asyncio.TimerHandle] = None
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._tasks: set[asyncio.Task] = set()
+
+    def _flush(self, full_only: bool = False):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending and (len(self._pending) >= self.batch_size or not full_only):
+            batch, self._pending = self._pending[: self.batch_size], self._pending[self.batch_size :]
+            task = self._loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[str]):
+        futures = [self._futures[text] for text in batch]
+        try:
+            async with self._semaphore:
+                embeddings = await self.embed_batch(batch)
+            for future, embedding in zip(futures, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for text in batch:
+                self._futures.pop(text, None)
+
+
+class CachedEmbedding(BaseEmbedding):
+    """An embedding model with an on-disk cache and batched, concurrent embedding of cache misses."""
+
+    embed_model: BaseEmbedding = Field(description="The wrapped embedding model.")
+    max_concurrency: int = Field(default=4, description="Max concurrent batch requests to the embedding model.")
+    embed_batch_size: int = Field(default=_UNBATCHED, gt=0, le=2048)
+
+    _cache: Optional[EmbeddingCache] = PrivateAttr(default=None)
+    _batcher: EmbeddingBatcher = PrivateAttr()
+    _namespace: str = PrivateAttr()
+
+    def __init__(self, embed_model: BaseEmbedding, cache: Optional[EmbeddingCache] = None, **kwargs: Any):
+        super().__init__(embed_model=embed_model, model_name=embed_model.model_name, **kwargs)
+        self._cache = cache
+        self._batcher = EmbeddingBatcher(
+            self.embed_model.aget_text_embedding_batch,
+            batch_size=self.embed_model.embed_batch_size,
+            max_concurrency=self.max_concurrency,
+        )
+        dimensions = getattr(embed_model, "dimensions", None)
+        self._namespace = f"{embed_model.class_name()}:{embed_model.model_name}:{dimensions}"
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self._namespace}:{kind}:{text}".encode("utf-8")).hexdigest()
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        key = self._key("query", query)
+        cached = self._cache.get_many([key]) if self._cache is not None else {}
+        if key in cached:
+            return cached[key]
+        embedding = self.embed_model.get_query_embedding(query)
+        if self._cache is not None:
+            self._cache.set_many({key: embedding})
+        return embedding
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        key = self._key("query", query)
+        cached = await asyncio.to_thread(self._cache.get_many, [key]) if self._cache is not None else {}
+        if key in cached:
+            return cached[key]
+        embedding = await self.embed_model.aget_query_embedding(query)
+        if self._cache is not None:
+            await asyncio.to_thread(self._cache.set_many, {key: embedding})
+        return embedding
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return (await self._aget_text_embeddings([text]))[0]
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        keys = [self._key("text", text) for text in texts]
+        found = self._cache.get_many(keys) if self._cache is not None else {}
+        misses = list(dict.fromkeys(text for text, key in zip(texts, keys) if key not in found))
+        if misses:
+            size = self.embed_model.embed_batch_size
+            batches = [misses[i : i + size] for i in range(0, len(misses), size)]
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(batches)))) as executor:
+                embeddings = [
+                    i for batch in executor.map(self.embed_model.get_text_embedding_batch, batches) for i in batch
+                ]
+            new = {self._key("text", text): embedding for text, embedding in zip(misses, embeddings)}
+            if self._cache is not None:
+                self._cache.set_many(new)
+            found.update(new)
+        return [found[key] for key in keys]
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[Embedding]:
+        keys = [self._key("text", text) for text in texts]
+        found = await asyncio.to_thread(self._cache.get_many, keys) if self._cache is not None else {}
+        misses = list(dict.fromkeys(text for text, key in zip(texts, keys) if key not in found))
+        if misses:
+            embeddings = await self._batcher.embed(misses)
+            new = {self._key("text", text): embedding for text, embedding in zip(misses, embeddings)}
+            if self._cache is not None:
+                await asyncio.to_thread(self._cache.set_many, new)
+            found.update(new)
+        return [found[key] for key in keys]
+
+
+def wrap_embedding_cache(embed_model: BaseEmbedding) -> BaseEmbedding:
+    """Wrap the embedding with the shared embedding cache if `embedding.cache` is enabled in config."""
+    if not config.embedding.cache:
+        return embed_model
+
+    return CachedEmbedding(
+        embed_model=embed_model,
+        cache=get_embedding_cache(config.embedding.cache_path),
+        max_concurrency=config.embedding.max_concurrency,
+    )
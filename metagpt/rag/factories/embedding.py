@@ -12,6 +12,7 @@ from llama_index.embeddings.openai import OpenAIEmbedding
 from metagpt.config2 import config
 from metagpt.configs.embedding_config import EmbeddingType
 from metagpt.configs.llm_config import LLMType
+from metagpt.rag.cached_embedding import wrap_embedding_cache
 from metagpt.rag.factories.base import GenericFactory
 
 
@@ -32,7 +33,7 @@ class RAGEmbeddingFactory(GenericFactory):
 
     def get_rag_embedding(self, key: EmbeddingType = None) -> BaseEmbedding:
         """Key is EmbeddingType."""
-        return super().get_instance(key or self._resolve_embedding_type())
+        return wrap_embedding_cache(super().get_instance(key or self._resolve_embedding_type()))
 
     def _resolve_embedding_type(self) -> EmbeddingType | LLMType:
         """Resolves the embedding type.
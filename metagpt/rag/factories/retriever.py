@@ -62,14 +62,21 @@ class RetrieverFactory(ConfigBasedFactory):
     def get_retriever(self, configs: list[BaseRetrieverConfig] = None, **kwargs) -> RAGRetriever:
         """Creates and returns a retriever instance based on the provided configurations.
 
-        If multiple retrievers, using SimpleHybridRetriever.
+        If multiple retrievers, using SimpleHybridRetriever, fusing the results by the weight of each config.
         """
         if not configs:
             return self._create_default(**kwargs)
 
         retrievers = super().get_instances(configs, **kwargs)
 
-        return SimpleHybridRetriever(*retrievers) if len(retrievers) > 1 else retrievers[0]
+        if len(retrievers) == 1:
+            return retrievers[0]
+
+        return SimpleHybridRetriever(
+            *retrievers,
+            weights=[config.weight for config in configs],
+            timeouts=[config.timeout for config in configs],
+        )
 
     def _create_default(self, **kwargs) -> RAGRetriever:
         index = self._extract_index(None, **kwargs) or self._build_default_index(**kwargs)
@@ -84,8 +91,9 @@ class RetrieverFactory(ConfigBasedFactory):
     def _create_bm25_retriever(self, config: BM25RetrieverConfig, **kwargs) -> DynamicBM25Retriever:
         index = self._extract_index(config, **kwargs)
         nodes = list(index.docstore.docs.values()) if index else self._extract_nodes(config, **kwargs)
+        persist_path = self._val_from_config_or_kwargs("persist_path", config, **kwargs)
 
-        return DynamicBM25Retriever(nodes=nodes, **config.model_dump())
+        return DynamicBM25Retriever(nodes=nodes, persist_path=persist_path, **config.model_dump())
 
     def _create_chroma_retriever(self, config: ChromaRetrieverConfig, **kwargs) -> ChromaRetriever:
         config.index = self._build_chroma_index(config, **kwargs)
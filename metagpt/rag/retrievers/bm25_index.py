@@ -0,0 +1,260 @@
+"""Incremental BM25 index.
+
+Keeps document frequencies, document lengths and postings, so that adding or deleting documents costs time
+proportional to those documents instead of rebuilding `BM25Okapi` over the whole corpus. Scores are the same as
+`rank_bm25.BM25Okapi`, computed with vectorized operations over the postings of the query terms.
+
+Postings persisted by `persist` are stored as CSR arrays and memory-mapped by `load`; later additions are kept in
+memory until the next `persist`.
+"""
+
+import json
+import math
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+_META_FILE = "bm25_meta.json"
+_ARRAY_FILES = ("term_ptr", "doc_ids", "tfs", "doc_len")
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    """Return an array with capacity for at least `size` items, doubling to amortize appends."""
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array), 16), dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+class BM25Index:
+    """BM25Okapi over postings with incremental adds and deletes."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        self._vocab: dict[str, int] = {}
+        self._df = np.zeros(0, dtype=np.int64)
+        self._doc_len = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._num_docs = 0  # including deleted documents, i.e. the next doc id
+        self._num_alive = 0
+        self._total_len = 0
+
+        # Persisted postings, possibly memory-mapped, in CSR layout: the postings of term t are
+        # doc_ids[term_ptr[t]:term_ptr[t + 1]].
+        self._term_ptr = np.zeros(1, dtype=np.int64)
+        self._doc_ids = np.zeros(0, dtype=np.int32)
+        self._tfs = np.zeros(0, dtype=np.int32)
+        # Postings added since then, by term id.
+        self._delta: dict[int, tuple[list[int], list[int]]] = {}
+        self._delta_arrays: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+
+        self._idf: Optional[np.ndarray] = None
+        self._norm: Optional[np.ndarray] = None
+
+    @property
+    def num_docs(self) -> int:
+        """Number of doc ids, including deleted documents not compacted yet."""
+        return self._num_docs
+
+    @property
+    def num_alive(self) -> int:
+        return self._num_alive
+
+    @property
+    def num_deleted(self) -> int:
+        return self._num_docs - self._num_alive
+
+    def add(self, corpus: list[list[str]]) -> list[int]:
+        """Add tokenized documents and return their doc ids."""
+        start = self._num_docs
+        end = start + len(corpus)
+        self._doc_len = _grow(self._doc_len, end)
+        self._alive = _grow(self._alive, end)
+        for doc_id, tokens in enumerate(corpus, start=start):
+            for term, tf in Counter(tokens).items():
+                term_id = self._vocab.get(term)
+                if term_id is None:
+                    term_id = self._vocab[term] = len(self._vocab)
+                    self._df = _grow(self._df, term_id + 1)
+                self._df[term_id] += 1
+                docs, tfs = self._delta.setdefault(term_id, ([], []))
+                docs.append(doc_id)
+                tfs.append(tf)
+                self._delta_arrays.pop(term_id, None)
+            self._doc_len[doc_id] = len(tokens)
+            self._alive[doc_id] = True
+            self._total_len += len(tokens)
+        self._num_docs = end
+        self._num_alive += len(corpus)
+        self._invalidate()
+        return list(range(start, end))
+
+    def delete(self, doc_id: int, tokens: list[str]):
+        """Delete a document by its doc id and the tokens it was added with.
+
+        The postings of the document stay until `compact`, it is only excluded from document frequencies and scores.
+        """
+        if not (0 <= doc_id < self._num_docs) or not self._alive[doc_id]:
+            raise KeyError(f"Document {doc_id} not found")
+        for term in set(tokens):
+            self._df[self._vocab[term]] -= 1
+        self._alive[doc_id] = False
+        self._total_len -= int(self._doc_len[doc_id])
+        self._num_alive -= 1
+        self._invalidate()
+
+    def compact(self) -> np.ndarray:
+        """Drop the postings of deleted documents and renumber the documents.
+
+        Returns:
+            The old doc ids of the alive documents, in their new order.
+        """
+        kept = np.flatnonzero(self._alive[: self._num_docs])
+        new_ids = np.full(self._num_docs, -1, dtype=np.int64)
+        new_ids[kept] = np.arange(len(kept))
+
+        term_ptr = np.zeros(len(self._vocab) + 1, dtype=np.int64)
+        doc_ids, tfs = [], []
+        for term_id in range(len(self._vocab)):
+            docs, freqs = self._term_postings(term_id)
+            mapped = new_ids[docs]
+            mask = mapped >= 0
+            doc_ids.append(mapped[mask].astype(np.int32))
+            tfs.append(freqs[mask].astype(np.int32))
+            term_ptr[term_id + 1] = term_ptr[term_id] + int(mask.sum())
+
+        self._term_ptr = term_ptr
+        self._doc_ids = np.concatenate(doc_ids) if doc_ids else np.zeros(0, dtype=np.int32)
+        self._tfs = np.concatenate(tfs) if tfs else np.zeros(0, dtype=np.int32)
+        self._delta.clear()
+        self._delta_arrays.clear()
+        self._doc_len = self._doc_len[kept].copy()
+        self._alive = np.ones(len(kept), dtype=bool)
+        self._num_docs = self._num_alive = len(kept)
+        self._invalidate()
+        return kept
+
+    def get_scores(self, query: list[str]) -> np.ndarray:
+        """Return the BM25 score of every doc id, deleted documents score 0."""
+        scores = np.zeros(self._num_docs)
+        if not self._num_alive:
+            return scores
+        idf, norm = self._get_idf(), self._get_norm()
+        for term in query:
+            term_id = self._vocab.get(term)
+            if term_id is None:
+                continue
+            docs, tfs = self._term_postings(term_id)
+            scores[docs] += idf[term_id] * (tfs * (self.k1 + 1) / (tfs + norm[docs]))
+        scores[~self._alive[: self._num_docs]] = 0.0
+        return scores
+
+    def top_k(self, query: list[str], k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return the doc ids and scores of the top `k` alive documents, best first."""
+        scores = self.get_scores(query)
+        alive = np.flatnonzero(self._alive[: self._num_docs])
+        k = min(k, len(alive))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        candidates = alive
+        if k < len(alive):
+            candidates = alive[np.argpartition(-scores[alive], k - 1)[:k]]
+        order = np.lexsort((candidates, -scores[candidates]))
+        top = candidates[order]
+        return top, scores[top]
+
+    def persist(self, persist_dir: Union[str, Path], doc_keys: list[str], **meta):
+        """Compact and save the index. `doc_keys` identify the documents in doc id order after compaction."""
+        if self.num_deleted or self._delta:
+            self.compact()
+        if len(doc_keys) != self._num_docs:
+            raise ValueError(f"Expected {self._num_docs} doc keys, got {len(doc_keys)}")
+        persist_dir = Path(persist_dir)
+        persist_dir.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "term_ptr": self._term_ptr,
+            "doc_ids": self._doc_ids,
+            "tfs": self._tfs,
+            "doc_len": self._doc_len[: self._num_docs],
+        }
+        for name in _ARRAY_FILES:
+            np.save(persist_dir / f"{name}.npy", arrays[name])
+        vocab = sorted(self._vocab, key=self._vocab.get)
+        data = {"k1": self.k1, "b": self.b, "epsilon": self.epsilon, "vocab": vocab, "doc_keys": doc_keys, **meta}
+        (persist_dir / _META_FILE).write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def exists(cls, persist_dir: Union[str, Path]) -> bool:
+        persist_dir = Path(persist_dir)
+        return (persist_dir / _META_FILE).exists() and all(
+            (persist_dir / f"{name}.npy").exists() for name in _ARRAY_FILES
+        )
+
+    @classmethod
+    def load(cls, persist_dir: Union[str, Path], mmap: bool = True) -> tuple["BM25Index", dict]:
+        """Load an index saved by `persist`, memory-mapping the postings if `mmap` is True.
+
+        Returns:
+            The index and the metadata saved with it, including `doc_keys`.
+        """
+        persist_dir = Path(persist_dir)
+        meta = json.loads((persist_dir / _META_FILE).read_text(encoding="utf-8"))
+        arrays = {name: np.load(persist_dir / f"{name}.npy", mmap_mode="r" if mmap else None) for name in _ARRAY_FILES}
+        index = cls(k1=meta.pop("k1"), b=meta.pop("b"), epsilon=meta.pop("epsilon"))
+        index._vocab = {term: term_id for term_id, term in enumerate(meta.pop("vocab"))}
+        index._term_ptr = arrays["term_ptr"]
+        index._doc_ids = arrays["doc_ids"]
+        index._tfs = arrays["tfs"]
+        index._df = np.diff(np.asarray(arrays["term_ptr"])).astype(np.int64)
+        index._doc_len = np.array(arrays["doc_len"], dtype=np.int64)
+        index._num_docs = index._num_alive = len(index._doc_len)
+        index._alive = np.ones(index._num_docs, dtype=bool)
+        index._total_len = int(index._doc_len.sum())
+        return index, meta
+
+    def _term_postings(self, term_id: int) -> tuple[np.ndarray, np.ndarray]:
+        docs = tfs = None
+        if term_id + 1 < len(self._term_ptr):
+            start, end = self._term_ptr[term_id], self._term_ptr[term_id + 1]
+            docs, tfs = self._doc_ids[start:end], self._tfs[start:end]
+        if term_id in self._delta:
+            if term_id not in self._delta_arrays:
+                delta_docs, delta_tfs = self._delta[term_id]
+                self._delta_arrays[term_id] = (np.array(delta_docs, dtype=np.int32), np.array(delta_tfs, np.int32))
+            delta_docs, delta_tfs = self._delta_arrays[term_id]
+            if docs is None:
+                return delta_docs, delta_tfs
+            return np.concatenate([docs, delta_docs]), np.concatenate([tfs, delta_tfs])
+        if docs is None:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+        return docs, tfs
+
+    def _get_idf(self) -> np.ndarray:
+        """IDF of every term, floored at epsilon * average idf like `BM25Okapi`."""
+        if self._idf is None:
+            df = self._df[: len(self._vocab)].astype(np.float64)
+            present = df > 0
+            idf = np.zeros(len(df))
+            idf[present] = np.log(self._num_alive - df[present] + 0.5) - np.log(df[present] + 0.5)
+            average_idf = idf[present].mean() if present.any() else 0.0
+            idf[present & (idf < 0)] = self.epsilon * average_idf
+            self._idf = idf
+        return self._idf
+
+    def _get_norm(self) -> np.ndarray:
+        """The document length normalization k1 * (1 - b + b * dl / avgdl) of every doc id."""
+        if self._norm is None:
+            avgdl = self._total_len / self._num_alive
+            doc_len = self._doc_len[: self._num_docs]
+            self._norm = self.k1 * (1 - self.b + self.b * doc_len / avgdl) if avgdl else np.full(len(doc_len), math.inf)
+        return self._norm
+
+    def _invalidate(self):
+        self._idf = None
+        self._norm = None
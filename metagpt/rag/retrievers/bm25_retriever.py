@@ -1,16 +1,28 @@
 """BM25 retriever."""
-from typing import Callable, Optional
+from pathlib import Path
+from typing import Callable, Optional, Union
 
 from llama_index.core import VectorStoreIndex
 from llama_index.core.callbacks.base import CallbackManager
 from llama_index.core.constants import DEFAULT_SIMILARITY_TOP_K
-from llama_index.core.schema import BaseNode, IndexNode
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import BaseNode, IndexNode, NodeWithScore, QueryBundle
 from llama_index.retrievers.bm25 import BM25Retriever
-from rank_bm25 import BM25Okapi
+from llama_index.retrievers.bm25.base import tokenize_remove_stopwords
+
+from metagpt.logs import logger
+from metagpt.rag.retrievers.bm25_index import BM25Index
 
 
 class DynamicBM25Retriever(BM25Retriever):
-    """BM25 retriever."""
+    """BM25 retriever.
+
+    Backed by an incremental `BM25Index`, so adding or deleting nodes only tokenizes those nodes. The postings are
+    persisted to `persist_dir/bm25` next to the index storage, and memory-mapped when created again with the same
+    `persist_path` and nodes.
+    """
+
+    PERSIST_SUBDIR = "bm25"
 
     def __init__(
         self,
@@ -22,28 +34,105 @@ class DynamicBM25Retriever(BM25Retriever):
         object_map: Optional[dict] = None,
         verbose: bool = False,
         index: VectorStoreIndex = None,
+        persist_path: Optional[Union[str, Path]] = None,
     ) -> None:
-        super().__init__(
-            nodes=nodes,
-            tokenizer=tokenizer,
-            similarity_top_k=similarity_top_k,
+        self._tokenizer = tokenizer or tokenize_remove_stopwords
+        self._similarity_top_k = similarity_top_k
+        self._index = index
+        self._doc_nodes: list[Optional[BaseNode]] = []  # by doc id of the bm25 index, None if deleted
+        self._doc_ids: dict[str, int] = {}  # node id => doc id
+        if not persist_path or not self._load(Path(persist_path) / self.PERSIST_SUBDIR, nodes):
+            self.bm25 = BM25Index()
+            self._add_to_bm25(nodes)
+        BaseRetriever.__init__(
+            self,
             callback_manager=callback_manager,
             object_map=object_map,
             objects=objects,
             verbose=verbose,
         )
-        self._index = index
+
+    @property
+    def _nodes(self) -> list[BaseNode]:
+        return [node for node in self._doc_nodes if node is not None]
 
     def add_nodes(self, nodes: list[BaseNode], **kwargs) -> None:
         """Support add nodes."""
-        self._nodes.extend(nodes)
-        self._corpus = [self._tokenizer(node.get_content()) for node in self._nodes]
-        self.bm25 = BM25Okapi(self._corpus)
+        self._add_to_bm25(nodes)
 
         if self._index:
             self._index.insert_nodes(nodes, **kwargs)
 
+    def delete_nodes(self, node_ids: list[str], **kwargs) -> None:
+        """Support delete nodes."""
+        for node_id in node_ids:
+            self._delete_from_bm25(node_id)
+        if self.bm25.num_deleted > self.bm25.num_alive:
+            self._compact()
+
+        if self._index:
+            self._index.delete_nodes(node_ids, **kwargs)
+
     def persist(self, persist_dir: str, **kwargs) -> None:
         """Support persist."""
         if self._index:
             self._index.storage_context.persist(persist_dir)
+
+        self._compact()
+        self.bm25.persist(
+            Path(persist_dir) / self.PERSIST_SUBDIR,
+            doc_keys=[node.node_id for node in self._doc_nodes],
+            tokenizer=self._tokenizer_name(),
+        )
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        if query_bundle.custom_embedding_strs or query_bundle.embedding:
+            logger.warning("BM25Retriever does not support embeddings, skipping...")
+
+        doc_ids, scores = self.bm25.top_k(self._tokenizer(query_bundle.query_str), self._similarity_top_k)
+        return [NodeWithScore(node=self._doc_nodes[i], score=float(s)) for i, s in zip(doc_ids, scores)]
+
+    def _get_scored_nodes(self, query: str) -> list[NodeWithScore]:
+        scores = self.bm25.get_scores(self._tokenizer(query))
+        return [NodeWithScore(node=node, score=float(scores[i])) for i, node in enumerate(self._doc_nodes) if node]
+
+    def _add_to_bm25(self, nodes: list[BaseNode]):
+        for node in nodes:
+            if node.node_id in self._doc_ids:  # re-adding a node replaces it
+                self._delete_from_bm25(node.node_id)
+        doc_ids = self.bm25.add([self._tokenizer(node.get_content()) for node in nodes])
+        for doc_id, node in zip(doc_ids, nodes):
+            self._doc_nodes.append(node)
+            self._doc_ids[node.node_id] = doc_id
+
+    def _delete_from_bm25(self, node_id: str):
+        doc_id = self._doc_ids.pop(node_id, None)
+        if doc_id is None:
+            return
+        node = self._doc_nodes[doc_id]
+        self.bm25.delete(doc_id, self._tokenizer(node.get_content()))
+        self._doc_nodes[doc_id] = None
+
+    def _compact(self):
+        if not self.bm25.num_deleted:
+            return
+        kept = self.bm25.compact()
+        self._doc_nodes = [self._doc_nodes[i] for i in kept]
+        self._doc_ids = {node.node_id: doc_id for doc_id, node in enumerate(self._doc_nodes)}
+
+    def _load(self, persist_dir: Path, nodes: list[BaseNode]) -> bool:
+        """Load persisted postings if they were built from the same nodes with the same tokenizer."""
+        if not BM25Index.exists(persist_dir):
+            return False
+        bm25, meta = BM25Index.load(persist_dir)
+        nodes_by_id = {node.node_id: node for node in nodes}
+        if meta.get("tokenizer") != self._tokenizer_name() or set(meta["doc_keys"]) != nodes_by_id.keys():
+            logger.info(f"Rebuild bm25 index, the persisted one in {persist_dir} is stale")
+            return False
+        self.bm25 = bm25
+        self._doc_nodes = [nodes_by_id[node_id] for node_id in meta["doc_keys"]]
+        self._doc_ids = {node_id: doc_id for doc_id, node_id in enumerate(meta["doc_keys"])}
+        return True
+
+    def _tokenizer_name(self) -> str:
+        return f"{getattr(self._tokenizer, '__module__', '')}.{getattr(self._tokenizer, '__qualname__', '')}"
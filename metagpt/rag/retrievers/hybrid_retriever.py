@@ -1,41 +1,121 @@
 """Hybrid retriever."""
 
-import copy
+import asyncio
+import dataclasses
+import time
+from enum import Enum
+from typing import Optional
 
-from llama_index.core.schema import BaseNode, QueryType
+from llama_index.core.indices.vector_store.retrievers import VectorIndexRetriever
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryBundle, QueryType
+from llama_index.core.vector_stores.types import BasePydanticVectorStore
 
+from metagpt.logs import logger
 from metagpt.rag.retrievers.base import RAGRetriever
 
 
+class FusionMode(str, Enum):
+    """How SimpleHybridRetriever merges the results of its retrievers."""
+
+    RECIPROCAL_RANK = "reciprocal_rank"  # sum of weight / (k + rank), robust to scores on different scales
+    RELATIVE_SCORE = "relative_score"  # sum of weight * min-max normalized score
+
+
 class SimpleHybridRetriever(RAGRetriever):
-    """A composite retriever that aggregates search results from multiple retrievers."""
+    """A composite retriever that aggregates search results from multiple retrievers.
 
-    def __init__(self, *retrievers):
+    The retrievers are queried concurrently, so the latency is that of the slowest one rather than the sum, and a
+    retriever exceeding its timeout is skipped. Retrievers without a native async path, such as BM25 or FAISS, run in
+    worker threads so that they neither block the event loop nor each other. The results are fused by `fusion_mode`
+    into one ranking, the score of each node is its fused score.
+    """
+
+    def __init__(
+        self,
+        *retrievers,
+        fusion_mode: FusionMode = FusionMode.RECIPROCAL_RANK,
+        weights: Optional[list[float]] = None,
+        timeouts: Optional[list[Optional[float]]] = None,
+        rrf_k: int = 60,
+    ):
         self.retrievers: list[RAGRetriever] = retrievers
+        self.fusion_mode = FusionMode(fusion_mode)
+        self.weights = weights or [1.0] * len(retrievers)
+        self.timeouts = timeouts or [None] * len(retrievers)
+        self.rrf_k = rrf_k
+        # Latency of each retriever in the last query, None if it timed out
+        self.latencies: dict[str, Optional[float]] = {}
         super().__init__()
 
     async def _aretrieve(self, query: QueryType, **kwargs):
-        """Asynchronously retrieves and aggregates search results from all configured retrievers.
+        """Asynchronously retrieves and fuses search results from all configured retrievers.
 
-        This method queries each retriever in the `retrievers` list with the given query and
-        additional keyword arguments. It then combines the results, ensuring that each node is
-        unique, based on the node's ID.
+        This method queries the retrievers in the `retrievers` list concurrently with the given query and additional
+        keyword arguments. It then fuses the results into one list of unique nodes, based on the node's ID, ordered by
+        the fused score.
         """
-        all_nodes = []
-        for retriever in self.retrievers:
-            # Prevent retriever changing query
-            query_copy = copy.deepcopy(query)
-            nodes = await retriever.aretrieve(query_copy, **kwargs)
-            all_nodes.extend(nodes)
-
-        # combine all nodes
-        result = []
-        node_ids = set()
-        for n in all_nodes:
-            if n.node.node_id not in node_ids:
-                result.append(n)
-                node_ids.add(n.node.node_id)
-        return result
+        results = await asyncio.gather(
+            *[self._timed_retrieve(i, retriever, query, **kwargs) for i, retriever in enumerate(self.retrievers)]
+        )
+        return self._fuse(results)
+
+    async def _timed_retrieve(self, i: int, retriever: RAGRetriever, query: QueryType, **kwargs) -> list[NodeWithScore]:
+        name = f"{type(retriever).__name__}[{i}]"
+        # Prevent retriever changing query, retrievers reassign fields such as the embedding but never mutate them.
+        query_copy = dataclasses.replace(query) if isinstance(query, QueryBundle) else query
+        start = time.perf_counter()
+        if self._is_sync_backed(retriever):
+            aw = asyncio.to_thread(retriever.retrieve, query_copy, **kwargs)
+        else:
+            aw = retriever.aretrieve(query_copy, **kwargs)
+        try:
+            # A timed out thread runs on in the background, its result is dropped
+            nodes = await asyncio.wait_for(aw, timeout=self.timeouts[i])
+        except asyncio.TimeoutError:
+            logger.warning(f"Retriever {name} timed out after {self.timeouts[i]}s, skipped")
+            self.latencies[name] = None
+            return []
+        self.latencies[name] = time.perf_counter() - start
+        logger.debug(f"Retriever {name} took {self.latencies[name]:.3f}s, {len(nodes)} nodes")
+        return nodes
+
+    @staticmethod
+    def _is_sync_backed(retriever: RAGRetriever) -> bool:
+        """Whether the async path of the retriever merely calls its blocking sync one, as llama_index's default does."""
+        if getattr(type(retriever), "_aretrieve", None) is BaseRetriever._aretrieve:
+            return True
+        if isinstance(retriever, VectorIndexRetriever):
+            return type(retriever._vector_store).aquery is BasePydanticVectorStore.aquery
+        return False
+
+    def _fuse(self, results: list[list[NodeWithScore]]) -> list[NodeWithScore]:
+        fused: dict[str, float] = {}
+        nodes: dict[str, BaseNode] = {}
+        for weight, result in zip(self.weights, results):
+            for node_id, score in self._fusion_scores(result).items():
+                fused[node_id] = fused.get(node_id, 0.0) + weight * score
+            for n in result:
+                nodes.setdefault(n.node.node_id, n.node)
+
+        ranked = sorted(fused, key=fused.get, reverse=True)
+        return [NodeWithScore(node=nodes[node_id], score=fused[node_id]) for node_id in ranked]
+
+    def _fusion_scores(self, result: list[NodeWithScore]) -> dict[str, float]:
+        """Score the nodes of one retriever, a node returned more than once keeps its best score."""
+        scores: dict[str, float] = {}
+        if self.fusion_mode == FusionMode.RECIPROCAL_RANK:
+            ranked = sorted(result, key=lambda n: n.score or 0.0, reverse=True)
+            for rank, n in enumerate(ranked, start=1):
+                scores.setdefault(n.node.node_id, 1.0 / (self.rrf_k + rank))
+            return scores
+
+        raw = [n.score or 0.0 for n in result]
+        low, high = (min(raw), max(raw)) if raw else (0.0, 0.0)
+        for n, score in zip(result, raw):
+            normalized = (score - low) / (high - low) if high > low else 1.0
+            scores[n.node.node_id] = max(scores.get(n.node.node_id, 0.0), normalized)
+        return scores
 
     def add_nodes(self, nodes: list[BaseNode]) -> None:
         """Support add nodes."""
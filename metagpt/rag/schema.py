@@ -24,6 +24,12 @@ class BaseRetrieverConfig(BaseModel):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
     similarity_top_k: int = Field(default=5, description="Number of top-k similar results to return during retrieval.")
+    weight: float = Field(
+        default=1.0, exclude=True, description="Weight of the results when fused with other retrievers' results."
+    )
+    timeout: Optional[float] = Field(
+        default=None, exclude=True, description="Seconds to wait when querying together with other retrievers."
+    )
 
 
 class IndexRetrieverConfig(BaseRetrieverConfig):
@@ -12,16 +12,20 @@ This script is designed to create a symbols repository from the provided source
 from __future__ import annotations
 
 import ast
+import hashlib
 import json
+import os
 import re
+import shutil
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 
 import pandas as pd
 from pydantic import BaseModel, Field, field_validator
 
-from metagpt.const import AGGREGATION, COMPOSITION, GENERALIZATION
+from metagpt.const import AGGREGATION, COMPOSITION, CONFIG_ROOT, GENERALIZATION
 from metagpt.logs import logger
 from metagpt.utils.common import any_to_str, aread, remove_white_spaces
 from metagpt.utils.exceptions import handle_exception
@@ -419,15 +423,39 @@ class DotClassMethod(BaseModel):
         return attrs
 
 
+SYMBOL_CACHE_ROOT = CONFIG_ROOT / "symbol_cache"
+
+
+def get_symbol_cache_dir(config=None) -> Optional[Path]:
+    """Return `SYMBOL_CACHE_ROOT` if `config.symbol_cache` is on, else None. Defaults to the global config."""
+    if config is None:
+        from metagpt.config2 import config
+    return SYMBOL_CACHE_ROOT if config.symbol_cache else None
+
+
+# Below this number of files to parse, a process pool costs more than it saves.
+MIN_FILES_FOR_POOL = 64
+
+
 class RepoParser(BaseModel):
     """
     Tool to build a symbols repository from a project directory.
 
+    `generate_symbols` parses the files in a process pool if there are many. With a `cache_dir`, e.g. the one of
+    `get_symbol_cache_dir`, the symbols of each file are cached on disk by the hash of its content, so only the files
+    changed since the last call are parsed, and files with unchanged modification time and size are not even read.
+    Likewise, `rebuild_class_views` reuses the `pyreverse` output of an unchanged tree. One cache file of each kind is
+    kept per project directory.
+
     Attributes:
         base_directory (Path): The base directory of the project.
+        cache_dir (Optional[Path]): The directory of the symbol caches, None (the default) to not cache on disk.
+        max_workers (int): The max number of processes parsing files, 0 for the number of CPUs.
     """
 
     base_directory: Path = Field(default=None)
+    cache_dir: Optional[Path] = None
+    max_workers: int = 0
 
     @classmethod
     @handle_exception(exception_type=Exception, default_return=[])
@@ -477,19 +505,74 @@ class RepoParser(BaseModel):
         Returns:
             List[RepoFileInfo]: A list of RepoFileInfo objects containing the extracted information.
         """
-        files_classes = []
         directory = self.base_directory
 
         matching_files = []
         extensions = ["*.py"]
         for ext in extensions:
             matching_files += directory.rglob(ext)
+
+        cache = self._load_symbol_cache()
+        entries, changed = {}, []
         for path in matching_files:
-            tree = self._parse_file(path)
-            file_info = self.extract_class_and_function_info(tree, path)
-            files_classes.append(file_info)
+            key = path.relative_to(directory).as_posix()
+            stat = path.stat()
+            entry = cache.get(key)
+            if entry and entry["stat"] == [stat.st_mtime_ns, stat.st_size]:
+                entries[key] = entry
+                continue
+            content_hash = _hash_file(path)
+            if entry and entry["hash"] == content_hash:
+                entries[key] = {**entry, "stat": [stat.st_mtime_ns, stat.st_size]}
+            else:
+                entries[key] = {"stat": [stat.st_mtime_ns, stat.st_size], "hash": content_hash, "info": None}
+                changed.append(path)
+
+        for path, info in zip(changed, self._parse_files(changed)):
+            entries[path.relative_to(directory).as_posix()]["info"] = info
+        if changed or entries.keys() != cache.keys() or any(cache[k]["stat"] != v["stat"] for k, v in entries.items()):
+            self._save_symbol_cache(entries)
+        logger.debug(f"Parsed {len(changed)} of {len(entries)} files in {directory}")
+
+        return [_load_file_info(entries[path.relative_to(directory).as_posix()]["info"]) for path in matching_files]
+
+    def _parse_files(self, paths: List[Path]) -> List[dict]:
+        """Parse files, in a process pool if there are many."""
+        max_workers = self.max_workers or os.cpu_count() or 1
+        if len(paths) < MIN_FILES_FOR_POOL or max_workers == 1:
+            return [_parse_symbols(self.base_directory, i) for i in paths]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunksize = max(1, len(paths) // (max_workers * 4))
+            return list(executor.map(_parse_symbols, [self.base_directory] * len(paths), paths, chunksize=chunksize))
+
+    @property
+    def _symbol_cache_path(self) -> Optional[Path]:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha256(str(self.base_directory.resolve()).encode("utf-8")).hexdigest()[:32]
+        return Path(self.cache_dir) / f"{digest}.json"
 
-        return files_classes
+    def _load_symbol_cache(self) -> Dict[str, dict]:
+        pathname = self._symbol_cache_path
+        if not pathname or not pathname.exists():
+            return {}
+        try:
+            data = json.loads(pathname.read_text(encoding="utf-8"))
+        except ValueError as e:
+            logger.warning(f"Ignore the broken symbol cache {pathname}: {e}")
+            return {}
+        return data.get("files", {}) if data.get("version") == SYMBOL_CACHE_VERSION else {}
+
+    @handle_exception
+    def _save_symbol_cache(self, entries: Dict[str, dict]):
+        pathname = self._symbol_cache_path
+        if not pathname:
+            return
+        pathname.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": SYMBOL_CACHE_VERSION, "base_directory": str(self.base_directory), "files": entries}
+        tmp = pathname.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, pathname)
 
     def generate_json_structure(self, output_path: Path):
         """
@@ -728,10 +811,20 @@ class RepoParser(BaseModel):
         command = f"pyreverse {str(path)} -o dot"
         output_dir = path / "__dot__"
         output_dir.mkdir(parents=True, exist_ok=True)
-        result = subprocess.run(command, shell=True, check=True, cwd=str(output_dir))
-        if result.returncode != 0:
-            raise ValueError(f"{result}")
         class_view_pathname = output_dir / "classes.dot"
+        # pyreverse names modules by the path, so the same tree at another path is another cache entry.
+        cached_pathname = self._class_view_cache_path(path)
+        if cached_pathname and cached_pathname.exists():
+            shutil.copyfile(cached_pathname, class_view_pathname)
+        else:
+            result = subprocess.run(command, shell=True, check=True, cwd=str(output_dir))
+            if result.returncode != 0:
+                raise ValueError(f"{result}")
+            if cached_pathname:
+                cached_pathname.parent.mkdir(parents=True, exist_ok=True)
+                for stale in cached_pathname.parent.glob(f"{cached_pathname.name.split('.')[0]}.*.classes.dot"):
+                    stale.unlink(missing_ok=True)  # the views of older versions of the tree
+                shutil.copyfile(class_view_pathname, cached_pathname)
         class_views = await self._parse_classes(class_view_pathname)
         relationship_views = await self._parse_class_relationships(class_view_pathname)
         packages_pathname = output_dir / "packages.dot"
@@ -742,6 +835,16 @@ class RepoParser(BaseModel):
         packages_pathname.unlink(missing_ok=True)
         return class_views, relationship_views, package_root
 
+    def _class_view_cache_path(self, path: Path) -> Optional[Path]:
+        """Return the cached `pyreverse` output of the tree, named by the hash of its path and of its files."""
+        if not self.cache_dir:
+            return None
+        path_digest = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:32]
+        digest = hashlib.sha256()
+        for pathname in sorted(i for i in path.rglob("*.py") if "__dot__" not in i.parts):
+            digest.update(f"{pathname.relative_to(path).as_posix()}:{_hash_file(pathname)}\n".encode("utf-8"))
+        return Path(self.cache_dir) / f"{path_digest}.{digest.hexdigest()[:32]}.classes.dot"
+
     @staticmethod
     async def _parse_classes(class_view_pathname: Path) -> List[DotClassInfo]:
         """
@@ -1010,6 +1113,26 @@ class RepoParser(BaseModel):
         return "." + full_key[0:ix]
 
 
+SYMBOL_CACHE_VERSION = 1
+
+
+def _hash_file(path: Path) -> str:
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+
+def _parse_symbols(base_directory: Path, path: Path) -> dict:
+    """Parse the symbols of a file, as a dict to cache it and to pass it between processes."""
+    repo_parser = RepoParser(base_directory=base_directory, cache_dir=None)
+    tree = repo_parser._parse_file(path)
+    return repo_parser.extract_class_and_function_info(tree, path).model_dump()
+
+
+def _load_file_info(data: dict) -> RepoFileInfo:
+    file_info = RepoFileInfo.model_validate(data)
+    file_info.page_info = [CodeBlockInfo.model_validate(i) for i in file_info.page_info]
+    return file_info
+
+
 def is_func(node) -> bool:
     """
     Returns True if the given node represents a function.
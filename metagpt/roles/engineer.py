@@ -19,6 +19,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 from collections import defaultdict
 from pathlib import Path
@@ -26,7 +27,12 @@ from typing import Optional, Set
 
 from metagpt.actions import Action, WriteCode, WriteCodeReview, WriteTasks
 from metagpt.actions.fix_bug import FixBug
-from metagpt.actions.project_management_an import REFINED_TASK_LIST, TASK_LIST
+from metagpt.actions.project_management_an import (
+    LOGIC_ANALYSIS,
+    REFINED_LOGIC_ANALYSIS,
+    REFINED_TASK_LIST,
+    TASK_LIST,
+)
 from metagpt.actions.summarize_code import SummarizeCode
 from metagpt.actions.write_code_plan_and_change_an import WriteCodePlanAndChange
 from metagpt.const import (
@@ -46,6 +52,7 @@ from metagpt.schema import (
     Documents,
     Message,
 )
+from metagpt.utils.code_context import mentions_file
 from metagpt.utils.common import any_to_name, any_to_str, any_to_str_set
 
 IS_PASS_PROMPT = """
@@ -67,7 +74,7 @@ class Engineer(Role):
         profile (str): Role profile, default is 'Engineer'.
         goal (str): Goal of the engineer.
         constraints (str): Constraints for the engineer.
-        n_borg (int): Number of borgs.
+        n_borg (int): Number of borgs, i.e. the max number of files written concurrently.
         use_code_review (bool): Whether to use code review.
     """
 
@@ -100,43 +107,111 @@ class Engineer(Role):
         return m.get(TASK_LIST.key) or m.get(REFINED_TASK_LIST.key)
 
     async def _act_sp_with_cr(self, review=False) -> Set[str]:
-        changed_files = set()
-        for todo in self.code_todos:
-            """
-            # Select essential information from the historical data to reduce the length of the prompt (summarized from human experience):
-            1. All from Architect
-            2. All from ProjectManager
-            3. Do we need other codes (currently needed)?
-            TODO: The goal is not to need it. After clear task decomposition, based on the design idea, you should be able to write a single file without needing other codes. If you can't, it means you need a clearer definition. This is the key to writing longer code.
-            """
-            coding_context = await todo.run()
-            # Code review
-            if review:
-                action = WriteCodeReview(i_context=coding_context, context=self.context, llm=self.llm)
-                self._init_action(action)
-                coding_context = await action.run()
-
-            dependencies = {coding_context.design_doc.root_relative_path, coding_context.task_doc.root_relative_path}
-            if self.config.inc:
-                dependencies.add(coding_context.code_plan_and_change_doc.root_relative_path)
-            await self.project_repo.srcs.save(
-                filename=coding_context.filename,
-                dependencies=list(dependencies),
-                content=coding_context.code_doc.content,
-            )
-            msg = Message(
-                content=coding_context.model_dump_json(),
-                instruct_content=coding_context,
-                role=self.profile,
-                cause_by=WriteCode,
-            )
-            self.rc.memory.add(msg)
-
-            changed_files.add(coding_context.code_doc.filename)
+        if self.n_borg > 1 and len(self.code_todos) > 1:
+            changed_files = await self._act_parallel_with_cr(review=review)
+        else:
+            changed_files = set()
+            for todo in self.code_todos:
+                changed_files.add(await self._write_code_with_cr(todo, review=review))
         if not changed_files:
             logger.info("Nothing has changed.")
         return changed_files
 
+    async def _write_code_with_cr(self, todo: WriteCode, review=False) -> str:
+        """
+        # Select essential information from the historical data to reduce the length of the prompt (summarized from human experience):
+        1. All from Architect
+        2. All from ProjectManager
+        3. Do we need other codes (currently needed)?
+        TODO: The goal is not to need it. After clear task decomposition, based on the design idea, you should be able to write a single file without needing other codes. If you can't, it means you need a clearer definition. This is the key to writing longer code.
+        """
+        coding_context = await todo.run()
+        # Code review
+        if review:
+            action = WriteCodeReview(i_context=coding_context, context=self.context, llm=self.llm)
+            self._init_action(action)
+            coding_context = await action.run()
+
+        dependencies = {coding_context.design_doc.root_relative_path, coding_context.task_doc.root_relative_path}
+        if self.config.inc:
+            dependencies.add(coding_context.code_plan_and_change_doc.root_relative_path)
+        await self.project_repo.srcs.save(
+            filename=coding_context.filename,
+            dependencies=list(dependencies),
+            content=coding_context.code_doc.content,
+        )
+        msg = Message(
+            content=coding_context.model_dump_json(),
+            instruct_content=coding_context,
+            role=self.profile,
+            cause_by=WriteCode,
+        )
+        self.rc.memory.add(msg)
+        return coding_context.code_doc.filename
+
+    async def _act_parallel_with_cr(self, review=False) -> Set[str]:
+        """Write up to `n_borg` files at a time, each after the files it depends on have been saved, so that
+        `WriteCode.get_codes` sees them."""
+        dag = self._get_code_dependencies(self.code_todos)
+        saved = {filename: asyncio.Event() for filename in dag}
+        semaphore = asyncio.Semaphore(self.n_borg)
+
+        async def write(todo: WriteCode) -> str:
+            filename = todo.i_context.filename
+            try:
+                for i in dag[filename]:
+                    await saved[i].wait()
+                async with semaphore:
+                    return await self._write_code_with_cr(todo, review=review)
+            finally:
+                saved[filename].set()
+
+        tasks = [asyncio.create_task(write(todo)) for todo in self.code_todos]
+        try:
+            return set(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    @classmethod
+    def _get_code_dependencies(cls, code_todos: list[WriteCode]) -> dict[str, set[str]]:
+        """Return the files each file to write waits for.
+
+        A file depends on the earlier files of its task list that its logic analysis mentions, such as
+        `["main.py", "Contains main function, from game import Game"]` depending on `game.py`. A file without logic
+        analysis depends on all the earlier files of its task list, and files of different task docs or not in a task
+        list do not depend on each other.
+        """
+        filenames = {todo.i_context.filename for todo in code_todos}
+        dag = {filename: set() for filename in filenames}
+        task_docs = {}
+        for todo in code_todos:
+            task_doc = CodingContext.loads(todo.i_context.content).task_doc
+            if task_doc and task_doc.content:
+                task_docs[task_doc.filename] = task_doc
+        for task_doc in task_docs.values():
+            try:
+                m = json.loads(task_doc.content)
+                task_list = cls._parse_tasks(task_doc) or []
+            except (ValueError, AttributeError):
+                continue
+            logic_analysis = m.get(LOGIC_ANALYSIS.key) or m.get(REFINED_LOGIC_ANALYSIS.key) or []
+            analysis = {i[0]: " ".join(i[1:]) for i in logic_analysis if isinstance(i, list) and i}
+            earlier = []
+            for filename in task_list:
+                if filename not in filenames:
+                    continue
+                if filename in analysis:
+                    dag[filename].update(i for i in earlier if mentions_file(analysis[filename], i))
+                else:
+                    dag[filename].update(earlier)
+                earlier.append(filename)
+        # Only wait for the files before in `code_todos`, so that task docs listing files in different orders
+        # cannot make a cycle.
+        order = {todo.i_context.filename: i for i, todo in enumerate(code_todos)}
+        return {k: {i for i in v if order[i] < order[k]} for k, v in dag.items()}
+
     async def _act(self) -> Message | None:
         """Determines the mode of action based on whether code review is used."""
         if self.rc.todo is None:
@@ -10,6 +10,7 @@
 
 from metagpt.actions import UserRequirement, WritePRD
 from metagpt.actions.prepare_documents import PrepareDocuments
+from metagpt.provider.llm_scheduler import LLMPriority
 from metagpt.roles.role import Role, RoleReactMode
 from metagpt.utils.common import any_to_name
 
@@ -30,6 +31,7 @@ class ProductManager(Role):
     goal: str = "efficiently create a successful product that meets market demands and user expectations"
     constraints: str = "utilize the same language as the user requirements for seamless communication"
     todo_action: str = ""
+    llm_priority: LLMPriority = LLMPriority.HIGH  # the PRD unblocks the other roles
 
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
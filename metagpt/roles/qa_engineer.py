@@ -20,6 +20,7 @@ from metagpt.actions import DebugError, RunCode, WriteTest
 from metagpt.actions.summarize_code import SummarizeCode
 from metagpt.const import MESSAGE_ROUTE_TO_NONE
 from metagpt.logs import logger
+from metagpt.provider.llm_scheduler import LLMPriority
 from metagpt.roles import Role
 from metagpt.schema import Document, Message, RunCodeContext, TestingContext
 from metagpt.utils.common import any_to_str_set, parse_recipient
@@ -34,6 +35,7 @@ class QaEngineer(Role):
         "Use same language as user requirement"
     )
     test_round_allowed: int = 5
+    llm_priority: LLMPriority = LLMPriority.LOW  # tests do not block the other roles
     test_round: int = 0
 
     def __init__(self, **kwargs):
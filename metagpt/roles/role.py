@@ -22,6 +22,7 @@
 
 from __future__ import annotations
 
+from contextlib import nullcontext
 from enum import Enum
 from typing import TYPE_CHECKING, Iterable, Optional, Set, Type, Union
 
@@ -34,6 +35,7 @@ from metagpt.context_mixin import ContextMixin
 from metagpt.logs import logger
 from metagpt.memory import Memory
 from metagpt.provider import HumanProvider
+from metagpt.provider.llm_scheduler import LLMPriority, llm_request_scope
 from metagpt.schema import Message, MessageQueue, SerializationMixin
 from metagpt.strategy.planner import Planner
 from metagpt.utils.common import any_to_name, any_to_str, role_raise_decorator
@@ -149,6 +151,7 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
     rc: RoleContext = Field(default_factory=RoleContext)
     addresses: set[str] = set()
     planner: Planner = Field(default_factory=Planner)
+    llm_priority: LLMPriority = LLMPriority.NORMAL  # priority class of the LLM requests of the role, if rate limited
 
     # builtin variables
     recovered: bool = False  # to tag if a recovered role
@@ -427,11 +430,13 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         if not news:
             news = self.rc.msg_buffer.pop_all()
         # Store the read messages in your own memory to prevent duplicate processing.
-        old_messages = [] if ignore_memory else self.rc.memory.get()
+        seen = [False] * len(news) if ignore_memory else [self.rc.memory.contains(n) for n in news]
         self.rc.memory.add_batch(news)
         # Filter out messages of interest.
         self.rc.news = [
-            n for n in news if (n.cause_by in self.rc.watch or self.name in n.send_to) and n not in old_messages
+            n
+            for n, is_seen in zip(news, seen)
+            if (n.cause_by in self.rc.watch or self.name in n.send_to) and not is_seen
         ]
         self.latest_observed_msg = self.rc.news[-1] if self.rc.news else None  # record the latest observed msg
 
@@ -457,6 +462,8 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         if not message:
             return
         self.rc.msg_buffer.push(message)
+        if self.rc.env:
+            self.rc.env.mark_ready(self)
 
     async def _react(self) -> Message:
         """Think first, then act, until the Role _think it is time to stop and requires no more todo.
@@ -548,7 +555,12 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
             logger.debug(f"{self._setting}: no news. waiting.")
             return
 
-        rsp = await self.react()
+        # Scan the working tree once per step, the files saved by actions keep the snapshot up to date.
+        git_repo = self.context.git_repo
+        with llm_request_scope(
+            owner=self.name, priority=self.llm_priority
+        ), git_repo.snapshot() if git_repo else nullcontext():
+            rsp = await self.react()
 
         # Reset the next action to be taken.
         self.set_todo(None)
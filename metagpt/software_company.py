@@ -4,7 +4,6 @@
 import asyncio
 from pathlib import Path
 
-import agentops
 import typer
 
 from metagpt.const import CONFIG_ROOT
@@ -40,6 +39,8 @@ def generate_repo(
     from metagpt.team import Team
 
     if config.agentops_api_key != "":
+        import agentops  # imported on demand, it is slow to import
+
         agentops.init(config.agentops_api_key, tags=["software_company"])
 
     config.update_via_cli(project_path, project_name, inc, reqa_file, max_auto_summarize_code)
@@ -70,9 +71,18 @@ def generate_repo(
 
     company.invest(investment)
     company.run_project(idea)
-    asyncio.run(company.run(n_round=n_round))
+
+    async def run():
+        try:
+            await company.run(n_round=n_round)
+        finally:
+            await company.aclose()
+
+    asyncio.run(run())
 
     if config.agentops_api_key != "":
+        import agentops
+
         agentops.end_session("Success")
 
     return ctx.repo
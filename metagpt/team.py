@@ -19,6 +19,7 @@ from metagpt.const import MESSAGE_ROUTE_TO_ALL, SERDESER_PATH
 from metagpt.context import Context
 from metagpt.environment import Environment
 from metagpt.logs import logger
+from metagpt.provider.llm_client_pool import get_llm_client_pool
 from metagpt.roles import Role
 from metagpt.schema import Message
 from metagpt.utils.common import (
@@ -27,6 +28,7 @@ from metagpt.utils.common import (
     serialize_decorator,
     write_json_file,
 )
+from metagpt.utils.http_session import close_http_sessions
 
 
 class Team(BaseModel):
@@ -58,6 +60,8 @@ class Team(BaseModel):
         team_info_path = stg_path.joinpath("team.json")
         serialized_data = self.model_dump()
         serialized_data["context"] = self.env.context.serialize()
+        if self.env.context.git_repo:
+            self.env.context.git_repo.flush_dependency()
 
         write_json_file(team_info_path, serialized_data)
 
@@ -136,3 +140,9 @@ class Team(BaseModel):
             logger.debug(f"max {n_round=} left.")
         self.env.archive(auto_archive)
         return self.env.history
+
+    async def aclose(self):
+        """Close the pooled LLM clients and HTTP sessions when the team is done. They are shared by the process, so
+        call it on shutdown only."""
+        await get_llm_client_pool().aclose()
+        await close_http_sessions()
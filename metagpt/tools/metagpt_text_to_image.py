@@ -9,11 +9,11 @@
 import base64
 from typing import Dict, List
 
-import aiohttp
 import requests
 from pydantic import BaseModel
 
 from metagpt.logs import logger
+from metagpt.utils.http_session import get_aiohttp_session
 
 
 class MetaGPTText2Image:
@@ -69,9 +69,8 @@ class MetaGPTText2Image:
             parameters: Dict
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.model_url, headers=headers, json=data) as response:
-                    result = ImageResult(**await response.json())
+            async with get_aiohttp_session().post(self.model_url, headers=headers, json=data) as response:
+                result = ImageResult(**await response.json())
             if len(result.images) == 0:
                 return 0
             data = base64.b64decode(result.images[0])
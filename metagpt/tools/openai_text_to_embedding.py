@@ -9,11 +9,11 @@
 """
 from typing import List
 
-import aiohttp
 import requests
 from pydantic import BaseModel, Field
 
 from metagpt.logs import logger
+from metagpt.utils.http_session import get_aiohttp_session
 
 
 class Embedding(BaseModel):
@@ -62,10 +62,9 @@ class OpenAIText2Embedding:
         data = {"input": text, "model": model}
         url = "https://api.openai.com/v1/embeddings"
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, json=data, **proxies) as response:
-                    data = await response.json()
-                    return ResultEmbedding(**data)
+            async with get_aiohttp_session().post(url, headers=headers, json=data, **proxies) as response:
+                data = await response.json()
+                return ResultEmbedding(**data)
         except requests.exceptions.RequestException as e:
             logger.error(f"An error occurred:{e}")
         return ResultEmbedding()
@@ -9,6 +9,8 @@ from typing import Optional
 import aiohttp
 from pydantic import BaseModel, ConfigDict, model_validator
 
+from metagpt.utils.http_session import get_aiohttp_session, http_retry
+
 
 class BingAPIWrapper(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -66,20 +68,14 @@ class BingAPIWrapper(BaseModel):
             return safe_results(details)
         return details
 
+    @http_retry
     async def results(self, params: dict) -> dict:
         """Use aiohttp to run query and return the results async."""
 
-        if not self.aiosession:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.bing_url, params=params, headers=self.header, proxy=self.proxy) as response:
-                    response.raise_for_status()
-                    res = await response.json()
-        else:
-            async with self.aiosession.get(
-                self.bing_url, params=params, headers=self.header, proxy=self.proxy
-            ) as response:
-                response.raise_for_status()
-                res = await response.json()
+        session = self.aiosession or get_aiohttp_session()
+        async with session.get(self.bing_url, params=params, headers=self.header, proxy=self.proxy) as response:
+            response.raise_for_status()
+            res = await response.json()
 
         return res
 
@@ -11,6 +11,8 @@ from typing import Any, Dict, Optional, Tuple
 import aiohttp
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
+from metagpt.utils.http_session import get_aiohttp_session, http_retry
+
 
 class SerpAPIWrapper(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -46,6 +48,7 @@ class SerpAPIWrapper(BaseModel):
         result = await self.results(query, max_results)
         return self._process_response(result, as_string=as_string)
 
+    @http_retry
     async def results(self, query: str, max_results: int) -> dict:
         """Use aiohttp to run query through SerpAPI and return the results async."""
 
@@ -58,15 +61,10 @@ class SerpAPIWrapper(BaseModel):
             return url, params
 
         url, params = construct_url_and_params()
-        if not self.aiosession:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, proxy=self.proxy) as response:
-                    response.raise_for_status()
-                    res = await response.json()
-        else:
-            async with self.aiosession.get(url, params=params, proxy=self.proxy) as response:
-                response.raise_for_status()
-                res = await response.json()
+        session = self.aiosession or get_aiohttp_session()
+        async with session.get(url, params=params, proxy=self.proxy) as response:
+            response.raise_for_status()
+            res = await response.json()
 
         return res
 
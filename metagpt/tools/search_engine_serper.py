@@ -12,6 +12,8 @@ from typing import Any, Dict, Optional, Tuple
 import aiohttp
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
+from metagpt.utils.http_session import get_aiohttp_session, http_retry
+
 
 class SerperWrapper(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -43,6 +45,7 @@ class SerperWrapper(BaseModel):
             results = [self._process_response(res, as_string) for res in await self.results(query, max_results)]
         return "\n".join(results) if as_string else results
 
+    @http_retry
     async def results(self, queries: list[str], max_results: int = 8) -> dict:
         """Use aiohttp to run query through Serper and return the results async."""
 
@@ -53,15 +56,10 @@ class SerperWrapper(BaseModel):
             return url, payloads, headers
 
         url, payloads, headers = construct_url_and_payload_and_headers()
-        if not self.aiosession:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=payloads, headers=headers, proxy=self.proxy) as response:
-                    response.raise_for_status()
-                    res = await response.json()
-        else:
-            async with self.aiosession.get.post(url, data=payloads, headers=headers, proxy=self.proxy) as response:
-                response.raise_for_status()
-                res = await response.json()
+        session = self.aiosession or get_aiohttp_session()
+        async with session.post(url, data=payloads, headers=headers, proxy=self.proxy) as response:
+            response.raise_for_status()
+            res = await response.json()
 
         return res
 
@@ -7,7 +7,14 @@ from typing import Any, Mapping, Optional, Union
 import aiohttp
 from aiohttp.client import DEFAULT_TIMEOUT
 
+from metagpt.utils.http_session import (
+    RETRY_STATUS_CODES,
+    get_aiohttp_session,
+    http_retry,
+)
 
+
+@http_retry
 async def apost(
     url: str,
     params: Optional[Mapping[str, str]] = None,
@@ -18,13 +25,17 @@ async def apost(
     encoding: str = "utf-8",
     timeout: int = DEFAULT_TIMEOUT.total,
 ) -> Union[str, dict]:
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url=url, params=params, json=json, data=data, headers=headers, timeout=timeout) as resp:
-            if as_json:
-                data = await resp.json()
-            else:
-                data = await resp.read()
-                data = data.decode(encoding)
+    session = get_aiohttp_session()
+    async with session.post(
+        url=url, params=params, json=json, data=data, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)
+    ) as resp:
+        if resp.status in RETRY_STATUS_CODES:
+            resp.raise_for_status()
+        if as_json:
+            data = await resp.json()
+        else:
+            data = await resp.read()
+            data = data.decode(encoding)
     return data
 
 
@@ -43,7 +54,9 @@ async def apost_stream(
         async for line in result:
             deal_with(line)
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url=url, params=params, json=json, data=data, headers=headers, timeout=timeout) as resp:
-            async for line in resp.content:
-                yield line.decode(encoding)
+    session = get_aiohttp_session()
+    async with session.post(
+        url=url, params=params, json=json, data=data, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)
+    ) as resp:
+        async for line in resp.content:
+            yield line.decode(encoding)
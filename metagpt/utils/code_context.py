@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : code_context.py
+@Desc    : Token-budgeted packing of the code files given as context for writing another code file.
+
+The code files are ranked by their relevance to the file being written: whether it imports them or mentions them in
+its logic analysis, how many of their classes and functions it references, whether they import it, and whether they
+changed recently. Within the token budget, the most relevant files are packed in full, then the signatures of the
+others, and the names of the files left are listed.
+"""
+from __future__ import annotations
+
+import ast
+import copy
+import re
+from pathlib import Path
+from typing import List, Optional, Set
+
+from pydantic import BaseModel, Field
+
+from metagpt.logs import logger
+from metagpt.utils.token_counter import TOKEN_MAX, count_output_tokens_batch
+
+
+def mentions_file(text: str, filename: str) -> bool:
+    """Whether `text` mentions a file, by its name or as a module like `from game import Game`."""
+    path = Path(filename)
+    names = {path.name, path.stem, path.with_suffix("").as_posix().replace("/", ".")}
+    return any(re.search(rf"(?<![\w.]){re.escape(i)}(?!\w)", text) for i in names if i)
+
+
+def get_code_token_budget(config) -> int:
+    """Return the token budget of the code context, 0 for unlimited.
+
+    `config.code_context_token_budget` if set, else half the context window of the LLM model.
+    """
+    if config.code_context_token_budget:
+        return config.code_context_token_budget
+    return TOKEN_MAX.get(config.llm.model, 0) // 2
+
+
+def render_signatures(content: str) -> str:
+    """Return the imports, globals, and class and function signatures with the first docstring line of Python code,
+    or an empty string if it is not Python code."""
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return ""
+    tree.body = [i for i in (_signature(node) for node in tree.body) if i]
+    return ast.unparse(tree)
+
+
+def _signature(node: ast.AST) -> Optional[ast.AST]:
+    if isinstance(node, (ast.Import, ast.ImportFrom, ast.Assign, ast.AnnAssign)):
+        return node
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        node = copy.copy(node)
+        node.body = _docstring(node) + [ast.Expr(ast.Constant(...))]
+        return node
+    if isinstance(node, ast.ClassDef):
+        node = copy.copy(node)
+        body = [i for i in (_signature(n) for n in node.body) if i]
+        node.body = _docstring(node) + (body or [ast.Expr(ast.Constant(...))])
+        return node
+    return None
+
+
+def _docstring(node: ast.AST) -> list:
+    docstring = ast.get_docstring(node)
+    return [ast.Expr(ast.Constant(docstring.strip().splitlines()[0]))] if docstring else []
+
+
+class CodeFile(BaseModel):
+    """A code file to pack.
+
+    Attributes:
+        filename (str): The filename relative to the source directory.
+        content (str): The code.
+        text (str): The code as rendered in full into the context.
+        pinned (bool): Whether to always include the file in full, e.g. the file being rewritten.
+    """
+
+    filename: str
+    content: str
+    text: str
+    pinned: bool = False
+
+
+class PackedCodeContext(BaseModel):
+    """The packed code context, and which files were packed how, for debugging.
+
+    Attributes:
+        text (str): The code context.
+        included (List[str]): The files included in full.
+        summarized (List[str]): The files included as signatures only.
+        elided (List[str]): The files only listed by name.
+        tokens (int): The tokens of the code files, as counted for the budget.
+    """
+
+    text: str = ""
+    included: List[str] = Field(default_factory=list)
+    summarized: List[str] = Field(default_factory=list)
+    elided: List[str] = Field(default_factory=list)
+    tokens: int = 0
+
+
+class CodeContextPacker(BaseModel):
+    """Packs code files into a token budget, the most relevant to the file being written first.
+
+    Attributes:
+        target (str): The file being written.
+        target_code (str): The existing code of the file being written, if any.
+        target_description (str): The description of the file being written, e.g. its logic analysis.
+        recent (Set[str]): The recently changed files.
+        token_budget (int): The max tokens of the code context, 0 for unlimited.
+        model (str): The LLM model to count tokens for.
+    """
+
+    target: str
+    target_code: str = ""
+    target_description: str = ""
+    recent: Set[str] = Field(default_factory=set)
+    token_budget: int = 0
+    model: str = "gpt-4o"
+
+    def fit(self, files: List[CodeFile]) -> Optional[PackedCodeContext]:
+        """Return the context of all the files in full if they fit the budget, else None.
+
+        The target attributes are only used to rank the files of a context over budget, so callers can check with
+        this before gathering them.
+        """
+        texts = [i.text for i in files]
+        # A token is at least one byte, so content within the budget in bytes needs no counting.
+        if not self.token_budget or sum(len(i.encode("utf-8")) for i in texts) <= self.token_budget:
+            return PackedCodeContext(text="\n".join(texts), included=[i.filename for i in files])
+        counts = self._count_tokens(texts)
+        if sum(counts) <= self.token_budget:
+            return PackedCodeContext(text="\n".join(texts), included=[i.filename for i in files], tokens=sum(counts))
+        return None
+
+    def pack(self, files: List[CodeFile]) -> PackedCodeContext:
+        packed = self.fit(files)
+        if packed:
+            return packed
+
+        texts = [i.text for i in files]
+        counts = self._count_tokens(texts)  # counted by `fit` already, served from the token cache
+        scores = self.rank(files)
+        order = sorted(range(len(files)), key=lambda i: (not files[i].pinned, -scores[i], i))
+        rendered, remaining = {}, self.token_budget
+        for i in order:
+            if files[i].pinned or counts[i] <= remaining:
+                rendered[i] = ("included", texts[i])
+                remaining -= counts[i]
+        for i in order:
+            if i in rendered:
+                continue
+            signatures = render_signatures(files[i].content)
+            text = f"----- {files[i].filename} (signatures only)\n```{signatures}```" if signatures else ""
+            count = self._count_tokens([text])[0] if text else 0
+            if text and count <= remaining:
+                rendered[i] = ("summarized", text)
+                remaining -= count
+            else:
+                rendered[i] = ("elided", "")
+
+        packed = PackedCodeContext(tokens=self.token_budget - remaining)
+        lines = []
+        for i, file in enumerate(files):
+            kind, text = rendered[i]
+            getattr(packed, kind).append(file.filename)
+            if text:
+                lines.append(text)
+        if packed.elided:
+            lines.append(f"----- Omitted for length: {', '.join(packed.elided)}")
+        packed.text = "\n".join(lines)
+        logger.info(
+            f"Code context of {self.target} packed into {packed.tokens}/{self.token_budget} tokens, "
+            f"included: {packed.included}, summarized: {packed.summarized}, elided: {packed.elided}"
+        )
+        return packed
+
+    def rank(self, files: List[CodeFile]) -> List[float]:
+        """Score the relevance of each file to the target file."""
+        target_text = f"{self.target_description}\n{self.target_code}"
+        target_words = set(re.findall(r"\w+", target_text))
+        target_imports = _imported_modules(self.target_code)
+        scores = []
+        for file in files:
+            score = 0.0
+            if _is_imported(file.filename, target_imports) or mentions_file(self.target_description, file.filename):
+                score += 4
+            score += min(3, len(_defined_symbols(file.content) & target_words))
+            if _is_imported(self.target, _imported_modules(file.content)):
+                score += 1
+            if file.filename in self.recent:
+                score += 0.5
+            scores.append(score)
+        return scores
+
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        try:
+            return count_output_tokens_batch(texts, self.model)
+        except Exception as e:  # the encoding may not be available offline, bytes are an upper bound
+            logger.warning(f"Count tokens failed: {e}, use bytes instead")
+            return [len(i.encode("utf-8")) for i in texts]
+
+
+def _imported_modules(code: str) -> Set[str]:
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return set()
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(i.name for i in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.add(node.module)
+            modules.update(f"{node.module}.{i.name}" for i in node.names)
+        elif isinstance(node, ast.ImportFrom):  # from . import x
+            modules.update(i.name for i in node.names)
+    return modules
+
+
+def _is_imported(filename: str, modules: Set[str]) -> bool:
+    """Whether `filename` is one of `modules`, matched by its dotted path or a trailing part of it."""
+    module = Path(filename).with_suffix("").as_posix().replace("/", ".")
+    return any(i == module or module.endswith(f".{i}") or i.endswith(f".{module}") for i in modules)
+
+
+def _defined_symbols(code: str) -> Set[str]:
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return set()
+    symbols = set()
+    for node in tree.body:
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            symbols.add(node.name)
+        elif isinstance(node, ast.Assign):
+            symbols.update(i.id for i in node.targets if isinstance(i, ast.Name))
+    return symbols
@@ -12,6 +12,7 @@
 from __future__ import annotations
 
 import ast
+import asyncio
 import base64
 import contextlib
 import csv
@@ -776,6 +777,15 @@ def is_coroutine_func(func: Callable) -> bool:
     return inspect.iscoroutinefunction(func)
 
 
+def pop_closed_loops(registry: dict[asyncio.AbstractEventLoop, Any]) -> list:
+    """Remove the entries of closed event loops from a registry keyed by loop and return their values.
+
+    Loop-bound objects such as sessions, connections or awaited events reference their loop, so such a registry must
+    drop closed loops itself, weak keys would never be released.
+    """
+    return [registry.pop(loop) for loop in [i for i in registry if i.is_closed()]]
+
+
 def load_mc_skills_code(skill_names: list[str] = None, skills_dir: Path = None) -> list[str]:
     """load minecraft skill from js files"""
     if not skills_dir:
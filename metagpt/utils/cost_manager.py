@@ -31,6 +31,11 @@ class CostManager(BaseModel):
     max_budget: float = 10.0
     total_cost: float = 0
     token_costs: dict[str, dict[str, float]] = TOKEN_COSTS  # different model's token cost
+    # tokens served by the LLM response cache, they are not included in the totals above
+    total_cached_prompt_tokens: int = 0
+    total_cached_completion_tokens: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
 
     def update_cost(self, prompt_tokens, completion_tokens, model):
         """
@@ -59,6 +64,23 @@ class CostManager(BaseModel):
             f"Current cost: ${cost:.3f}, prompt_tokens: {prompt_tokens}, completion_tokens: {completion_tokens}"
         )
 
+    def update_cache_hit(self, prompt_tokens: int, completion_tokens: int):
+        """
+        Record a response served by the LLM response cache, which costs nothing.
+
+        Args:
+        prompt_tokens (int): The number of tokens in the cached prompt.
+        completion_tokens (int): The number of tokens in the cached completion.
+        """
+        self.cache_hits += 1
+        self.total_cached_prompt_tokens += prompt_tokens
+        self.total_cached_completion_tokens += completion_tokens
+        logger.info(f"LLM cache hit, cached prompt_tokens: {prompt_tokens}, completion_tokens: {completion_tokens}")
+
+    def update_cache_miss(self):
+        """Record a request that was not found in the LLM response cache."""
+        self.cache_misses += 1
+
     def get_total_prompt_tokens(self):
         """
         Get the total number of prompt tokens.
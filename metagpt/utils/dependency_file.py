@@ -8,52 +8,98 @@
 """
 from __future__ import annotations
 
+import asyncio
+import atexit
 import json
 import re
+import weakref
 from pathlib import Path
-from typing import Set
+from typing import Dict, List, Optional, Set
 
 from metagpt.utils.common import aread, awrite
 from metagpt.utils.exceptions import handle_exception
 
+# Seconds a persisted update waits for more updates before the file is written, see `DependencyFile`.
+DEFAULT_FLUSH_DELAY = 1.0
+
 
 class DependencyFile:
     """A class representing a DependencyFile for managing dependencies.
 
+    The dependencies stay in memory, the file is only read again if it was changed by someone else. With a
+    `flush_delay`, persisted updates are written behind: the file is written once `flush_delay` seconds after the
+    last of a burst of updates, or by `flush`. Unflushed updates are also written at exit.
+
     :param workdir: The working directory path for the DependencyFile.
+    :param flush_delay: Seconds to delay writing persisted updates, None to write them immediately.
     """
 
-    def __init__(self, workdir: Path | str):
+    def __init__(self, workdir: Path | str, flush_delay: Optional[float] = None):
         """Initialize a DependencyFile instance.
 
         :param workdir: The working directory path for the DependencyFile.
+        :param flush_delay: Seconds to delay writing persisted updates, None to write them immediately.
         """
-        self._dependencies = {}
+        self._dependencies: Dict[str, List[str]] = {}
+        self._dependents: Dict[str, Set[str]] = {}  # dependency => the files depending on it
         self._filename = Path(workdir) / ".dependencies.json"
+        self._flush_delay = flush_delay
+        self._stat = None  # (mtime, size) of the file when last loaded or saved
+        self._dirty = False
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
 
     async def load(self):
         """Load dependencies from the file asynchronously."""
         if not self._filename.exists():
             return
+        stat = self._filename.stat()
         json_data = await aread(self._filename)
         json_data = re.sub(r"\\+", "/", json_data)  # Compatible with windows path
-        self._dependencies = json.loads(json_data)
+        self._set_dependencies(json.loads(json_data))
+        self._stat = (stat.st_mtime_ns, stat.st_size)
+        self._dirty = False
+
+    async def _load_if_changed(self):
+        """Load the file unless it is unchanged since last loaded or saved, or there are unsaved updates."""
+        if self._dirty or not self._filename.exists():
+            return
+        stat = self._filename.stat()
+        if self._stat != (stat.st_mtime_ns, stat.st_size):
+            await self.load()
 
     @handle_exception
     async def save(self):
         """Save dependencies to the file asynchronously."""
+        self._cancel_flush()
         data = json.dumps(self._dependencies)
         await awrite(filename=self._filename, data=data)
+        self._saved()
+
+    async def flush(self):
+        """Save the updates not written yet."""
+        if self._dirty:
+            await self.save()
+
+    @handle_exception
+    def flush_sync(self):
+        """Save the updates not written yet, for callers outside of an event loop."""
+        if not self._dirty:
+            return
+        self._cancel_flush()
+        self._filename.parent.mkdir(parents=True, exist_ok=True)
+        self._filename.write_text(json.dumps(self._dependencies), encoding="utf-8")
+        self._saved()
 
     async def update(self, filename: Path | str, dependencies: Set[Path | str], persist=True):
         """Update dependencies for a file asynchronously.
 
         :param filename: The filename or path.
         :param dependencies: The set of dependencies.
-        :param persist: Whether to persist the changes immediately.
+        :param persist: Whether to persist the changes, immediately or after `flush_delay`.
         """
         if persist:
-            await self.load()
+            await self._load_if_changed()
 
         root = self._filename.parent
         try:
@@ -61,6 +107,7 @@ class DependencyFile:
         except ValueError:
             key = filename
         key = str(key)
+        self._unlink(key)
         if dependencies:
             relative_paths = []
             for i in dependencies:
@@ -71,34 +118,103 @@ class DependencyFile:
                 relative_paths.append(s)
 
             self._dependencies[key] = relative_paths
+            self._link(key)
         elif key in self._dependencies:
             del self._dependencies[key]
 
-        if persist:
+        if not persist:
+            return
+        self._dirty = True
+        _unflushed.add(self)
+        if self._flush_delay is None:
             await self.save()
+        else:
+            # Debounce: every update re-arms the timer, which also drops a timer left on a closed event loop
+            self._cancel_flush()
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self._flush_delay, self._start_flush)
 
     async def get(self, filename: Path | str, persist=True):
         """Get dependencies for a file asynchronously.
 
         :param filename: The filename or path.
-        :param persist: Whether to load dependencies from the file immediately.
+        :param persist: Whether to load dependencies changed in the file.
         :return: A set of dependencies.
         """
         if persist:
-            await self.load()
+            await self._load_if_changed()
 
-        root = self._filename.parent
-        try:
-            key = Path(filename).relative_to(root).as_posix()
-        except ValueError:
-            key = Path(filename).as_posix()
-        return set(self._dependencies.get(str(key), {}))
+        return set(self._dependencies.get(self._key(filename), {}))
+
+    async def get_dependents(self, filename: Path | str, persist=True) -> Set[str]:
+        """Get the files depending on a file asynchronously, e.g. the code to rewrite when a design changes.
+
+        :param filename: The filename or path.
+        :param persist: Whether to load dependencies changed in the file.
+        :return: A set of the dependent filenames relative to the working directory.
+        """
+        if persist:
+            await self._load_if_changed()
+
+        return set(self._dependents.get(self._key(filename), set()))
 
     def delete_file(self):
         """Delete the dependency file."""
+        self._cancel_flush()
+        self._dirty = False
+        self._stat = None
         self._filename.unlink(missing_ok=True)
 
     @property
     def exists(self):
         """Check if the dependency file exists."""
         return self._filename.exists()
+
+    def _key(self, filename: Path | str) -> str:
+        try:
+            key = Path(filename).relative_to(self._filename.parent).as_posix()
+        except ValueError:
+            key = Path(filename).as_posix()
+        return str(key)
+
+    def _set_dependencies(self, dependencies: Dict[str, List[str]]):
+        self._dependencies = dependencies
+        self._dependents = {}
+        for key in self._dependencies:
+            self._link(key)
+
+    def _link(self, key: str):
+        for i in self._dependencies.get(key, []):
+            self._dependents.setdefault(i, set()).add(key)
+
+    def _unlink(self, key: str):
+        for i in self._dependencies.get(key, []):
+            dependents = self._dependents.get(i)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._dependents[i]
+
+    def _start_flush(self):
+        self._flush_handle = None
+        self._flush_task = asyncio.ensure_future(self.flush())
+
+    def _cancel_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def _saved(self):
+        stat = self._filename.stat()
+        self._stat = (stat.st_mtime_ns, stat.st_size)
+        self._dirty = False
+        _unflushed.discard(self)
+
+
+_unflushed: "weakref.WeakSet[DependencyFile]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    for i in list(_unflushed):
+        i.flush_sync()
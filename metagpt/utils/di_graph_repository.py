@@ -11,21 +11,31 @@
 from __future__ import annotations
 
 import json
+from collections import defaultdict
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List
 
 import networkx
 
 from metagpt.utils.common import aread, awrite
 from metagpt.utils.graph_repository import SPO, GraphRepository
 
+GRAPH_FORMAT = "spo"
+GRAPH_FORMAT_VERSION = 1
+
 
 class DiGraphRepository(GraphRepository):
-    """Graph repository based on DiGraph."""
+    """Graph repository based on DiGraph.
+
+    A directed graph holds one edge per subject and object, so inserting a triple replaces the predicate of the
+    triple with the same subject and object, if any. The triples are also indexed by subject, predicate and object
+    (SPO, POS and OSP) so that queries bound to any of them only visit the matching triples.
+    """
 
     def __init__(self, name: str | Path, **kwargs):
         super().__init__(name=str(name), **kwargs)
         self._repo = networkx.DiGraph()
+        self._reset_index()
 
     async def insert(self, subject: str, predicate: str, object_: str):
         """Insert a new triple into the directed graph repository.
@@ -39,7 +49,16 @@ class DiGraphRepository(GraphRepository):
             await my_di_graph_repo.insert(subject="Node1", predicate="connects_to", object_="Node2")
             # Adds a directed relationship: Node1 connects_to Node2
         """
-        self._repo.add_edge(subject, object_, predicate=predicate)
+        self._add_edge(subject, predicate, object_)
+
+    async def insert_many(self, spos: Iterable[SPO]):
+        """Insert triples into the directed graph repository in bulk.
+
+        Args:
+            spos (Iterable[SPO]): The triples to insert.
+        """
+        for i in spos:
+            self._add_edge(i.subject, i.predicate, i.object_)
 
     async def select(self, subject: str = None, predicate: str = None, object_: str = None) -> List[SPO]:
         """Retrieve triples from the directed graph repository based on specified criteria.
@@ -56,16 +75,7 @@ class DiGraphRepository(GraphRepository):
             selected_triples = await my_di_graph_repo.select(subject="Node1", predicate="connects_to")
             # Retrieves directed relationships where Node1 is the subject and the predicate is 'connects_to'.
         """
-        result = []
-        for s, o, p in self._repo.edges(data="predicate"):
-            if subject and subject != s:
-                continue
-            if predicate and predicate != p:
-                continue
-            if object_ and object_ != o:
-                continue
-            result.append(SPO(subject=s, predicate=p, object_=o))
-        return result
+        return [SPO(subject=s, predicate=p, object_=o) for s, p, o in self._match(subject, predicate, object_)]
 
     async def delete(self, subject: str = None, predicate: str = None, object_: str = None) -> int:
         """Delete triples from the directed graph repository based on specified criteria.
@@ -82,18 +92,106 @@ class DiGraphRepository(GraphRepository):
             deleted_count = await my_di_graph_repo.delete(subject="Node1", predicate="connects_to")
             # Deletes directed relationships where Node1 is the subject and the predicate is 'connects_to'.
         """
-        rows = await self.select(subject=subject, predicate=predicate, object_=object_)
-        if not rows:
-            return 0
-        for r in rows:
-            self._repo.remove_edge(r.subject, r.object_)
+        rows = self._match(subject, predicate, object_)
+        for s, p, o in rows:
+            self._remove_edge(s, p, o)
         return len(rows)
 
+    async def delete_many(self, spos: Iterable[SPO]) -> int:
+        """Delete the given triples from the directed graph repository in bulk.
+
+        Args:
+            spos (Iterable[SPO]): The triples to delete. Triples not in the repository are ignored.
+
+        Returns:
+            int: The number of triples deleted from the repository.
+        """
+        count = 0
+        for i in spos:
+            if self._osp.get(i.object_, {}).get(i.subject) == i.predicate:
+                self._remove_edge(i.subject, i.predicate, i.object_)
+                count += 1
+        return count
+
+    def _reset_index(self):
+        self._spo: Dict[str, Dict[str, Dict[str, None]]] = defaultdict(dict)
+        self._pos: Dict[str, Dict[str, Dict[str, None]]] = defaultdict(dict)
+        self._osp: Dict[str, Dict[str, str]] = defaultdict(dict)
+
+    def _rebuild_index(self):
+        self._reset_index()
+        for s, o, p in self._repo.edges(data="predicate"):
+            self._index(s, p, o)
+
+    def _index(self, subject: str, predicate: str, object_: str):
+        self._spo[subject].setdefault(predicate, {})[object_] = None
+        self._pos[predicate].setdefault(object_, {})[subject] = None
+        self._osp[object_][subject] = predicate
+
+    def _unindex(self, subject: str, predicate: str, object_: str):
+        for first, second, third, index in (
+            (subject, predicate, object_, self._spo),
+            (predicate, object_, subject, self._pos),
+        ):
+            values = index[first][second]
+            values.pop(third, None)
+            if not values:
+                del index[first][second]
+                if not index[first]:
+                    del index[first]
+        del self._osp[object_][subject]
+        if not self._osp[object_]:
+            del self._osp[object_]
+
+    def _add_edge(self, subject: str, predicate: str, object_: str):
+        old = self._osp.get(object_, {}).get(subject)
+        if old is not None:
+            self._unindex(subject, old, object_)
+        self._repo.add_edge(subject, object_, predicate=predicate)
+        self._index(subject, predicate, object_)
+
+    def _remove_edge(self, subject: str, predicate: str, object_: str):
+        self._repo.remove_edge(subject, object_)
+        self._unindex(subject, predicate, object_)
+
+    def _match(self, subject: str = None, predicate: str = None, object_: str = None) -> List[tuple]:
+        """Return the (subject, predicate, object) triples matching the criteria, an empty criterion matching any."""
+        if subject and object_:
+            p = self._osp.get(object_, {}).get(subject)
+            return [(subject, p, object_)] if p is not None and (not predicate or predicate == p) else []
+        if subject:
+            predicates = self._spo.get(subject, {})
+            if predicate:
+                return [(subject, predicate, o) for o in predicates.get(predicate, {})]
+            return [(subject, p, o) for p, objects in predicates.items() for o in objects]
+        if predicate:
+            objects = self._pos.get(predicate, {})
+            if object_:
+                return [(s, predicate, object_) for s in objects.get(object_, {})]
+            return [(s, predicate, o) for o, subjects in objects.items() for s in subjects]
+        if object_:
+            return [(s, p, object_) for s, p in self._osp.get(object_, {}).items()]
+        return [(s, p, o) for s, o, p in self._repo.edges(data="predicate")]
+
     def json(self) -> str:
-        """Convert the directed graph repository to a JSON-formatted string."""
-        m = networkx.node_link_data(self._repo)
-        data = json.dumps(m)
-        return data
+        """Convert the directed graph repository to a JSON-formatted string.
+
+        The nodes and predicates are stored once each, and the edges as a flat list of (subject, predicate, object)
+        indexes into them, which is much smaller and faster to write and read than `networkx.node_link_data`.
+        """
+        nodes = {n: i for i, n in enumerate(self._repo.nodes)}
+        predicates = {}
+        edges = []
+        for s, o, p in self._repo.edges(data="predicate"):
+            edges.extend((nodes[s], predicates.setdefault(p, len(predicates)), nodes[o]))
+        m = {
+            "format": GRAPH_FORMAT,
+            "version": GRAPH_FORMAT_VERSION,
+            "nodes": list(nodes),
+            "predicates": list(predicates),
+            "edges": edges,
+        }
+        return json.dumps(m, separators=(",", ":"))
 
     async def save(self, path: str | Path = None):
         """Save the directed graph repository to a JSON file.
@@ -117,7 +215,8 @@ class DiGraphRepository(GraphRepository):
     def load_json(self, val: str):
         """
         Loads a JSON-encoded string representing a graph structure and updates
-        the internal repository (_repo) with the parsed graph.
+        the internal repository (_repo) and its indexes with the parsed graph.
+        Both the compact format of `json()` and the `networkx.node_link_data` format are supported.
 
         Args:
             val (str): A JSON-encoded string representing a graph structure.
@@ -132,7 +231,18 @@ class DiGraphRepository(GraphRepository):
         if not val:
             return self
         m = json.loads(val)
-        self._repo = networkx.node_link_graph(m)
+        if m.get("format") == GRAPH_FORMAT:
+            nodes, predicates, edges = m["nodes"], m["predicates"], m["edges"]
+            graph = networkx.DiGraph()
+            graph.add_nodes_from(nodes)
+            graph.add_edges_from(
+                (nodes[edges[i]], nodes[edges[i + 2]], {"predicate": predicates[edges[i + 1]]})
+                for i in range(0, len(edges), 3)
+            )
+            self._repo = graph
+        else:  # `networkx.node_link_data` saved by earlier versions
+            self._repo = networkx.node_link_graph(m)
+        self._rebuild_index()
         return self
 
     @staticmethod
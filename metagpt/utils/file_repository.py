@@ -54,6 +54,7 @@ class FileRepository:
         pathname.parent.mkdir(parents=True, exist_ok=True)
         content = content if content else ""  # avoid `argument must be str, not None` to make it continue
         await awrite(filename=str(pathname), data=content)
+        self._git_repo.update_file(pathname)
         logger.info(f"save to: {str(pathname)}")
 
         if dependencies is not None:
@@ -73,6 +74,16 @@ class FileRepository:
         dependency_file = await self._git_repo.get_dependency()
         return await dependency_file.get(pathname)
 
+    async def get_dependents(self, filename: Path | str) -> Set[str]:
+        """Get the files that depend on a file, e.g. the code to rewrite when a design document changes.
+
+        :param filename: The filename or path within the repository.
+        :return: Set of dependent filenames or paths, relative to the git repository.
+        """
+        pathname = self.workdir / filename
+        dependency_file = await self._git_repo.get_dependency()
+        return await dependency_file.get_dependents(pathname)
+
     async def get_changed_dependency(self, filename: Path | str) -> Set[str]:
         """Get the dependencies of a file that have changed.
 
@@ -231,6 +242,7 @@ class FileRepository:
         if not pathname.exists():
             return
         pathname.unlink(missing_ok=True)
+        self._git_repo.update_file(pathname)
 
         dependency_file = await self._git_repo.get_dependency()
         await dependency_file.update(filename=pathname, dependencies=None)
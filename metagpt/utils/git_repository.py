@@ -8,17 +8,20 @@
 """
 from __future__ import annotations
 
+import hashlib
+import os
 import shutil
+from contextlib import contextmanager
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from git.repo import Repo
 from git.repo.fun import is_git_dir
 from gitignore_parser import parse_gitignore
 
 from metagpt.logs import logger
-from metagpt.utils.dependency_file import DependencyFile
+from metagpt.utils.dependency_file import DEFAULT_FLUSH_DELAY, DependencyFile
 from metagpt.utils.file_repository import FileRepository
 
 
@@ -40,6 +43,10 @@ class GitRepository:
 
     Attributes:
         _repository (Repo): The GitPython `Repo` object representing the Git repository.
+
+    Inside `snapshot()`, `changed_files` and `get_files` scan the working tree once and are then served from memory,
+    kept up to date by `update_file` which `FileRepository.save`/`delete` call. Changes made by other means are only
+    seen after `refresh()` or the next snapshot.
     """
 
     def __init__(self, local_path=None, auto_init=True):
@@ -51,6 +58,11 @@ class GitRepository:
         self._repository = None
         self._dependency = None
         self._gitignore_rules = None
+        self._snapshot_depth = 0
+        self._changed_files: Optional[Dict[str, ChangeType]] = None
+        self._index_shas: Optional[Dict[str, bytes]] = None  # path => blob sha of tracked files
+        self._dir_files: Dict[str, set] = {}  # relative dir => paths of the files under it
+        self._ignored: Dict[str, bool] = {}
         if local_path:
             self.open(local_path=local_path, auto_init=auto_init)
 
@@ -61,6 +73,7 @@ class GitRepository:
         :param auto_init: If True, automatically initializes a new Git repository if the provided path is not a Git repository.
         """
         local_path = Path(local_path)
+        self.refresh()
         if self.is_git_dir(local_path):
             self._repository = Repo(local_path)
             self._gitignore_rules = parse_gitignore(full_path=str(local_path / ".gitignore"))
@@ -95,6 +108,7 @@ class GitRepository:
 
         for k, v in files.items():
             self._repository.index.remove(k) if v is ChangeType.DELETED else self._repository.index.add([k])
+        self.refresh()
 
     def commit(self, comments):
         """Commit the staged changes with the given comments.
@@ -103,10 +117,13 @@ class GitRepository:
         """
         if self.is_valid:
             self._repository.index.commit(comments)
+            self.refresh()
 
     def delete_repository(self):
         """Delete the entire repository directory."""
         if self.is_valid:
+            if self._dependency:
+                self._dependency.delete_file()  # drop the updates not written yet
             try:
                 shutil.rmtree(self._repository.working_dir)
             except Exception as e:
@@ -118,11 +135,84 @@ class GitRepository:
 
         :return: A dictionary where keys are file paths and values are change types.
         """
+        if self._changed_files is not None:
+            return dict(self._changed_files)
         files = {i: ChangeType.UNTRACTED for i in self._repository.untracked_files}
         changed_files = {f.a_path: ChangeType(f.change_type) for f in self._repository.index.diff(None)}
         files.update(changed_files)
+        if self._snapshot_depth:
+            self._changed_files = dict(files)
         return files
 
+    @contextmanager
+    def snapshot(self):
+        """Serve `changed_files` and `get_files` from one scan of the working tree until the outermost snapshot exits.
+
+        Snapshots may be nested, and may be shared by concurrent roles working on the same repository.
+        """
+        self._snapshot_depth += 1
+        try:
+            yield self
+        finally:
+            self._snapshot_depth -= 1
+            if not self._snapshot_depth:
+                self.refresh()
+
+    def refresh(self):
+        """Drop the cached working tree state, the next access scans it again."""
+        self._changed_files = None
+        self._index_shas = None
+        self._dir_files.clear()
+        self._ignored.clear()
+
+    def update_file(self, pathname: Path | str):
+        """Update the cached working tree state after a file was saved or deleted.
+
+        :param pathname: The absolute path of the file, or the path relative to the working directory.
+        """
+        if not self._snapshot_depth or not self.is_valid:
+            return
+        pathname = Path(self.workdir) / pathname
+        try:
+            rpath = pathname.relative_to(self.workdir).as_posix()
+        except ValueError:
+            return
+        exists = pathname.is_file()
+
+        for directory, files in self._dir_files.items():
+            if directory == "." or rpath.startswith(directory + "/"):
+                files.add(rpath) if exists else files.discard(rpath)
+
+        if self._changed_files is None:
+            return
+        if self._index_shas is None:
+            self._index_shas = {path: entry.binsha for (path, _), entry in self._repository.index.entries.items()}
+        index_sha = self._index_shas.get(rpath)
+        if index_sha is None:  # untracked
+            if exists and not self._is_ignored(str(pathname)):
+                self._changed_files[rpath] = ChangeType.UNTRACTED
+            else:
+                self._changed_files.pop(rpath, None)
+        elif not exists:
+            self._changed_files[rpath] = ChangeType.DELETED
+        elif self._blob_sha(pathname) == index_sha:
+            self._changed_files.pop(rpath, None)
+        else:
+            self._changed_files[rpath] = ChangeType.MODIFIED
+
+    @staticmethod
+    def _blob_sha(pathname: Path) -> bytes:
+        """Return the sha git would store the file content under."""
+        data = pathname.read_bytes()
+        return hashlib.sha1(b"blob %d\0" % len(data) + data).digest()
+
+    def _is_ignored(self, pathname: str) -> bool:
+        if not self._snapshot_depth:
+            return bool(self._gitignore_rules(pathname))
+        if pathname not in self._ignored:
+            self._ignored[pathname] = bool(self._gitignore_rules(pathname))
+        return self._ignored[pathname]
+
     @staticmethod
     def is_git_dir(local_path):
         """Check if the specified directory is a Git repository.
@@ -165,8 +255,11 @@ class GitRepository:
 
         :param comments: Comments for the archive commit.
         """
-        logger.info(f"Archive: {list(self.changed_files.keys())}")
-        self.add_change(self.changed_files)
+        self.flush_dependency()
+        self.refresh()  # files may have been changed by other means than `FileRepository`
+        changed_files = self.changed_files
+        logger.info(f"Archive: {list(changed_files.keys())}")
+        self.add_change(changed_files)
         self.commit(comments)
 
     def new_file_repository(self, relative_path: Path | str = ".") -> FileRepository:
@@ -188,9 +281,14 @@ class GitRepository:
         :return: An instance of DependencyFile.
         """
         if not self._dependency:
-            self._dependency = DependencyFile(workdir=self.workdir)
+            self._dependency = DependencyFile(workdir=self.workdir, flush_delay=DEFAULT_FLUSH_DELAY)
         return self._dependency
 
+    def flush_dependency(self):
+        """Write the dependency file updates not written yet."""
+        if self._dependency:
+            self._dependency.flush_sync()
+
     def rename_root(self, new_dir_name):
         """Rename the root directory of the Git repository.
 
@@ -198,6 +296,7 @@ class GitRepository:
         """
         if self.workdir.name == new_dir_name:
             return
+        self.flush_dependency()
         new_path = self.workdir.parent / new_dir_name
         if new_path.exists():
             logger.info(f"Delete directory {str(new_path)}")
@@ -217,6 +316,8 @@ class GitRepository:
                 logger.warning(f"Failed to move {str(self.workdir)} to {str(new_path)}")
                 return
         logger.info(f"Rename directory {str(self.workdir)} to {str(new_path)}")
+        self.refresh()
+        self._dependency = None
         self._repository = Repo(new_path)
         self._gitignore_rules = parse_gitignore(full_path=str(new_path / ".gitignore"))
 
@@ -240,6 +341,9 @@ class GitRepository:
         except ValueError:
             relative_path = Path(relative_path)
 
+        if self._snapshot_depth and not root_relative_path:
+            return self._get_snapshot_files(relative_path, filter_ignored=filter_ignored)
+
         if not root_relative_path:
             root_relative_path = Path(self.workdir) / relative_path
         files = []
@@ -279,7 +383,23 @@ class GitRepository:
         files = []
         for filename in filenames:
             pathname = root_relative_path / filename
-            if self._gitignore_rules(str(pathname)):
+            if self._is_ignored(str(pathname)):
                 continue
             files.append(filename)
         return files
+
+    def _get_snapshot_files(self, relative_path: Path, filter_ignored=True) -> List:
+        """`get_files` served from the files under `relative_path` listed once per snapshot."""
+        directory = relative_path.as_posix()
+        if directory not in self._dir_files:
+            directory_path = Path(self.workdir) / relative_path
+            self._dir_files[directory] = {
+                (Path(root) / f).relative_to(self.workdir).as_posix()
+                for root, _, filenames in os.walk(directory_path)
+                for f in filenames
+            }
+        prefix = "" if directory == "." else directory + "/"
+        files = sorted(i[len(prefix) :] for i in self._dir_files[directory])
+        if not filter_ignored:
+            return files
+        return self.filter_gitignore(filenames=files, root_relative_path=Path(self.workdir) / relative_path)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : http_session.py
+@Desc    : Process-wide HTTP sessions. Search engines, tools and `ahttp_client` share one keep-alive connection pool
+    per event loop instead of opening a new session (DNS + TCP + TLS handshakes) for every call. Limits, timeouts and
+    the retry policy come from `config.http`.
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import functools
+from typing import Optional
+
+import aiohttp
+import httpx
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from metagpt.configs.http_config import HTTPConfig
+from metagpt.logs import logger
+from metagpt.utils.common import pop_closed_loops
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HTTPSessionManager:
+    """Lazily creates one `aiohttp.ClientSession` and one `httpx.AsyncClient` per event loop, since both are bound to
+    the loop they are created in."""
+
+    def __init__(self, config: Optional[HTTPConfig] = None):
+        self._config = config
+        # Keyed by event loop. A session holds a strong reference to its loop, so the entries of closed loops are
+        # dropped whenever a session is created rather than left to the garbage collector.
+        self._sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+    @property
+    def config(self) -> HTTPConfig:
+        if self._config is None:
+            from metagpt.config2 import config
+
+            self._config = config.http
+        return self._config
+
+    def aiohttp_session(self) -> aiohttp.ClientSession:
+        """Return the aiohttp session of the running event loop."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            self._detach_closed_loops()
+            connector = aiohttp.TCPConnector(
+                limit=self.config.limit,
+                limit_per_host=self.config.limit_per_host,
+                keepalive_timeout=self.config.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            timeout = aiohttp.ClientTimeout(total=self.config.timeout, connect=self.config.connect_timeout)
+            session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._sessions[loop] = session
+        return session
+
+    def httpx_client(self) -> httpx.AsyncClient:
+        """Return the httpx client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            self._detach_closed_loops()
+            limits = httpx.Limits(
+                max_connections=self.config.limit or None,
+                max_keepalive_connections=self.config.limit or None,
+                keepalive_expiry=self.config.keepalive_timeout,
+            )
+            timeout = httpx.Timeout(self.config.timeout, connect=self.config.connect_timeout)
+            client = httpx.AsyncClient(limits=limits, timeout=timeout)
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self):
+        """Close the sessions of the running event loop."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        if session and not session.closed:
+            await session.close()
+        client = self._clients.pop(loop, None)
+        if client and not client.is_closed:
+            await client.aclose()
+
+    def close(self):
+        """Close the sessions of all event loops that are not running, used at interpreter exit."""
+        for loop in set(self._sessions.keys()) | set(self._clients.keys()):
+            if loop.is_closed() or loop.is_running():
+                continue
+            try:
+                loop.run_until_complete(self.aclose())
+            except Exception as e:
+                logger.debug(f"close http sessions failed: {e}")
+        self._detach_closed_loops()
+
+    def _detach_closed_loops(self):
+        """The connections of a closed loop are gone with it, forget its sessions."""
+        for session in pop_closed_loops(self._sessions):
+            session.detach()
+        pop_closed_loops(self._clients)
+
+
+_manager = HTTPSessionManager()
+atexit.register(_manager.close)
+
+
+def get_http_session_manager() -> HTTPSessionManager:
+    return _manager
+
+
+def get_aiohttp_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session of the running event loop."""
+    return _manager.aiohttp_session()
+
+
+def get_httpx_client() -> httpx.AsyncClient:
+    """Return the shared httpx client of the running event loop."""
+    return _manager.httpx_client()
+
+
+async def close_http_sessions():
+    """Close the shared sessions of the running event loop, e.g. before the loop ends."""
+    await _manager.aclose()
+
+
+def is_retryable_http_error(e: BaseException) -> bool:
+    """Connection errors, timeouts, rate limits and server errors are worth retrying."""
+    if isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(e, aiohttp.ClientResponseError):
+        return e.status in RETRY_STATUS_CODES
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code in RETRY_STATUS_CODES
+    return False
+
+
+def http_retry(func):
+    """Retry an async HTTP call with the retry policy of `config.http`."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        config = _manager.config
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(config.max_retries + 1),
+            wait=wait_random_exponential(min=config.retry_min_wait, max=config.retry_max_wait),
+            retry=retry_if_exception(is_retryable_http_error),
+            reraise=True,
+        ):
+            with attempt:
+                return await func(*args, **kwargs)
+
+    return wrapper
@@ -3,10 +3,9 @@ import os
 from pathlib import Path
 from typing import Union
 
-import httpx
-
 from metagpt.rag.schema import OmniParsedResult
 from metagpt.utils.common import aread_bin
+from metagpt.utils.http_session import get_httpx_client, http_retry
 
 
 class OmniParseClient:
@@ -41,6 +40,7 @@ class OmniParseClient:
         self.parse_website_endpoint = "/parse_website"
         self.parse_document_endpoint = "/parse_document"
 
+    @http_retry
     async def _request_parse(
         self,
         endpoint: str,
@@ -73,20 +73,19 @@ class OmniParseClient:
         headers = headers or {}
         _headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
         headers.update(**_headers)
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                url=url,
-                method=method,
-                files=files,
-                params=params,
-                json=json,
-                data=data,
-                headers=headers,
-                timeout=self.max_timeout,
-                **kwargs,
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await get_httpx_client().request(
+            url=url,
+            method=method,
+            files=files,
+            params=params,
+            json=json,
+            data=data,
+            headers=headers,
+            timeout=self.max_timeout,
+            **kwargs,
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def parse_document(self, file_input: Union[str, bytes, Path], bytes_filename: str = None) -> OmniParsedResult:
         """
@@ -7,13 +7,41 @@
 """
 from __future__ import annotations
 
+import asyncio
 import traceback
 from datetime import timedelta
+from typing import Dict, List, Optional
 
 import redis.asyncio as aioredis
 
 from metagpt.configs.redis_config import RedisConfig
 from metagpt.logs import logger
+from metagpt.utils.common import pop_closed_loops
+
+# Connection pools shared by all `Redis` instances with the same config, per event loop since the connections are
+# bound to the loop they are created in. The connections reference their loop, so the pools of closed loops are
+# dropped when a new loop first asks for one.
+_pools: Dict[asyncio.AbstractEventLoop, Dict[str, aioredis.ConnectionPool]] = {}
+
+
+def get_connection_pool(config: RedisConfig) -> aioredis.ConnectionPool:
+    """Return the connection pool shared by all `Redis` instances with the same config in the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _pools:
+        pop_closed_loops(_pools)
+        _pools[loop] = {}
+    pools = _pools[loop]
+    key = config.model_dump_json()
+    if key not in pools:
+        pools[key] = aioredis.ConnectionPool.from_url(config.to_url(), **config.to_kwargs())
+    return pools[key]
+
+
+async def close_connection_pools():
+    """Disconnect the connection pools of the running event loop."""
+    pools = _pools.pop(asyncio.get_running_loop(), {})
+    for pool in pools.values():
+        await pool.disconnect()
 
 
 class Redis:
@@ -26,12 +54,7 @@ class Redis:
             return True
 
         try:
-            self._client = await aioredis.from_url(
-                self.config.to_url(),
-                username=self.config.username,
-                password=self.config.password,
-                db=self.config.db,
-            )
+            self._client = aioredis.Redis(connection_pool=get_connection_pool(self.config))
             return True
         except Exception as e:
             logger.warning(f"Redis initialization has failed:{e}")
@@ -56,8 +79,78 @@ class Redis:
         except Exception as e:
             logger.exception(f"{e}, stack:{traceback.format_exc()}")
 
+    async def mget(self, keys: List[str]) -> List[bytes | None] | None:
+        """Get the values of many keys in one round trip."""
+        if not keys:
+            return []
+        if not await self._connect():
+            return None
+        try:
+            return await self._client.mget(keys)
+        except Exception as e:
+            logger.exception(f"{e}, stack:{traceback.format_exc()}")
+            return None
+
+    async def mset(self, mapping: Dict[str, str], timeout_sec: int = None) -> bool:
+        """Set the values of many keys in one round trip."""
+        return await self.write(sets=mapping, timeout_sec=timeout_sec)
+
+    async def lrange_many(self, keys: List[str]) -> List[List[bytes]] | None:
+        """Get all the values of many lists in one round trip."""
+        if not keys:
+            return []
+        if not await self._connect():
+            return None
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.lrange(key, 0, -1)
+                return await pipe.execute()
+        except Exception as e:
+            logger.exception(f"{e}, stack:{traceback.format_exc()}")
+            return None
+
+    async def write(
+        self,
+        sets: Optional[Dict[str, str]] = None,
+        appends: Optional[Dict[str, List[str]]] = None,
+        deletes: Optional[List[str]] = None,
+        timeout_sec: int = None,
+    ) -> bool:
+        """Delete keys, then set values and append values to lists, in one round trip and transaction.
+
+        Args:
+            sets: The values to set by key.
+            appends: The values to append to the end of the lists by key.
+            deletes: The keys to delete first.
+            timeout_sec: The expiry of the keys set or appended to, if any.
+
+        Returns:
+            bool: Whether the writes succeeded.
+        """
+        if not await self._connect():
+            return False
+        ex = None if not timeout_sec else timedelta(seconds=timeout_sec)
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                for key in deletes or []:
+                    pipe.delete(key)
+                for key, data in (sets or {}).items():
+                    pipe.set(key, data, ex=ex)
+                for key, values in (appends or {}).items():
+                    if values:
+                        pipe.rpush(key, *values)
+                    if ex:
+                        pipe.expire(key, ex)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.exception(f"{e}, stack:{traceback.format_exc()}")
+            return False
+
     async def close(self):
+        """Release the client, keeping the shared connection pool for other instances."""
         if not self._client:
             return
-        await self._client.close()
+        await self._client.close(close_connection_pool=False)
         self._client = None
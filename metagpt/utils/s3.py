@@ -1,9 +1,12 @@
+import asyncio
 import base64
+import hashlib
 import os.path
 import traceback
 import uuid
+from contextlib import AsyncExitStack, suppress
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import aioboto3
 import aiofiles
@@ -14,7 +17,12 @@ from metagpt.logs import logger
 
 
 class S3:
-    """A class for interacting with Amazon S3 storage."""
+    """A class for interacting with Amazon S3 storage.
+
+    The client is created on first use and kept until `close`, or the end of an `async with S3(config) as s3:` block.
+    Files of at least `config.multipart_threshold` bytes are transferred in parts of `config.part_size` bytes, up to
+    `config.max_concurrency` at a time, so that memory use is bounded by the parts in flight rather than the file size.
+    """
 
     def __init__(self, config: S3Config):
         self.session = aioboto3.Session()
@@ -25,33 +33,119 @@ class S3:
             "aws_secret_access_key": config.secret_key,
             "endpoint_url": config.endpoint,
         }
+        self._client = None
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._client_lock = asyncio.Lock()
 
-    async def upload_file(
-        self,
-        bucket: str,
-        local_path: str,
-        object_name: str,
-    ) -> None:
+    async def __aenter__(self) -> "S3":
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _get_client(self):
+        async with self._client_lock:
+            if self._client is None:
+                exit_stack = AsyncExitStack()
+                self._client = await exit_stack.enter_async_context(self.session.client(**self.auth_config))
+                self._exit_stack = exit_stack
+        return self._client
+
+    async def close(self):
+        """Close the client, if any."""
+        if self._exit_stack:
+            await self._exit_stack.aclose()
+        self._client = None
+        self._exit_stack = None
+
+    async def upload_file(self, bucket: str, local_path: str, object_name: str, skip_unchanged: bool = False) -> bool:
         """Upload a file from the local path to the specified path of the storage bucket specified in s3.
 
         Args:
             bucket: The name of the S3 storage bucket.
             local_path: The local file path, including the file name.
             object_name: The complete path of the uploaded file to be stored in S3, including the file name.
+            skip_unchanged: Whether to skip the upload if the object has the ETag of the local file.
+
+        Returns:
+            Whether the file was uploaded, False if it was skipped.
 
         Raises:
             Exception: If an error occurs during the upload process, an exception is raised.
         """
         try:
-            async with self.session.client(**self.auth_config) as client:
+            client = await self._get_client()
+            size = os.path.getsize(local_path)
+            if skip_unchanged and await self._get_etag(bucket, object_name) == await asyncio.to_thread(
+                self.compute_etag, local_path, self._part_size, self._multipart_threshold
+            ):
+                logger.info(f"Skip uploading the unchanged file to path {object_name} in bucket {bucket} of s3.")
+                return False
+            if size < self._multipart_threshold:
                 async with aiofiles.open(local_path, mode="rb") as reader:
                     body = await reader.read()
-                    await client.put_object(Body=body, Bucket=bucket, Key=object_name)
-                    logger.info(f"Successfully uploaded the file to path {object_name} in bucket {bucket} of s3.")
+                await client.put_object(Body=body, Bucket=bucket, Key=object_name)
+            else:
+                await self._upload_multipart(client, bucket, local_path, object_name, size)
+            logger.info(f"Successfully uploaded the file to path {object_name} in bucket {bucket} of s3.")
+            return True
         except Exception as e:
             logger.error(f"Failed to upload the file to path {object_name} in bucket {bucket} of s3: {e}")
             raise e
 
+    async def _upload_multipart(self, client, bucket: str, local_path: str, object_name: str, size: int):
+        upload = await client.create_multipart_upload(Bucket=bucket, Key=object_name)
+        upload_id = upload["UploadId"]
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def upload_part(part_number: int, offset: int) -> dict:
+            async with semaphore:
+                async with aiofiles.open(local_path, mode="rb") as reader:
+                    await reader.seek(offset)
+                    body = await reader.read(self._part_size)
+                rsp = await client.upload_part(
+                    Body=body, Bucket=bucket, Key=object_name, PartNumber=part_number, UploadId=upload_id
+                )
+                return {"ETag": rsp["ETag"], "PartNumber": part_number}
+
+        try:
+            parts = await asyncio.gather(
+                *[upload_part(i + 1, offset) for i, offset in enumerate(range(0, size, self._part_size))]
+            )
+            await client.complete_multipart_upload(
+                Bucket=bucket, Key=object_name, UploadId=upload_id, MultipartUpload={"Parts": list(parts)}
+            )
+        except BaseException:
+            with suppress(Exception):
+                await client.abort_multipart_upload(Bucket=bucket, Key=object_name, UploadId=upload_id)
+            raise
+
+    async def upload_dir(
+        self, bucket: str, local_dir: str | Path, prefix: str = "", skip_unchanged: bool = True
+    ) -> List[str]:
+        """Upload the files under a local directory to the objects of the same relative paths under a prefix.
+
+        Args:
+            bucket: The name of the S3 storage bucket.
+            local_dir: The local directory to upload.
+            prefix: The path in S3 to upload the directory to.
+            skip_unchanged: Whether to skip the files whose objects have the same ETag.
+
+        Returns:
+            The names of the uploaded objects, excluding the skipped ones.
+        """
+        local_dir = Path(local_dir)
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def upload(pathname: Path) -> Optional[str]:
+            object_name = "/".join(i for i in (prefix.strip("/"), pathname.relative_to(local_dir).as_posix()) if i)
+            async with semaphore:
+                uploaded = await self.upload_file(bucket, str(pathname), object_name, skip_unchanged=skip_unchanged)
+            return object_name if uploaded else None
+
+        results = await asyncio.gather(*[upload(i) for i in sorted(local_dir.rglob("*")) if i.is_file()])
+        return [i for i in results if i]
+
     async def get_object_url(
         self,
         bucket: str,
@@ -70,9 +164,9 @@ class S3:
             Exception: If an error occurs while retrieving the URL, an exception is raised.
         """
         try:
-            async with self.session.client(**self.auth_config) as client:
-                file = await client.get_object(Bucket=bucket, Key=object_name)
-                return str(file["Body"].url)
+            client = await self._get_client()
+            file = await client.get_object(Bucket=bucket, Key=object_name)
+            return str(file["Body"].url)
         except Exception as e:
             logger.error(f"Failed to get the url for a downloadable or preview file: {e}")
             raise e
@@ -95,9 +189,9 @@ class S3:
             Exception: If an error occurs while retrieving the file data, an exception is raised.
         """
         try:
-            async with self.session.client(**self.auth_config) as client:
-                s3_object = await client.get_object(Bucket=bucket, Key=object_name)
-                return await s3_object["Body"].read()
+            client = await self._get_client()
+            s3_object = await client.get_object(Bucket=bucket, Key=object_name)
+            return await s3_object["Body"].read()
         except Exception as e:
             logger.error(f"Failed to get the binary data of the file: {e}")
             raise e
@@ -107,6 +201,8 @@ class S3:
     ) -> None:
         """Download an S3 object to a local file.
 
+        Objects of at least `config.multipart_threshold` bytes are downloaded in concurrent byte ranges.
+
         Args:
             bucket: The name of the S3 storage bucket.
             object_name: The complete path of the file stored in S3, including the file name.
@@ -117,19 +213,123 @@ class S3:
             Exception: If an error occurs during the download process, an exception is raised.
         """
         try:
-            async with self.session.client(**self.auth_config) as client:
-                s3_object = await client.get_object(Bucket=bucket, Key=object_name)
-                stream = s3_object["Body"]
+            client = await self._get_client()
+            s3_object = await client.get_object(Bucket=bucket, Key=object_name)
+            size = s3_object.get("ContentLength") or 0
+            stream = s3_object["Body"]
+            if size < self._multipart_threshold:
                 async with aiofiles.open(local_path, mode="wb") as writer:
-                    while True:
-                        file_data = await stream.read(chunk_size)
-                        if not file_data:
-                            break
-                        await writer.write(file_data)
+                    await self._copy_stream(stream, writer, chunk_size)
+                return
+
+            # Keep the first part of this response and fetch the rest of the same version in concurrent ranges
+            async with aiofiles.open(local_path, mode="wb") as writer:
+                await self._copy_stream(stream, writer, chunk_size, limit=self._part_size)
+                await writer.truncate(size)
+            stream.close()
+            semaphore = asyncio.Semaphore(self._max_concurrency)
+
+            async def download_part(offset: int):
+                end = min(offset + self._part_size, size) - 1
+                async with semaphore:
+                    part = await client.get_object(
+                        Bucket=bucket, Key=object_name, Range=f"bytes={offset}-{end}", IfMatch=s3_object["ETag"]
+                    )
+                    async with aiofiles.open(local_path, mode="r+b") as writer:
+                        await writer.seek(offset)
+                        await self._copy_stream(part["Body"], writer, chunk_size)
+
+            await asyncio.gather(*[download_part(i) for i in range(self._part_size, size, self._part_size)])
         except Exception as e:
             logger.error(f"Failed to download the file from S3: {e}")
             raise e
 
+    async def download_prefix(
+        self, bucket: str, prefix: str, local_dir: str | Path, skip_unchanged: bool = True
+    ) -> List[Path]:
+        """Download the objects under a prefix to the files of the same relative paths under a local directory.
+
+        Args:
+            bucket: The name of the S3 storage bucket.
+            prefix: The path in S3 to download.
+            local_dir: The local directory to download to.
+            skip_unchanged: Whether to skip the objects whose local files have the same ETag.
+
+        Returns:
+            The downloaded files, excluding the skipped ones.
+        """
+        client = await self._get_client()
+        local_dir = Path(local_dir)
+        objects, kwargs = [], {}
+        while True:
+            rsp = await client.list_objects_v2(Bucket=bucket, Prefix=prefix, **kwargs)
+            objects.extend(rsp.get("Contents", []))
+            if not rsp.get("IsTruncated"):
+                break
+            kwargs = {"ContinuationToken": rsp["NextContinuationToken"]}
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def download(obj: dict) -> Optional[Path]:
+            pathname = local_dir / obj["Key"][len(prefix) :].lstrip("/")
+            if skip_unchanged and pathname.exists():
+                etag = await asyncio.to_thread(
+                    self.compute_etag, str(pathname), self._part_size, self._multipart_threshold
+                )
+                if etag == obj["ETag"].strip('"'):
+                    return None
+            pathname.parent.mkdir(parents=True, exist_ok=True)
+            async with semaphore:
+                await self.download_file(bucket, obj["Key"], str(pathname))
+            return pathname
+
+        results = await asyncio.gather(*[download(i) for i in objects if not i["Key"].endswith("/")])
+        return [i for i in results if i]
+
+    async def _get_etag(self, bucket: str, object_name: str) -> Optional[str]:
+        client = await self._get_client()
+        try:
+            rsp = await client.head_object(Bucket=bucket, Key=object_name)
+        except Exception as e:  # mostly 404 Not Found
+            logger.debug(f"Head {object_name} in bucket {bucket} of s3 failed: {e}")
+            return None
+        return rsp["ETag"].strip('"')
+
+    @staticmethod
+    def compute_etag(local_path: str, part_size: int, multipart_threshold: int) -> str:
+        """Compute the ETag S3 gives a file uploaded by `upload_file`: the MD5 of the content if uploaded whole, else
+        the MD5 of the MD5s of its parts, followed by the number of parts."""
+        digests = []
+        whole = hashlib.md5()
+        with open(local_path, "rb") as reader:
+            while data := reader.read(part_size):
+                whole.update(data)
+                digests.append(hashlib.md5(data).digest())
+        if os.path.getsize(local_path) < multipart_threshold:
+            return whole.hexdigest()
+        return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+    @staticmethod
+    async def _copy_stream(stream, writer, chunk_size: int, limit: int = 0):
+        copied = 0
+        while not limit or copied < limit:
+            file_data = await stream.read(min(chunk_size, limit - copied) if limit else chunk_size)
+            if not file_data:
+                break
+            await writer.write(file_data)
+            copied += len(file_data)
+
+    @property
+    def _part_size(self) -> int:
+        return self.config.part_size
+
+    @property
+    def _multipart_threshold(self) -> int:
+        return max(self.config.multipart_threshold, 1)
+
+    @property
+    def _max_concurrency(self) -> int:
+        return max(self.config.max_concurrency, 1)
+
     async def cache(self, data: str, file_ext: str, format: str = "") -> str:
         """Save data to remote S3 and return url"""
         object_name = uuid.uuid4().hex + file_ext
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : stream_output_parser.py
+@Desc    : Incremental parser of the [CONTENT] output of an ActionNode. It consumes the LLM stream messages, validates
+    each JSON key or markdown section as soon as it is complete and reports it, so that callers can use the fields
+    before the whole answer arrives, stop the stream on an invalid field and ask again only for the missing ones.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from metagpt.logs import logger
+from metagpt.utils.common import OutputParser
+
+
+class StreamAborted(Exception):
+    """Raised into the LLM stream to stop it early."""
+
+
+class StreamOutputParser:
+    """Parses the fields of an output class out of the text of one or more LLM attempts.
+
+    Attributes:
+        fields (Dict[str, Any]): The validated fields parsed so far, kept across attempts.
+        invalid (Dict[str, str]): The fields whose last value was invalid, and why.
+        contents (List[str]): The full text of each attempt.
+        aborted (bool): Whether the stream of the current attempt was stopped on an invalid field.
+    """
+
+    def __init__(
+        self,
+        output_class: Type[BaseModel],
+        mapping: dict,
+        required_keys: Optional[List[str]] = None,
+        schema: str = "json",
+        tag: str = "CONTENT",
+        on_field: Optional[Callable[[str, Any], None]] = None,
+        abort_on_invalid: bool = True,
+        adapters: Optional[Dict[str, TypeAdapter]] = None,
+    ):
+        self.output_class = output_class
+        self.mapping = mapping
+        self.required_keys = list(mapping) if required_keys is None else required_keys
+        self.schema = schema
+        self.tag = tag
+        self.on_field = on_field
+        self.abort_on_invalid = abort_on_invalid
+        self.fields: Dict[str, Any] = {}
+        self.invalid: Dict[str, str] = {}
+        self.contents: List[str] = []
+        self._adapters = adapters if adapters is not None else {}  # field validators, may be shared by the caller
+        self._keys = {k.lower(): k for k in mapping}
+        self.reset()
+
+    @property
+    def missing(self) -> List[str]:
+        """The required fields not parsed yet."""
+        return [k for k in self.required_keys if k not in self.fields]
+
+    def reset(self):
+        """Start a new attempt. The fields parsed so far are kept."""
+        self.text = ""
+        self.aborted = False
+        self._streaming = True
+        self._start = -1  # where the fields start, after the open tag, -1 until it arrives
+        self._pos = 0  # the next position to scan
+        self._segment = 0  # where the current JSON key or markdown section starts
+        self._depth = 0
+        self._in_string = self._escape = self._closed = False
+
+    def feed(self, msg: str):
+        """Consume a message of the LLM stream. Raise `StreamAborted` on an invalid field if `abort_on_invalid`."""
+        self.text += msg
+        if self._closed:
+            return
+        if self._start < 0:
+            start = self.text.find(f"[{self.tag}]")
+            if start < 0:
+                return
+            self._start = self._pos = self._segment = start + len(self.tag) + 2
+        if self.schema == "json":
+            self._scan_json()
+        else:
+            self._scan_markdown()
+
+    def close(self, content: str):
+        """Parse the rest of an attempt given its full content, without aborting."""
+        self._streaming = False
+        if content.startswith(self.text):
+            self.feed(content[len(self.text) :])
+        else:  # not streamed, or streamed differently, e.g. from a cache
+            self.reset()
+            self._streaming = False
+            self.feed(content)
+        if self.schema != "json" and self._start >= 0 and not self._closed:
+            self._add_markdown_block(self.text[self._segment :])  # the last section lacks the close tag
+            self._closed = True
+        self.contents.append(content)
+
+    def add_fields(self, data: Dict[str, Any]):
+        """Add the fields parsed from the whole content by a lenient parser, the ones parsed before are kept."""
+        for key, value in data.items():
+            self._add_field(key, value)
+
+    def dump_fields(self) -> Dict[str, Any]:
+        """The fields parsed so far as JSON compatible values."""
+        return {k: self._get_adapter(k).dump_python(v, mode="json") for k, v in self.fields.items()}
+
+    def _scan_json(self):
+        # Track the nesting of the top-level object, a key is complete on a comma or the close brace at depth 1.
+        text, pairs = self.text, []
+        pos = self._pos
+        while pos < len(text) and not self._closed:
+            c = text[pos]
+            pos += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                if c == "{":
+                    self._depth, self._segment = 1, pos
+            elif c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    pairs.append(text[self._segment : pos - 1])
+                    self._closed = True
+            elif c == "," and self._depth == 1:
+                pairs.append(text[self._segment : pos - 1])
+                self._segment = pos
+        self._pos = pos
+        for pair in pairs:
+            self._add_json_pair(pair)
+
+    def _add_json_pair(self, pair: str):
+        if not pair.strip():
+            return
+        try:
+            data = json.loads(f"{{{pair}}}")
+        except json.JSONDecodeError:
+            return  # left to the lenient parser of the whole content, e.g. for unescaped newlines
+        self.add_fields(data)
+
+    def _scan_markdown(self):
+        # Sections are split at every "##" like `OutputParser.parse_blocks`, one is complete when the next starts.
+        text, blocks = self.text, []
+        end = text.find(f"[/{self.tag}]", self._start)
+        stop = end if end >= 0 else len(text)
+        while (pos := text.find("##", self._pos, stop)) >= 0:
+            blocks.append(text[self._segment : pos])
+            self._segment = self._pos = pos + 2
+        if end >= 0:
+            blocks.append(text[self._segment : end])
+            self._closed = True
+        else:
+            self._pos = max(self._segment, stop - 1)  # a "#" at the end may start the next "##"
+        for block in blocks:
+            self._add_markdown_block(block)
+
+    def _add_markdown_block(self, block: str):
+        if not block.strip():
+            return
+        try:
+            data = OutputParser.parse_data_with_mapping(f"##{block}", self.mapping)
+        except Exception:
+            return
+        self.add_fields(data)
+
+    def _add_field(self, key: str, value: Any):
+        key = key if key in self.mapping else self._keys.get(key.strip().lower())
+        if key is None or key in self.fields:
+            return
+        try:
+            value = self._get_adapter(key).validate_python(value)
+        except ValidationError as e:
+            self.invalid[key] = str(e)
+            logger.warning(f"Invalid field {key}: {e}")
+            if self._streaming and self.abort_on_invalid:
+                self.aborted = True
+                raise StreamAborted(f"Invalid field {key}")
+            return
+        self.invalid.pop(key, None)
+        self.fields[key] = value
+        if self.on_field:
+            self.on_field(key, value)
+
+    def _get_adapter(self, key: str) -> TypeAdapter:
+        if key not in self._adapters:
+            self._adapters[key] = TypeAdapter(self.output_class.model_fields[key].annotation)
+        return self._adapters[key]
@@ -10,6 +10,11 @@ ref3: https://github.com/Significant-Gravitas/Auto-GPT/blob/master/autogpt/llm/t
 ref4: https://github.com/hwchase17/langchain/blob/master/langchain/chat_models/openai.py
 ref5: https://ai.google.dev/models/gemini
 """
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
 import tiktoken
 from openai.types import CompletionUsage
 from openai.types.chat import ChatCompletionChunk
@@ -334,11 +339,7 @@ SPARK_TOKENS = {
 
 def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
     """Return the number of tokens used by a list of messages."""
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+    encoding = get_encoding(model)
     if model in {
         "gpt-3.5-turbo-0613",
         "gpt-3.5-turbo-16k-0613",
@@ -395,7 +396,7 @@ def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
                 for item in value:
                     if isinstance(item, dict) and item.get("type") in ["text"]:
                         content = item.get("text", "")
-            num_tokens += len(encoding.encode(content))
+            num_tokens += _count_tokens(encoding, content)
             if key == "name":
                 num_tokens += tokens_per_name
     num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
@@ -413,12 +414,72 @@ def count_output_tokens(string: str, model: str) -> int:
     Returns:
         int: The number of tokens in the text string.
     """
+    return _count_tokens(get_encoding(model), string)
+
+
+def count_output_tokens_batch(strings: list[str], model: str) -> list[int]:
+    """
+    Returns the number of tokens in each text string, encoding the strings not seen before in one batch.
+
+    Args:
+        strings (list[str]): The text strings.
+        model (str): The name of the encoding to use. (e.g., "gpt-3.5-turbo")
+
+    Returns:
+        list[int]: The number of tokens in each text string.
+    """
+    encoding = get_encoding(model)
+    keys = [_content_key(encoding, i) for i in strings]
+    with _token_cache_lock:
+        counts = [_token_cache.get(key) for key in keys]
+    misses = [i for i, count in enumerate(counts) if count is None]
+    if misses:
+        encoded = encoding.encode_batch([strings[i] for i in misses])
+        for i, tokens in zip(misses, encoded):
+            counts[i] = len(tokens)
+            _cache_tokens(keys[i], counts[i])
+    return counts
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """Return the tiktoken encoding of the model, created once per model."""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
         logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(string))
+        return tiktoken.get_encoding("cl100k_base")
+
+
+# Token counts of recently counted contents, keyed by (encoding, content hash), so that re-counting a growing
+# conversation only encodes the new messages.
+TOKEN_CACHE_SIZE = 8192
+_token_cache: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def _content_key(encoding: tiktoken.Encoding, content: str) -> tuple[str, bytes]:
+    return encoding.name, hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _cache_tokens(key: tuple[str, bytes], count: int):
+    with _token_cache_lock:
+        _token_cache[key] = count
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+
+
+def _count_tokens(encoding: tiktoken.Encoding, content: str) -> int:
+    key = _content_key(encoding, content)
+    with _token_cache_lock:
+        count = _token_cache.get(key)
+        if count is not None:
+            _token_cache.move_to_end(key)
+            return count
+    count = len(encoding.encode(content))
+    _cache_tokens(key, count)
+    return count
 
 
 def get_max_completion_tokens(messages: list[dict], model: str, default: int) -> int:
@@ -5,6 +5,9 @@
 @Author  : alexanderwu
 @File    : test_action_node.py
 """
+import asyncio
+import copy
+import pickle
 from pathlib import Path
 from typing import List, Optional, Tuple
 
@@ -15,6 +18,7 @@ from metagpt.actions import Action
 from metagpt.actions.action_node import ActionNode, ReviewMode, ReviseMode
 from metagpt.environment import Environment
 from metagpt.llm import LLM
+from metagpt.logs import log_llm_stream
 from metagpt.roles import Role
 from metagpt.schema import Message
 from metagpt.team import Team
@@ -316,5 +320,179 @@ def test_optional():
     assert t1
 
 
+def test_output_class_cached_by_structure():
+    child = ActionNode("Task list", List[str], "tasks", ["main.py"])
+    leaf = ActionNode("Name", str, "name", "")
+    node = ActionNode.from_children("plan", [child, ActionNode.from_children("detail", [leaf])])
+
+    cls = node.create_class()
+    structure_hash = node.structure_hash
+    assert node.create_class() is cls
+    assert node._get_output_schema(cls) is node._get_output_schema(cls)
+
+    leaf.instruction = "the project name"  # a change deep down the tree clears the ancestors' caches
+    assert node.structure_hash != structure_hash
+    assert node.create_class() is not cls
+    assert node.create_class().model_fields["detail"].annotation.model_fields["Name"].description == "the project name"
+
+    node.add_child(ActionNode("Anything UNCLEAR", str, "unclear", ""))
+    assert "Anything UNCLEAR" in node.create_class().model_fields
+    assert "Anything UNCLEAR" not in node.create_class(exclude=["Anything UNCLEAR"]).model_fields
+
+
+def test_action_node_copy_keeps_cache_invalidation():
+    leaf = ActionNode("Name", str, "name", "")
+    node = ActionNode.from_children("plan", [ActionNode.from_children("detail", [leaf])])
+    cls = node.create_class()
+
+    for copied in [copy.deepcopy(node), pickle.loads(pickle.dumps(node))]:
+        copied_leaf = copied.get_child("detail").get_child("Name")
+        assert copied_leaf is not leaf
+        assert copied.structure_hash == node.structure_hash
+        copied_cls = copied.create_class()
+
+        copied_leaf.instruction = "the project name"  # clears the caches of the copy, not of the original
+        assert copied.create_class() is not copied_cls
+        assert node.create_class() is cls
+        assert copied.structure_hash != node.structure_hash
+
+
+def test_action_outcls_registry_bounded(mocker):
+    from metagpt.actions import action_outcls_registry
+
+    mocker.patch.object(action_outcls_registry, "ACTION_OUTCLS_REGISTRY_SIZE", 2)
+    mocker.patch.object(action_outcls_registry, "action_outcls_registry", action_outcls_registry.OrderedDict())
+
+    first = ActionNode.create_model_class("first", {"a": (str, ...)})
+    ActionNode.create_model_class("second", {"a": (str, ...)})
+    assert ActionNode.create_model_class("first", {"a": (str, ...)}) is first  # used recently, kept
+    ActionNode.create_model_class("third", {"a": (str, ...)})
+    assert len(action_outcls_registry.action_outcls_registry) == 2
+    assert ActionNode.create_model_class("first", {"a": (str, ...)}) is first
+
+
+class StreamLLM:
+    """Streams the given responses in small chunks through `log_llm_stream` like the providers do."""
+
+    def __init__(self, responses: List[str]):
+        self.responses = responses
+        self.prompts = []
+        self.streamed = []
+
+    async def aask(self, msg, system_msgs=None, images=None, timeout=None):
+        self.prompts.append(msg)
+        rsp = self.responses[len(self.prompts) - 1]
+        for i in range(0, len(rsp), 4):
+            self.streamed.append(rsp[i : i + 4])
+            log_llm_stream(rsp[i : i + 4])
+        return rsp
+
+
+@pytest.mark.asyncio
+async def test_action_node_stream_fill():
+    node = ActionNode.from_children(
+        "plan",
+        [
+            ActionNode("Task list", List[str], "tasks", ["main.py"]),
+            ActionNode("Anything UNCLEAR", str, "unclear", ""),
+        ],
+    )
+    rsp = '[CONTENT]\n{"Task list": ["main.py", "game.py"], "Anything UNCLEAR": "none"}\n[/CONTENT]'
+    llm = StreamLLM([rsp])
+    events = []
+
+    def on_field(key, value):
+        events.append((key, value, len("".join(llm.streamed))))
+        assert node.instruct_content.model_dump()[key] == value  # filled as the fields arrive
+
+    await node.fill(context="ctx", llm=llm, on_field=on_field)
+
+    assert [i[:2] for i in events] == [("Task list", ["main.py", "game.py"]), ("Anything UNCLEAR", "none")]
+    assert events[0][2] < len(rsp)
+    assert node.content == rsp
+    assert node.instruct_content.model_dump() == {"Task list": ["main.py", "game.py"], "Anything UNCLEAR": "none"}
+
+
+@pytest.mark.asyncio
+async def test_action_node_stream_reprompt_missing_fields():
+    node = ActionNode.from_children(
+        "plan",
+        [
+            ActionNode("Task list", List[str], "tasks", ["main.py"]),
+            ActionNode("Logic Analysis", List[List[str]], "analysis", [["main.py", "entry"]]),
+            ActionNode("Anything UNCLEAR", str, "unclear", ""),
+        ],
+    )
+    first = '[CONTENT]\n{"Task list": ["main.py"], "Logic Analysis": "main.py is the entry", "Anything UNCLEAR": "'
+    second = '[CONTENT]\n{"Logic Analysis": [["main.py", "entry"]], "Anything UNCLEAR": ""}\n[/CONTENT]'
+    llm = StreamLLM([first + 'never streamed"}\n[/CONTENT]', second])
+
+    await node.fill(context="ctx", llm=llm)
+
+    assert "never streamed" not in "".join(llm.streamed)  # stopped at the invalid field
+    assert len(llm.prompts) == 2
+    assert "Output only the nodes Logic Analysis, Anything UNCLEAR" in llm.prompts[1]
+    assert node.instruct_content.model_dump() == {
+        "Task list": ["main.py"],
+        "Logic Analysis": [["main.py", "entry"]],
+        "Anything UNCLEAR": "",
+    }
+    assert '"Task list": [' in node.content and node.content.startswith("[CONTENT]")
+
+
+class ConcurrentLLM:
+    """Answers the prompt of a child node after a delay, and records the running and finished requests."""
+
+    def __init__(self, keys: List[str], delays: dict):
+        self.keys = keys
+        self.delays = delays
+        self.running = self.peak = 0
+        self.started = []
+        self.finished = []
+
+    async def aask(self, msg, system_msgs=None, images=None, timeout=None):
+        key = next(k for k in self.keys if f'"{k}": ' in msg)
+        self.started.append(key)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(self.delays.get(key, 0.01))
+        self.running -= 1
+        self.finished.append(key)
+        return f'[CONTENT]\n{{"{key}": "{key} value"}}\n[/CONTENT]'
+
+
+@pytest.mark.asyncio
+async def test_action_node_complex_fill_concurrently():
+    keys = ["k1", "k2", "k3", "k4", "k5"]
+    node = ActionNode.from_children("root", [ActionNode(k, str, f"{k} instruction", "") for k in keys])
+    llm = ConcurrentLLM(keys, delays={"k1": 0.05})
+
+    await node.fill(context="ctx", llm=llm, strgy="complex", max_concurrency=2, exclude=["k5"])
+
+    assert llm.peak == 2
+    assert llm.finished[-1] == "k1"
+    assert list(node.instruct_content.model_dump().items()) == [(k, f"{k} value") for k in keys[:4]]
+
+
+@pytest.mark.asyncio
+async def test_action_node_complex_fill_ordering():
+    keys = ["k1", "k2", "k3"]
+    children = {k: ActionNode(k, str, f"{k} instruction", "") for k in keys}
+    children["k1"].add_prev(children["k3"])  # k3 -> k1, as ActionGraph.add_edge does
+    children["k3"].add_next(children["k1"])
+    children["k2"].add_next(children["k3"])  # k2 -> k3 declared on one side only
+    node = ActionNode.from_children("root", list(children.values()))
+    llm = ConcurrentLLM(keys, delays={})
+
+    await node.fill(context="ctx", llm=llm, strgy="complex", max_concurrency=0)
+
+    assert llm.started == ["k2", "k3", "k1"]
+    assert list(node.instruct_content.model_dump()) == keys
+
+    children["k2"].add_prev(children["k1"])
+    with pytest.raises(ValueError, match="Cyclic"):
+        await node.fill(context="ctx", llm=llm, strgy="complex")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_action_node_overhead.py
+@Desc    : Benchmark of the per-fill overhead of ActionNode, i.e. everything but the LLM call, on the PRD and API
+    design trees. Run with `-s` to print the timings.
+"""
+import copy
+import time
+
+import pytest
+
+from metagpt.actions.action_node import TAG, ActionNode
+from metagpt.actions.design_api_an import DESIGN_API_NODE
+from metagpt.actions.write_prd_an import WRITE_PRD_NODE
+
+ROUNDS = 50
+
+
+class InstantLLM:
+    """Answers every prompt at once with the examples of the node."""
+
+    def __init__(self, rsp: str):
+        self.rsp = rsp
+
+    async def aask(self, msg, system_msgs=None, images=None, timeout=None):
+        return self.rsp
+
+
+async def fill_time(node: ActionNode, llm: InstantLLM, cached: bool = True) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        if not cached:
+            node.clear_output_class_cache()
+        await node.fill(context="ctx", llm=llm)
+        node.update_instruct_content({})
+    return (time.perf_counter() - start) / ROUNDS
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tree", [WRITE_PRD_NODE, DESIGN_API_NODE], ids=lambda i: i.key)
+async def test_fill_overhead(tree, mocker):
+    node = copy.deepcopy(tree)  # filling sets llm, context and the outputs on every node, keep the shared tree clean
+    llm = InstantLLM(node.compile_example(schema="json", mode="auto", tag=TAG))
+    create_model_class = mocker.spy(ActionNode, "create_model_class")
+    await node.fill(context="ctx", llm=llm)  # warm up
+    per_fill = create_model_class.call_count
+    assert per_fill
+
+    uncached = await fill_time(node, llm, cached=False)
+    assert create_model_class.call_count == per_fill * (ROUNDS + 1)
+    cached = await fill_time(node, llm)
+    assert create_model_class.call_count == per_fill * (ROUNDS + 1)  # every output class comes from the cache
+
+    print(f"\n{node.key} per-fill overhead: uncached {uncached * 1000:.2f} ms, cached {cached * 1000:.2f} ms")
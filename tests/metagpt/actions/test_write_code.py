@@ -15,6 +15,7 @@ from metagpt.actions.write_code import WriteCode
 from metagpt.logs import logger
 from metagpt.schema import CodingContext, Document
 from metagpt.utils.common import CodeParser, aread
+from metagpt.utils.file_repository import FileRepository
 from tests.data.incremental_dev_project.mock import (
     CODE_PLAN_AND_CHANGE_SAMPLE,
     REFINED_CODE_INPUT_SAMPLE,
@@ -159,5 +160,43 @@ async def test_get_codes(context):
     assert codes_inc
 
 
+@pytest.mark.asyncio
+async def test_get_codes_token_budget(context, mocker):
+    mocker.patch(
+        "metagpt.utils.code_context.count_output_tokens_batch", side_effect=lambda texts, model: [len(i) for i in texts]
+    )
+    context = setup_inc_workdir(context)
+    srcs = context.repo.with_src_path(context.src_workspace).srcs
+    await srcs.save(filename="game.py", content="class Game:\n    def move(self):\n" + "        pass\n" * 50)
+    await srcs.save(filename="utils.py", content="def clamp(x):\n" + "    x = x\n" * 100)
+    task_doc = Document(
+        filename="1.json",
+        content=json.dumps(
+            {
+                "Logic Analysis": [["main.py", "Contains main function, from game import Game"]],
+                "Task list": ["utils.py", "game.py", "main.py"],
+            }
+        ),
+    )
+
+    project_repo = context.repo.with_src_path(context.src_workspace)
+    codes = await WriteCode.get_codes(task_doc=task_doc, exclude="main.py", project_repo=project_repo)
+    assert "----- utils.py" in codes and "----- game.py" in codes
+
+    changed_files = mocker.patch.object(
+        FileRepository, "changed_files", new_callable=mocker.PropertyMock, return_value={}
+    )
+    codes = await WriteCode.get_codes(
+        task_doc=task_doc, exclude="main.py", project_repo=project_repo, token_budget=100000
+    )
+    assert "----- utils.py" in codes and "----- game.py" in codes
+    changed_files.assert_not_called()  # the files are only ranked when over budget
+
+    codes = await WriteCode.get_codes(task_doc=task_doc, exclude="main.py", project_repo=project_repo, token_budget=800)
+    assert "----- game.py\n" in codes
+    assert "----- utils.py (signatures only)" in codes
+    changed_files.assert_called_once()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of mg_ga_transform
+
+import asyncio
+
+import pytest
+
+from metagpt.ext.stanford_town.utils import mg_ga_transform
+from metagpt.ext.stanford_town.utils.mg_ga_transform import (
+    save_environment,
+    wait_role_environment,
+)
+
+
+@pytest.fixture
+def storage_path(mocker, tmp_path):
+    mocker.patch.object(mg_ga_transform, "STORAGE_PATH", tmp_path)
+    (tmp_path / "sim").mkdir()
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_wait_role_environment(storage_path):
+    assert await wait_role_environment("sim", "Klaus", step=1) is None
+
+    async def save_later():
+        await asyncio.sleep(0.05)
+        save_environment("Maria", 1, "sim", [1, 2])
+        await asyncio.sleep(0.05)
+        save_environment("Klaus", 1, "sim", [3, 4])
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    role_env, _ = await asyncio.gather(
+        wait_role_environment("sim", "Klaus", step=1, timeout=5, poll_interval=5), save_later()
+    )
+    assert role_env == {"maze": "the_ville", "x": 3, "y": 4}
+    assert loop.time() - start < 1  # woken by the save rather than the poll
+
+    # Environments written by another process are polled for
+    start = loop.time()
+    assert await wait_role_environment("sim", "Isabella", step=1, timeout=0.2, poll_interval=0.05) is None
+    assert 0.2 <= loop.time() - start < 1
+
+
+def test_closed_loop_events_dropped(storage_path):
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(wait_role_environment("sim", "Klaus", step=1, timeout=0.05, poll_interval=0.05))
+    loop.close()
+    assert loop in mg_ga_transform._environment_events
+
+    asyncio.run(wait_role_environment("sim", "Klaus", step=1, timeout=0.05, poll_interval=0.05))
+    assert loop not in mg_ga_transform._environment_events
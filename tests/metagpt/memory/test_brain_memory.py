@@ -6,11 +6,19 @@
 @File    : test_brain_memory.py
 """
 
+import asyncio
+import json
+
 import pytest
 
+from metagpt.config2 import config
+from metagpt.configs.redis_config import RedisConfig
+from metagpt.const import DEFAULT_MAX_TOKENS
 from metagpt.llm import LLM
+from metagpt.memory import brain_memory
 from metagpt.memory.brain_memory import BrainMemory
 from metagpt.schema import Message
+from tests.mock.mock_redis import MockRedis
 
 
 @pytest.mark.asyncio
@@ -66,5 +74,108 @@ async def test_memory_llm(llm):
     assert memory.history or memory.historical_summary
 
 
+class CharEncoding:
+    """Tokenizes a text into its characters."""
+
+    def encode(self, text, **kwargs):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+class SummaryLLM:
+    """Summarizes a text into its first line, and records the texts and the peak number of concurrent requests."""
+
+    model = "gpt-4"
+
+    def __init__(self):
+        self.texts = []
+        self.running = self.peak = 0
+
+    async def aask(self, msg, **kwargs):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        self.texts.append(msg)
+        return msg.splitlines()[0][:200]
+
+
+@pytest.fixture
+def char_encoding(mocker):
+    mocker.patch("metagpt.memory.brain_memory.get_encoding", return_value=CharEncoding())
+    brain_memory._summary_cache.clear()
+    yield
+    brain_memory._summary_cache.clear()
+
+
+def test_split_tokens(char_encoding):
+    text = "".join(str(i % 10) for i in range(100))
+    windows = BrainMemory.split_tokens(text, window_size=50)
+    assert windows == [text[0:50], text[30:80], text[60:100]]
+    assert BrainMemory.split_tokens(text, window_size=100) == [text]
+
+
+@pytest.mark.asyncio
+async def test_summarize_map_reduce(char_encoding):
+    llm = SummaryLLM()
+    memory = BrainMemory()
+    memory.llm = llm
+    lines = [f"line {i}: " + "x" * 490 for i in range(30)]
+
+    summary = await memory._summarize(text="\n".join(lines), max_words=200, max_concurrency=3)
+    assert summary == "line 0: " + "x" * 192
+    assert llm.peak == 3
+    map_calls = len(llm.texts) - 1
+    assert map_calls == len(BrainMemory.split_tokens("\n".join(lines), window_size=DEFAULT_MAX_TOKENS))
+
+    # Only the windows changed by the new tail are summarized again
+    llm.texts.clear()
+    lines.extend(f"line {i}: " + "y" * 490 for i in range(30, 33))
+    await memory._summarize(text="\n".join(lines), max_words=200, max_concurrency=3)
+    assert 1 < len(llm.texts) - 1 < map_calls
+    assert all("y" * 10 in i for i in llm.texts[:-1])
+
+
+@pytest.fixture
+def mock_redis(mocker):
+    client = MockRedis()
+    mocker.patch("redis.asyncio.Redis", return_value=client)
+    mocker.patch.object(config, "redis", RedisConfig(host="localhost", port=6379, password="mockpwd", db="0"))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_dumps_appends_history(mock_redis):
+    redis_key = BrainMemory.to_redis_key("none", "user_id", "chat_id")
+    history_key = BrainMemory.to_history_key(redis_key)
+    memory = BrainMemory()
+    memory.add_talk(Message(content="talk", id="1"))
+    memory.add_answer(Message(content="answer", id="2"))
+    await memory.dumps(redis_key=redis_key)
+    assert len(mock_redis.data[history_key]) == 2
+
+    memory = await BrainMemory.loads(redis_key=redis_key)
+    assert [m.content for m in memory.history] == ["talk", "answer"]
+    memory.add_talk(Message(content="talk again", id="3"))
+    round_trips = mock_redis.round_trips
+    await memory.dumps(redis_key=redis_key)
+    assert mock_redis.round_trips == round_trips + 1
+    assert [json.loads(i)["content"] for i in mock_redis.data[history_key]] == ["talk", "answer", "talk again"]
+    assert "history" not in json.loads(mock_redis.data[redis_key])
+
+    await memory.set_history_summary(history_summary="summary", redis_key=redis_key)
+    assert not mock_redis.data.get(history_key)
+
+    legacy_key = BrainMemory.to_redis_key("none", "user_id", "legacy")
+    legacy = BrainMemory(history=[Message(content="legacy", role="user")])
+    mock_redis.data[legacy_key] = legacy.model_dump_json().encode("utf-8")
+    memories = await BrainMemory.loads_many([redis_key, legacy_key, "none:user_id:missing"])
+    assert memories[0].historical_summary == "summary" and not memories[0].history
+    assert [m.content for m in memories[1].history] == ["legacy"]
+    assert not memories[2].history and not memories[2].historical_summary
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
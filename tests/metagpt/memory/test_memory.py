@@ -55,3 +55,39 @@ def test_memory():
     memory.clear()
     assert memory.count() == 0
     assert len(memory.index) == 0
+
+
+def test_memory_indexes():
+    memory = Memory(enable_token_index=True)
+
+    message1 = Message(content="write a snake game", role="user1", sent_from="Alice")
+    message2 = Message(content="write a 2048 game in python", role="user2", sent_from="Bob")
+    memory.add_batch([message1, message2, message1])
+    assert memory.count() == 2
+    assert memory.contains(message1)
+    assert memory.get_by_sent_from("Bob") == [message2]
+    assert memory.try_remember(" snake ") == [message1]
+    assert memory.try_remember("a 2048 game") == [message2]
+    assert memory.get_by_content("game") == [message1, message2]
+    assert memory.find_news([message1, message2], k=1) == [message1]
+
+    memory.delete(message1)
+    assert not memory.contains(message1)
+    assert memory.get_by_role("user1") == []
+    assert memory.try_remember(" snake ") == []
+
+    new_memory = Memory(**memory.model_dump())
+    assert "enable_token_index" not in memory.model_dump()
+    assert new_memory.contains(message2)
+    assert new_memory.get_by_role("user2")[0].content == message2.content
+
+
+def test_memory_ignore_id():
+    memory = Memory(ignore_id=True)
+
+    memory.add_batch([Message(content="a", role="user"), Message(content="a", role="user")])
+    assert memory.count() == 1
+    memory.add(Message(content="b", role="user"))
+    assert memory.count() == 2
+    memory.delete(Message(content="a", role="user"))
+    assert [i.content for i in memory.get()] == ["b"]
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_import_time.py
+@Desc    : Import-time budget of the provider package, measured by `python -X importtime` in a fresh interpreter.
+"""
+import subprocess
+import sys
+
+import pytest
+
+from metagpt.const import METAGPT_ROOT
+
+# The SDKs of the providers other than OpenAI, which must not be imported unless configured.
+PROVIDER_SDKS = [
+    "google.generativeai",
+    "zhipuai",
+    "qianfan",
+    "dashscope",
+    "anthropic",
+    "boto3",
+    "volcenginesdkarkruntime",
+    "agentops",
+]
+IMPORT_TIME_BUDGET_US = 500_000  # cumulative import time of `metagpt.provider` itself, its parents excluded
+
+
+def run_importtime(code: str) -> tuple[dict, set]:
+    """Run `code` in a fresh interpreter, return the cumulative import time in us of each module and the modules
+    loaded at the end."""
+    code = f"{code}\nimport sys\nprint(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        timeout=300,
+        check=True,
+        cwd=METAGPT_ROOT,  # other tests may change the working directory
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times, set(result.stdout.split())
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import metagpt.provider",
+        "import metagpt.software_company",
+        "from metagpt.configs.llm_config import LLMConfig\n"
+        "from metagpt.provider.llm_provider_registry import create_llm_instance\n"
+        "create_llm_instance(LLMConfig(api_key='mock_api_key'))",
+    ],
+)
+def test_provider_sdks_imported_lazily(code):
+    _, modules = run_importtime(code)
+
+    assert not [i for i in PROVIDER_SDKS if i in modules]
+
+
+def test_provider_import_time_budget():
+    times, modules = run_importtime("import metagpt.provider")
+
+    assert "metagpt.provider.openai_api" not in modules
+    assert times["metagpt.provider"] < IMPORT_TIME_BUDGET_US
+
+
+def test_provider_resolved_on_demand():
+    _, modules = run_importtime(
+        "from metagpt.configs.llm_config import LLMConfig, LLMType\n"
+        "from metagpt.provider.llm_provider_registry import create_llm_instance\n"
+        "create_llm_instance(LLMConfig(api_type=LLMType.OLLAMA, base_url='http://localhost:11434/api'))\n"
+        "from metagpt.provider import HumanProvider"
+    )
+
+    assert "metagpt.provider.ollama_api" in modules
+    assert "metagpt.provider.human_provider" in modules
+    assert "metagpt.provider.openai_api" not in modules
+    assert "metagpt.provider.google_gemini_api" not in modules
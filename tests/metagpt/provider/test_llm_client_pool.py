@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_llm_client_pool.py
+"""
+import pytest
+
+from metagpt.configs.llm_config import LLMConfig, LLMType
+from metagpt.context import Context
+from metagpt.provider import OllamaLLM
+from metagpt.provider.llm_client_pool import LLMClientPool, get_llm_client_pool
+from metagpt.provider.openai_api import OpenAILLM
+from metagpt.utils.cost_manager import TokenCostManager
+from tests.metagpt.provider.mock_llm_config import mock_llm_config
+
+
+@pytest.mark.asyncio
+async def test_views_share_client():
+    pool = LLMClientPool()
+    config = mock_llm_config.model_copy(deep=True)
+
+    first = pool.get(config)
+    second = pool.get(LLMConfig(**mock_llm_config.model_dump(exclude_none=True)))
+    assert isinstance(first, OpenAILLM)
+    assert first is not second
+    assert first.aclient is second.aclient
+    assert first.config is config
+    assert pool.stats.opened == 1 and pool.stats.reused == 1
+
+    first.config.model = "other"  # a caller changing its own config does not affect the pool
+    assert pool.get(mock_llm_config).model == mock_llm_config.model
+    assert pool.stats.opened == 1 and pool.stats.reused == 2
+
+    other = pool.get(mock_llm_config.model_copy(update={"model": "gpt-4"}))
+    assert other.aclient is not first.aclient
+    assert pool.stats.opened == 2
+
+    await pool.aclose()
+    assert first.aclient.is_closed() and other.aclient.is_closed()
+    assert pool.stats.closed == 2
+    assert pool.get(mock_llm_config).aclient is not first.aclient
+    assert pool.stats.opened == 3
+
+
+def test_views_have_own_cost_manager():
+    pool = LLMClientPool()
+    config = LLMConfig(api_type=LLMType.OLLAMA, base_url="http://localhost:11434/api", model="llama2")
+
+    first, second = pool.get(config), pool.get(config)
+    assert isinstance(first, OllamaLLM)
+    assert isinstance(first.cost_manager, TokenCostManager)
+    first.cost_manager.update_cost(10, 20, first.model)
+    assert second.cost_manager.total_prompt_tokens == 0
+
+
+def test_connection_limits():
+    config = mock_llm_config.model_copy(update={"max_connections": 4, "keepalive_expiry": 30})
+    limits = OpenAILLM(config)._get_http_client_params()["limits"]
+    assert limits.max_connections == 4
+    assert limits.keepalive_expiry == 30
+
+    assert "limits" not in OpenAILLM(mock_llm_config)._get_http_client_params()
+
+
+def test_context_uses_pool():
+    ctx = Context()
+    ctx.config.llm = mock_llm_config
+    pool = get_llm_client_pool()
+    opened = pool.stats.opened
+
+    llm = ctx.llm()
+    assert ctx.llm_with_cost_manager_from_llm_config(mock_llm_config).aclient is llm.aclient
+    assert llm.cost_manager is ctx.cost_manager
+    assert pool.stats.opened <= opened + 1
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of the LLM request scheduler
+
+import asyncio
+
+import pytest
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.provider.llm_scheduler import (
+    LLMPriority,
+    LLMRequestScheduler,
+    TokenBucket,
+    _request_priority,
+    get_llm_scheduler,
+    llm_request_scope,
+    schedule_completion_text,
+)
+from metagpt.roles import ProductManager, Role
+from metagpt.schema import Message
+
+
+async def _run_in_order(scheduler: LLMRequestScheduler, requests: list[tuple[str, LLMPriority]]) -> list[str]:
+    order = []
+
+    async def _request(owner: str, priority: LLMPriority):
+        async with scheduler.slot(priority=priority, owner=owner):
+            order.append(owner)
+            await asyncio.sleep(0)
+
+    blocker = scheduler.slot(owner="blocker")
+    await blocker.__aenter__()
+    tasks = []
+    for owner, priority in requests:
+        tasks.append(asyncio.create_task(_request(owner, priority)))
+        await asyncio.sleep(0)  # enqueue in order
+    assert scheduler.stats.waiting == len(requests)
+    await blocker.__aexit__(None, None, None)
+    await asyncio.gather(*tasks)
+    return order
+
+
+@pytest.mark.asyncio
+async def test_scheduler_priority_and_fairness():
+    scheduler = LLMRequestScheduler(max_concurrency=1)
+    order = await _run_in_order(
+        scheduler,
+        [("reviewer", LLMPriority.LOW), ("a", LLMPriority.NORMAL), ("planner", LLMPriority.HIGH)],
+    )
+    assert order == ["planner", "a", "reviewer"]
+
+    scheduler = LLMRequestScheduler(max_concurrency=1)
+    order = await _run_in_order(scheduler, [("a", LLMPriority.NORMAL)] * 3 + [("b", LLMPriority.NORMAL)])
+    assert order.index("b") < 3
+    assert scheduler.stats.requests == 5
+    assert scheduler.stats.running == scheduler.stats.waiting == 0
+    assert scheduler.stats.max_wait_time >= scheduler.stats.avg_wait_time > 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_rate_limit():
+    bucket = TokenBucket(rate_per_minute=60)
+    assert bucket.wait_time(60) == 0
+    bucket.consume(60)
+    assert 0.9 < bucket.wait_time(1) <= 1
+    assert bucket.wait_time(1000) > 50  # oversized requests wait for a full bucket
+
+    scheduler = LLMRequestScheduler(tpm=600)
+    async with scheduler.slot(tokens=600):
+        pass
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(scheduler.slot(tokens=600).__aenter__(), timeout=0.1)
+    assert scheduler.stats.waiting == 0
+    async with scheduler.slot(tokens=0):
+        pass
+
+
+def test_get_llm_scheduler():
+    assert get_llm_scheduler(LLMConfig(api_key="mock_api_key")) is None
+    config = LLMConfig(api_key="mock_api_key", model="gpt-4", rpm=10)
+    assert get_llm_scheduler(config) is get_llm_scheduler(config.model_copy())
+    with llm_request_scope(owner="Alice", priority=LLMPriority.HIGH):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_schedule_completion_text_charges_completion(mocker):
+    scheduler = LLMRequestScheduler(tpm=600)
+    mocker.patch("metagpt.provider.llm_scheduler.get_llm_scheduler", return_value=scheduler)
+    mocker.patch("metagpt.provider.llm_scheduler.estimate_tokens", return_value=100)
+    mocker.patch("metagpt.provider.llm_scheduler.estimate_completion_tokens", return_value=200)
+
+    class MockLLM:
+        config = LLMConfig(api_key="mock_api_key", model="gpt-4", tpm=600)
+        model = "gpt-4"
+
+        @schedule_completion_text
+        async def acompletion_text(self, messages, stream=False, timeout=0):
+            return "reply"
+
+    assert await MockLLM().acompletion_text([{"role": "user", "content": "hi"}]) == "reply"
+    assert scheduler._token_bucket.tokens == pytest.approx(300, abs=5)  # the prompt and the completion
+
+
+@pytest.mark.asyncio
+async def test_role_request_priority(mocker):
+    priorities = []
+
+    async def react(self):
+        priorities.append(_request_priority.get())
+        return Message(content="done")
+
+    mocker.patch.object(Role, "react", react)
+    await ProductManager().run(with_message="write a cli snake game")
+    await Role(llm_priority=LLMPriority.LOW).run(with_message="review it")
+
+    assert priorities == [LLMPriority.HIGH, LLMPriority.LOW]
@@ -11,8 +11,10 @@ from PIL import Image
 
 from metagpt.const import TEST_DATA_PATH
 from metagpt.llm import LLM
-from metagpt.logs import logger
+from metagpt.logs import llm_stream_listener, logger
 from metagpt.provider import OpenAILLM
+from metagpt.utils.cost_manager import CostManager
+from metagpt.utils.stream_output_parser import StreamAborted
 from tests.metagpt.provider.mock_llm_config import (
     mock_llm_config,
     mock_llm_config_proxy,
@@ -164,3 +166,33 @@ async def test_openai_acompletion(mocker):
     assert resp.usage == usage
 
     await llm_general_chat_funcs_test(llm, prompt, messages, resp_cont)
+
+
+@pytest.mark.asyncio
+async def test_openai_stream_aborted(mocker):
+    class Stream:
+        closed = False
+
+        async def __aiter__(self):
+            while True:
+                yield default_resp_chunk
+
+        async def close(self):
+            self.closed = True
+
+    stream = Stream()
+    mocker.patch("openai.resources.chat.completions.AsyncCompletions.create", mocker.AsyncMock(return_value=stream))
+    mocker.patch("metagpt.provider.base_llm.count_input_tokens", return_value=92)
+    count_output_tokens = mocker.patch("metagpt.provider.base_llm.count_output_tokens", return_value=2)
+    llm = OpenAILLM(mock_llm_config.model_copy(update={"model": "gpt-4-turbo"}))
+    llm.cost_manager = CostManager()
+
+    def abort(msg):
+        raise StreamAborted("Invalid field")
+
+    with llm_stream_listener(abort), pytest.raises(StreamAborted):
+        await llm.acompletion_text(messages, stream=True)
+
+    assert stream.closed  # the connection goes back to the pool
+    assert count_output_tokens.call_args.args[0] == resp_cont  # the partial reply is paid for
+    assert (llm.cost_manager.total_prompt_tokens, llm.cost_manager.total_completion_tokens) == (92, 2)
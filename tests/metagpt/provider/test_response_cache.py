@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of the LLM response cache
+
+import pytest
+
+from metagpt.configs.llm_config import LLMCacheConfig, LLMCacheType, LLMConfig
+from metagpt.provider.base_llm import BaseLLM
+from metagpt.provider.response_cache import (
+    BaseResponseCache,
+    MemoryResponseCache,
+    SQLiteResponseCache,
+    get_response_cache,
+)
+from metagpt.utils.cost_manager import CostManager
+from tests.metagpt.provider.req_resp_const import (
+    default_resp_cont,
+    get_part_chat_completion,
+    messages,
+)
+
+
+class MockCachedLLM(BaseLLM):
+    def __init__(self, config: LLMConfig):
+        self.config = config
+        self.cost_manager = CostManager()
+        self.calls = 0
+
+    async def _achat_completion(self, messages: list[dict], timeout=3):
+        self.calls += 1
+        return get_part_chat_completion("GPT")
+
+    async def acompletion(self, messages: list[dict], timeout=3):
+        return await self._achat_completion(messages, timeout=timeout)
+
+    async def _achat_completion_stream(self, messages: list[dict], timeout: int = 3) -> str:
+        self.calls += 1
+        return default_resp_cont
+
+
+@pytest.mark.asyncio
+async def test_memory_response_cache():
+    cache = MemoryResponseCache(LLMCacheConfig(enabled=True, max_entries=2))
+    key1 = cache.make_key("gpt-4", messages, temperature=0.0)
+    assert key1 == cache.make_key("gpt-4", [dict(i) for i in messages], temperature=0.0)
+    assert key1 != cache.make_key("gpt-4", messages, temperature=0.5)
+
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    assert await cache.get("a") == "1"
+    await cache.set("c", "3")  # evicts the least recently used "b"
+    assert await cache.get("b") is None
+    assert await cache.get("a") == "1"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_response_cache(tmp_path):
+    config = LLMCacheConfig(enabled=True, backend=LLMCacheType.SQLITE, path=tmp_path / "cache.sqlite3", max_entries=1)
+    await SQLiteResponseCache(config).set("a", "1")
+    cache = SQLiteResponseCache(config)
+    assert await cache.get("a") == "1"
+    await cache.set("b", "2")
+    assert await cache.get("a") is None
+
+    expired = SQLiteResponseCache(config.model_copy(update={"ttl": -1}))
+    assert await expired.get("b") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_completion_text(mocker):
+    mocker.patch("metagpt.provider.response_cache.count_input_tokens", return_value=10)
+    mocker.patch("metagpt.provider.response_cache.count_output_tokens", return_value=3)
+    config = LLMConfig(api_key="mock_api_key", model="gpt-4-turbo", cache=LLMCacheConfig(enabled=True))
+    llm = MockCachedLLM(config)
+    assert await llm.acompletion_text(messages) == default_resp_cont
+    assert await llm.acompletion_text(messages, stream=True) == default_resp_cont
+    assert llm.calls == 1
+
+    other_llm = MockCachedLLM(config)  # shares the cache with the same config
+    assert await other_llm.aask(messages[0]["content"], stream=False)
+    assert other_llm.cost_manager.cache_misses == 1
+    assert await other_llm.acompletion_text(messages) == default_resp_cont
+    assert other_llm.calls == 1
+
+    assert llm.cost_manager.cache_hits == 1
+    assert llm.cost_manager.total_cached_prompt_tokens == 10
+    assert llm.cost_manager.total_cached_completion_tokens == 3
+    assert llm.cost_manager.total_prompt_tokens == 0
+    assert get_response_cache(LLMCacheConfig()) is None
+
+    other_endpoint = MockCachedLLM(config.model_copy(update={"base_url": "http://localhost:8000/v1"}))
+    assert await other_endpoint.acompletion_text(messages) == default_resp_cont
+    assert other_endpoint.calls == 1  # same model name on another endpoint is not served from the cache
+
+
+def test_make_key_covers_endpoint_and_tools():
+    key = BaseResponseCache.make_key(model="gpt-4", messages=messages)
+    assert BaseResponseCache.make_key(model="gpt-4", messages=messages, base_url="http://localhost/v1") != key
+    tools = [{"type": "function", "function": {"name": "f"}}]
+    assert BaseResponseCache.make_key(model="gpt-4", messages=messages, tools=tools) != key
+    assert BaseResponseCache.make_key(
+        model="gpt-4", messages=messages, tools=tools, tool_choice="auto"
+    ) != BaseResponseCache.make_key(model="gpt-4", messages=messages, tools=tools)
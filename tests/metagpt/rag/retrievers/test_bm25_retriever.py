@@ -1,7 +1,10 @@
+import numpy as np
 import pytest
 from llama_index.core import VectorStoreIndex
-from llama_index.core.schema import Node
+from llama_index.core.schema import Node, TextNode
+from rank_bm25 import BM25Okapi
 
+from metagpt.rag.retrievers.bm25_index import BM25Index
 from metagpt.rag.retrievers.bm25_retriever import DynamicBM25Retriever
 
 
@@ -14,14 +17,24 @@ class TestDynamicBM25Retriever:
         self.doc2.get_content.return_value = "Document content 2"
         self.mock_nodes = [self.doc1, self.doc2]
 
-        index = mocker.MagicMock(spec=VectorStoreIndex)
-        index.storage_context.persist.return_value = "ok"
+        self.index = mocker.MagicMock(spec=VectorStoreIndex)
+        self.index.storage_context.persist.return_value = "ok"
 
         mock_nodes = []
-        mock_tokenizer = mocker.MagicMock()
-        self.mock_bm25okapi = mocker.patch("rank_bm25.BM25Okapi.__init__", return_value=None)
+        self.mock_tokenizer = mocker.MagicMock(side_effect=lambda text: text.lower().split())
 
-        self.retriever = DynamicBM25Retriever(nodes=mock_nodes, tokenizer=mock_tokenizer, index=index)
+        self.retriever = DynamicBM25Retriever(nodes=mock_nodes, tokenizer=self.mock_tokenizer, index=self.index)
+
+    @pytest.fixture
+    def text_nodes(self):
+        texts = [
+            "the quick brown fox jumps over the lazy dog",
+            "a quick brown dog outpaces a quick fox",
+            "lorem ipsum dolor sit amet",
+            "the dog sleeps all day",
+            "foxes and dogs are not friends",
+        ]
+        return [TextNode(text=text, id_=f"node{i}") for i, text in enumerate(texts)]
 
     def test_add_docs_updates_nodes_and_corpus(self):
         # Exec
@@ -29,9 +42,59 @@ class TestDynamicBM25Retriever:
 
         # Assert
         assert len(self.retriever._nodes) == len(self.mock_nodes)
-        assert len(self.retriever._corpus) == len(self.mock_nodes)
+        assert self.retriever.bm25.num_docs == len(self.mock_nodes)
         self.retriever._tokenizer.assert_called()
-        self.mock_bm25okapi.assert_called()
+        self.index.insert_nodes.assert_called()
+
+    def test_persist(self, tmp_path):
+        self.retriever.persist(str(tmp_path))
+
+        self.index.storage_context.persist.assert_called()
+
+    def test_scores_match_bm25okapi(self, text_nodes):
+        retriever = DynamicBM25Retriever(nodes=text_nodes[:2], tokenizer=self.mock_tokenizer, similarity_top_k=10)
+        retriever.add_nodes(text_nodes[2:])
+
+        corpus = [node.get_content().lower().split() for node in text_nodes]
+        for query in ["quick fox", "the dog dog", "unknown words", "lorem dog"]:
+            expected = BM25Okapi(corpus).get_scores(query.split())
+            np.testing.assert_allclose(retriever.bm25.get_scores(query.split()), expected)
+
+        nodes = retriever.retrieve("quick fox")
+        assert [n.node.node_id for n in nodes[:2]] == ["node1", "node0"]
+        assert len(nodes) == len(text_nodes)
+
+    def test_delete_and_compact(self, text_nodes):
+        retriever = DynamicBM25Retriever(nodes=text_nodes, tokenizer=self.mock_tokenizer, similarity_top_k=10)
+        retriever.delete_nodes(["node1", "node3"])
+        assert {n.node_id for n in retriever._nodes} == {"node0", "node2", "node4"}
+
+        remaining = [text_nodes[i] for i in (0, 2, 4)]
+        expected = BM25Okapi([node.get_content().split() for node in remaining]).get_scores(["dog", "fox"])
+        nodes = retriever.retrieve("dog fox")
+        assert sorted(n.score for n in nodes) == pytest.approx(sorted(expected))
+
+        retriever.delete_nodes(["node0"])  # more deleted than alive, compacts
+        assert retriever.bm25.num_docs == 2
+        assert [n.node.node_id for n in retriever.retrieve("lorem")][0] == "node2"
+
+        retriever.add_nodes([TextNode(text="lorem lorem lorem", id_="node2")])  # replaces node2
+        assert len(retriever._nodes) == 2
+
+    def test_persist_and_load(self, tmp_path, text_nodes):
+        retriever = DynamicBM25Retriever(nodes=text_nodes[:3], tokenizer=self.mock_tokenizer)
+        retriever.delete_nodes(["node0"])
+        retriever.persist(str(tmp_path))
+        assert BM25Index.exists(tmp_path / DynamicBM25Retriever.PERSIST_SUBDIR)
+
+        self.mock_tokenizer.reset_mock()
+        loaded = DynamicBM25Retriever(nodes=text_nodes[1:3], tokenizer=self.mock_tokenizer, persist_path=tmp_path)
+        self.mock_tokenizer.assert_not_called()  # postings are memory-mapped, not rebuilt
+        assert isinstance(loaded.bm25._doc_ids, np.memmap)
+
+        loaded.add_nodes(text_nodes[3:])
+        corpus = [node.get_content().lower().split() for node in text_nodes[1:]]
+        np.testing.assert_allclose(loaded.bm25.get_scores(["dog"]), BM25Okapi(corpus).get_scores(["dog"]))
 
-    def test_persist(self):
-        self.retriever.persist("")
+        stale = DynamicBM25Retriever(nodes=text_nodes, tokenizer=self.mock_tokenizer, persist_path=tmp_path)
+        assert stale.bm25.num_docs == len(text_nodes)
@@ -1,7 +1,25 @@
+import asyncio
+import time
+
 import pytest
-from llama_index.core.schema import NodeWithScore, TextNode
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
 
 from metagpt.rag.retrievers import SimpleHybridRetriever
+from metagpt.rag.retrievers.hybrid_retriever import FusionMode
+
+
+class BlockingRetriever(BaseRetriever):
+    """A sync-only retriever like BM25, whose default async path blocks."""
+
+    def __init__(self, node_id: str, delay: float):
+        super().__init__()
+        self.node_id = node_id
+        self.delay = delay
+
+    def _retrieve(self, query_bundle):
+        time.sleep(self.delay)
+        return [NodeWithScore(node=TextNode(id_=self.node_id), score=1.0)]
 
 
 class TestSimpleHybridRetriever:
@@ -44,9 +62,81 @@ class TestSimpleHybridRetriever:
         assert len(results) == 3  # Should be 3 unique nodes
         assert set(node.node.node_id for node in results) == {"1", "2", "3"}
 
-        # Check if the scores are correct (assuming you want the highest score)
+        # Check if the scores are fused by reciprocal rank, node 2 is found by both retrievers
         node_scores = {node.node.node_id: node.score for node in results}
-        assert node_scores["2"] == 0.95
+        assert node_scores["2"] == pytest.approx(1 / 62 + 1 / 61)
+        assert results[0].node.node_id == "2"
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_relative_score(self, mocker):
+        mock_retriever1 = mocker.AsyncMock()
+        mock_retriever1.aretrieve.return_value = [
+            NodeWithScore(node=TextNode(id_="1"), score=10.0),
+            NodeWithScore(node=TextNode(id_="2"), score=5.0),
+        ]
+        mock_retriever2 = mocker.AsyncMock()
+        mock_retriever2.aretrieve.return_value = [
+            NodeWithScore(node=TextNode(id_="2"), score=0.9),
+            NodeWithScore(node=TextNode(id_="3"), score=0.1),
+        ]
+        hybrid_retriever = SimpleHybridRetriever(
+            mock_retriever1, mock_retriever2, fusion_mode=FusionMode.RELATIVE_SCORE, weights=[0.3, 0.7]
+        )
+
+        results = await hybrid_retriever._aretrieve(QueryBundle("test query"))
+
+        assert [(n.node.node_id, n.score) for n in results] == [
+            ("2", pytest.approx(0.7)),
+            ("1", pytest.approx(0.3)),
+            ("3", pytest.approx(0.0)),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_concurrently_with_timeout(self, mocker):
+        async def slow_aretrieve(query, **kwargs):
+            await asyncio.sleep(0.2)
+            assert isinstance(query, QueryBundle)
+            query.embedding = [1.0]  # must not leak to the other retrievers
+            return [NodeWithScore(node=TextNode(id_=str(id(query))), score=1.0)]
+
+        async def hanging_aretrieve(query, **kwargs):
+            await asyncio.sleep(10)
+
+        retrievers = [mocker.AsyncMock(), mocker.AsyncMock(), mocker.AsyncMock()]
+        retrievers[0].aretrieve.side_effect = slow_aretrieve
+        retrievers[1].aretrieve.side_effect = slow_aretrieve
+        retrievers[2].aretrieve.side_effect = hanging_aretrieve
+        hybrid_retriever = SimpleHybridRetriever(*retrievers, timeouts=[None, None, 0.3])
+
+        query = QueryBundle("test query")
+        start = time.perf_counter()
+        results = await hybrid_retriever._aretrieve(query)
+
+        assert time.perf_counter() - start < 0.6  # the slowest retriever, not the sum of 0.2 + 0.2 + 0.3
+        assert len(results) == 2
+        assert query.embedding is None
+        latencies = list(hybrid_retriever.latencies.values())
+        assert latencies[0] >= 0.2 and latencies[1] >= 0.2
+        assert latencies[2] is None
+
+    @pytest.mark.asyncio
+    async def test_aretrieve_blocking_retrievers_in_threads(self):
+        retrievers = [BlockingRetriever("1", 0.2), BlockingRetriever("2", 0.2), BlockingRetriever("3", 1)]
+        hybrid_retriever = SimpleHybridRetriever(*retrievers, timeouts=[None, None, 0.3])
+        ticks = []
+
+        async def tick():
+            while len(ticks) < 5:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        start = time.perf_counter()
+        results, _ = await asyncio.gather(hybrid_retriever._aretrieve(QueryBundle("test query")), tick())
+
+        assert time.perf_counter() - start < 0.6  # overlapped, and the hanging one timed out
+        assert {n.node.node_id for n in results} == {"1", "2"}
+        assert list(hybrid_retriever.latencies.values())[2] is None
+        assert ticks[-1] - start < 0.2  # the event loop kept running meanwhile
 
     def test_add_nodes(self, mock_hybrid_retriever: SimpleHybridRetriever, mock_node):
         mock_hybrid_retriever.add_nodes([mock_node])
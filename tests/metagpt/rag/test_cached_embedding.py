@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from llama_index.core.embeddings import MockEmbedding
+
+from metagpt.rag.cached_embedding import (
+    CachedEmbedding,
+    EmbeddingBatcher,
+    get_embedding_cache,
+)
+
+
+class CountingEmbedding(MockEmbedding):
+    """Embeds a text as [len(text)] * embed_dim, and records the texts of every batch."""
+
+    batches: list = []
+
+    def _get_text_embeddings(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text))] * self.embed_dim for text in texts]
+
+    async def _aget_text_embeddings(self, texts):
+        return self._get_text_embeddings(texts)
+
+    def _get_query_embedding(self, query):
+        self.batches.append([query])
+        return [float(len(query))] * self.embed_dim
+
+
+class TestCachedEmbedding:
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return get_embedding_cache(tmp_path / "embedding_cache.sqlite3")
+
+    @pytest.fixture
+    def inner(self):
+        return CountingEmbedding(embed_dim=4, embed_batch_size=2, batches=[])
+
+    def test_cache_hits_skip_model(self, cache, inner):
+        embedding = CachedEmbedding(embed_model=inner, cache=cache)
+
+        first = embedding.get_text_embedding_batch(["a", "bb", "a", "ccc"])
+        assert first == [[1.0] * 4, [2.0] * 4, [1.0] * 4, [3.0] * 4]
+        assert sorted(t for batch in inner.batches for t in batch) == ["a", "bb", "ccc"]
+        assert max(len(batch) for batch in inner.batches) == 2
+
+        inner.batches.clear()
+        assert embedding.get_text_embedding_batch(["ccc", "bb", "dddd"]) == [[3.0] * 4, [2.0] * 4, [4.0] * 4]
+        assert inner.batches == [["dddd"]]
+        assert len(cache) == 4
+
+        embedding.get_query_embedding("bb")
+        embedding.get_query_embedding("bb")
+        assert inner.batches[-1] == ["bb"] and len(inner.batches) == 2  # queries are cached apart from texts
+
+    def test_cache_shared_across_instances(self, tmp_path, cache, inner):
+        CachedEmbedding(embed_model=inner, cache=cache).get_text_embedding_batch(["a", "bb"])
+        assert get_embedding_cache(tmp_path / "embedding_cache.sqlite3") is cache
+
+        inner.batches.clear()
+        other = CachedEmbedding(embed_model=inner, cache=get_embedding_cache(tmp_path / "embedding_cache.sqlite3"))
+        assert other.get_text_embedding_batch(["bb", "a"]) == [[2.0] * 4, [1.0] * 4]
+        assert inner.batches == []
+
+        another_model = CountingEmbedding(embed_dim=8, embed_batch_size=2, batches=[], model_name="other")
+        CachedEmbedding(embed_model=another_model, cache=cache).get_text_embedding_batch(["a"])
+        assert another_model.batches == [["a"]]  # keys are namespaced by model
+
+    @pytest.mark.asyncio
+    async def test_async_requests_are_coalesced(self, cache, inner):
+        embedding = CachedEmbedding(embed_model=inner, cache=cache)
+
+        results = await asyncio.gather(*[embedding.aget_text_embedding_batch([f"t{i}", "shared"]) for i in range(5)])
+
+        assert all(result[1] == [6.0] * 4 for result in results)
+        texts = [t for batch in inner.batches for t in batch]
+        assert sorted(texts) == sorted([f"t{i}" for i in range(5)] + ["shared"])
+        assert all(len(batch) <= 2 for batch in inner.batches)
+
+
+@pytest.mark.asyncio
+async def test_batcher_bounds_concurrency():
+    running = peak = 0
+    batches = []
+
+    async def embed_batch(texts):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        batches.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    batcher = EmbeddingBatcher(embed_batch, batch_size=3, max_concurrency=2)
+    results = await asyncio.gather(*[batcher.embed([f"text{i}"]) for i in range(10)])
+
+    assert [result[0][0] for result in results] == [len(f"text{i}") for i in range(10)]
+    assert sorted(len(batch) for batch in batches) == [1, 3, 3, 3]
+    assert peak == 2
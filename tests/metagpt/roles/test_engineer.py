@@ -7,7 +7,9 @@
 @Modified By: mashenquan, 2023-11-1. In accordance with Chapter 2.2.1 and 2.2.2 of RFC 116, utilize the new message
         distribution feature for message handling.
 """
+import asyncio
 import json
+import time
 from pathlib import Path
 
 import pytest
@@ -16,7 +18,7 @@ from metagpt.actions import WriteCode, WriteTasks
 from metagpt.const import REQUIREMENT_FILENAME, SYSTEM_DESIGN_FILE_REPO, TASK_FILE_REPO
 from metagpt.logs import logger
 from metagpt.roles.engineer import Engineer
-from metagpt.schema import CodingContext, Message
+from metagpt.schema import CodingContext, Document, Message
 from metagpt.utils.common import CodeParser, any_to_name, any_to_str, aread, awrite
 from metagpt.utils.git_repository import ChangeType
 from tests.metagpt.roles.mock import STRS_FOR_PARSING, TASKS, MockMessages
@@ -147,5 +149,66 @@ async def test_new_coding_context(context):
         context.git_repo.delete_repository()
 
 
+def _mock_code_todos(tasks: dict) -> list[WriteCode]:
+    task_doc = Document(root_path=TASK_FILE_REPO, filename="1.json", content=json.dumps(tasks))
+    todos = []
+    for filename in tasks["Task list"]:
+        ctx = CodingContext(filename=filename, task_doc=task_doc)
+        todos.append(WriteCode(i_context=Document(filename=filename, content=ctx.model_dump_json())))
+    return todos
+
+
+def test_get_code_dependencies():
+    tasks = {
+        "Logic Analysis": [
+            ["utils.py", "Contains helper functions"],
+            ["models/board.py", "Contains Board class, imports helpers from utils"],
+            ["game.py", "Contains Game class, from models.board import Board"],
+            ["ui.py", "Contains UI class"],
+            ["main.py", "Contains main function, from game import Game and from ui import UI"],
+        ],
+        "Task list": ["utils.py", "models/board.py", "game.py", "ui.py", "main.py", "README.md"],
+    }
+    dag = Engineer._get_code_dependencies(_mock_code_todos(tasks))
+    assert dag == {
+        "utils.py": set(),
+        "models/board.py": {"utils.py"},
+        "game.py": {"models/board.py"},
+        "ui.py": set(),
+        "main.py": {"game.py", "ui.py"},
+        "README.md": {"utils.py", "models/board.py", "game.py", "ui.py", "main.py"},  # no logic analysis
+    }
+
+
+@pytest.mark.asyncio
+async def test_act_parallel_with_cr(mocker):
+    tasks = {
+        "Logic Analysis": [["a.py", ""], ["b.py", ""], ["c.py", ""], ["main.py", "from a import A, from b import B"]],
+        "Task list": ["a.py", "b.py", "c.py", "main.py"],
+    }
+    running, peak, saved = set(), 0, []
+
+    async def write_code_with_cr(self, todo, review=False):
+        nonlocal peak
+        filename = todo.i_context.filename
+        if filename == "main.py":
+            assert {"a.py", "b.py"} <= set(saved)
+        running.add(filename)
+        peak = max(peak, len(running))
+        await asyncio.sleep(0.05)
+        running.discard(filename)
+        saved.append(filename)
+        return filename
+
+    mocker.patch.object(Engineer, "_write_code_with_cr", write_code_with_cr)
+    engineer = Engineer(n_borg=2)
+    engineer.code_todos = _mock_code_todos(tasks)
+
+    start = time.perf_counter()
+    assert await engineer._act_sp_with_cr() == {"a.py", "b.py", "c.py", "main.py"}
+    assert time.perf_counter() - start < 0.19  # two rounds rather than four files in a row
+    assert peak == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
@@ -10,7 +10,7 @@ from pathlib import Path
 
 import pytest
 
-from metagpt.actions import UserRequirement
+from metagpt.actions import Action, UserRequirement
 from metagpt.environment import Environment
 from metagpt.logs import logger
 from metagpt.roles import Architect, ProductManager, Role
@@ -60,5 +60,56 @@ async def test_publish_and_process_message(env: Environment):
     assert len(env.history) > 10
 
 
+class MockAction(Action):
+    async def run(self, *args, **kwargs):
+        return "done"
+
+
+@pytest.mark.asyncio
+async def test_event_driven_run():
+    env = Environment(event_driven=True, max_concurrency=2)
+    roles = [Role(name=f"Role{i}", profile=f"profile{i}", actions=[MockAction()]) for i in range(3)]
+    env.add_roles(roles)
+    assert env.is_idle
+
+    env.publish_message(Message(content="hello", cause_by=UserRequirement, send_to="Role0"))
+    assert not env.is_idle
+    await env.run()
+    stats = env.round_stats[-1]
+    assert stats.roles_woken == 1
+    assert stats.idle_skips == 2
+    assert stats.idle_runs == 0
+
+    # The response of Role0 is broadcast, but nobody watches `MockAction`.
+    await env.run()
+    stats = env.round_stats[-1]
+    assert stats.roles_woken == 3
+    assert stats.idle_runs == 3
+    assert env.is_idle
+
+
+def test_publish_message_routing(tmp_path):
+    env = Environment(max_history=2, history_file=tmp_path / "history.txt")
+    alice = Role(name="Alice", profile="product manager")
+    bob = Role(name="Bob", profile="engineer")
+    env.add_roles([alice, bob])
+
+    env.publish_message(Message(content="to alice", send_to="Alice"))
+    assert alice.rc.msg_buffer.pop_all()[0].content == "to alice"
+    assert bob.rc.msg_buffer.empty()
+
+    bob.set_addresses({"Bob", "reviewer"})
+    env.publish_message(Message(content="to reviewer", send_to="reviewer"))
+    assert alice.rc.msg_buffer.empty()
+    assert bob.rc.msg_buffer.pop_all()[0].content == "to reviewer"
+
+    env.publish_message(Message(content="to all"))
+    assert len(alice.rc.msg_buffer.pop_all()) == len(bob.rc.msg_buffer.pop_all()) == 1
+
+    assert "to alice" not in env.history
+    assert "to reviewer" in env.history and "to all" in env.history
+    assert "to alice" in (tmp_path / "history.txt").read_text()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
@@ -1,11 +1,24 @@
+import shutil
+import subprocess
+import time
 from pathlib import Path
 from pprint import pformat
+from unittest.mock import patch
 
 import pytest
 
 from metagpt.const import METAGPT_ROOT
 from metagpt.logs import logger
-from metagpt.repo_parser import DotClassAttribute, DotClassMethod, DotReturn, RepoParser
+from metagpt.repo_parser import (
+    SYMBOL_CACHE_ROOT,
+    CodeBlockInfo,
+    DotClassAttribute,
+    DotClassMethod,
+    DotReturn,
+    RepoParser,
+    _parse_symbols,
+    get_symbol_cache_dir,
+)
 
 
 def test_repo_parser():
@@ -21,6 +34,84 @@ def test_repo_parser():
     assert output_path.exists()
 
 
+def test_generate_symbols_cache(tmp_path):
+    base_directory = tmp_path / "repo"
+    shutil.copytree(METAGPT_ROOT / "metagpt" / "strategy", base_directory)
+    cache_dir = tmp_path / "cache"
+    expected = RepoParser(base_directory=base_directory, cache_dir=None).generate_symbols()
+
+    assert RepoParser(base_directory=base_directory, cache_dir=cache_dir).generate_symbols() == expected
+    assert list(cache_dir.glob("*.json"))
+    with patch("metagpt.repo_parser._parse_symbols") as parse:
+        assert RepoParser(base_directory=base_directory, cache_dir=cache_dir).generate_symbols() == expected
+        parse.assert_not_called()
+
+    # only the changed file is parsed again
+    (base_directory / "base.py").touch()  # same content
+    with open(base_directory / "planner.py", "a") as f:
+        f.write("\n\ndef new_function():\n    pass\n")
+    with patch("metagpt.repo_parser._parse_symbols", wraps=_parse_symbols) as parse:
+        symbols = RepoParser(base_directory=base_directory, cache_dir=cache_dir).generate_symbols()
+        assert [i.args[1].name for i in parse.call_args_list] == ["planner.py"]
+    planner = next(i for i in symbols if i.file == "planner.py")
+    assert "new_function" in planner.functions
+    assert all(isinstance(i, CodeBlockInfo) for i in planner.page_info)
+
+
+@pytest.mark.asyncio
+async def test_rebuild_class_views_cache(tmp_path):
+    base_directory = tmp_path / "repo"
+    shutil.copytree(METAGPT_ROOT / "metagpt" / "strategy", base_directory)
+    cache_dir = tmp_path / "cache"
+    repo_parser = RepoParser(base_directory=base_directory, cache_dir=cache_dir)
+
+    def pyreverse(command, cwd, **kwargs):
+        (Path(cwd) / "classes.dot").write_text('digraph "classes" {\n}\n')
+        return subprocess.CompletedProcess(command, 0)
+
+    with patch("metagpt.repo_parser.subprocess.run", side_effect=pyreverse) as run:
+        await repo_parser.rebuild_class_views(base_directory)
+        await repo_parser.rebuild_class_views(base_directory)
+        assert run.call_count == 1
+
+        with open(base_directory / "planner.py", "a") as f:
+            f.write("\n\ndef new_function():\n    pass\n")
+        await repo_parser.rebuild_class_views(base_directory)
+        assert run.call_count == 2
+    assert len(list(cache_dir.glob("*.classes.dot"))) == 1  # the view of the old tree is evicted
+
+    assert RepoParser(base_directory=base_directory).cache_dir is None  # callers pass `get_symbol_cache_dir()`
+
+
+def test_get_symbol_cache_dir(mocker):
+    assert get_symbol_cache_dir(mocker.Mock(symbol_cache=True)) == SYMBOL_CACHE_ROOT
+    assert get_symbol_cache_dir(mocker.Mock(symbol_cache=False)) is None
+    assert get_symbol_cache_dir() == SYMBOL_CACHE_ROOT  # on by default
+
+
+def test_generate_symbols_benchmark(tmp_path):
+    """Symbols of the metagpt package, uncached, parsed in a process pool, and cached."""
+    base_directory = METAGPT_ROOT / "metagpt"
+    start = time.perf_counter()
+    expected = RepoParser(base_directory=base_directory, cache_dir=None, max_workers=1).generate_symbols()
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    symbols = RepoParser(base_directory=base_directory, cache_dir=tmp_path, max_workers=4).generate_symbols()
+    pooled = time.perf_counter() - start
+    assert symbols == expected
+
+    cached = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        symbols = RepoParser(base_directory=base_directory, cache_dir=tmp_path).generate_symbols()
+        cached = min(cached, time.perf_counter() - start)
+        assert symbols == expected
+
+    logger.info(f"{len(symbols)} files, sequential: {sequential:.3f}s, pooled: {pooled:.3f}s, cached: {cached:.3f}s")
+    assert cached < sequential / 3
+
+
 def test_error():
     """_parse_file should return empty list when file not existed"""
     rsp = RepoParser._parse_file(Path("test_not_existed_file.py"))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_code_context.py
+@Desc    : Unit tests for code_context.py
+"""
+import pytest
+
+from metagpt.utils.code_context import (
+    CodeContextPacker,
+    CodeFile,
+    mentions_file,
+    render_signatures,
+)
+
+GAME = '''
+import random
+
+SIZE = 4
+
+
+class Game:
+    """The 2048 game.
+
+    Keeps the board and the score.
+    """
+
+    def __init__(self):
+        self.board = [[0] * SIZE for _ in range(SIZE)]
+
+    def move(self, direction: str) -> bool:
+        """Move the tiles."""
+        return random.random() > 0.5
+'''
+UI = "class UI:\n    def draw(self, board):\n" + "        print(board)\n" * 30
+UTILS = "def clamp(x, low, high):\n    return max(low, min(x, high))\n" * 10
+
+
+@pytest.fixture
+def files():
+    return [
+        CodeFile(filename=name, content=content, text=f"----- {name}\n```{content}```")
+        for name, content in [("utils.py", UTILS), ("game.py", GAME), ("ui.py", UI)]
+    ]
+
+
+@pytest.fixture(autouse=True)
+def mock_count_tokens(mocker):
+    mocker.patch(
+        "metagpt.utils.code_context.count_output_tokens_batch", side_effect=lambda texts, model: [len(i) for i in texts]
+    )
+
+
+def test_mentions_file():
+    assert mentions_file("from game import Game", "game.py")
+    assert mentions_file("uses models.board.Board", "models/board.py")
+    assert not mentions_file("from endgame import Game", "game.py")
+
+
+def test_render_signatures():
+    signatures = render_signatures(GAME)
+    assert "class Game:" in signatures
+    assert "def move(self, direction: str) -> bool:" in signatures
+    assert '"""The 2048 game."""' in signatures
+    assert "Keeps the board" not in signatures
+    assert "random.random()" not in signatures
+    assert render_signatures("<html></html>") == ""
+
+
+def test_pack_within_budget(files):
+    packer = CodeContextPacker(target="main.py", token_budget=100000)
+    packed = packer.pack(files)
+    assert packed.text == "\n".join(i.text for i in files)
+    assert packed.included == ["utils.py", "game.py", "ui.py"]
+
+
+def test_pack_over_budget(files):
+    packer = CodeContextPacker(
+        target="main.py",
+        target_description="Contains main function, from game import Game",
+        target_code="ui = UI()",
+        token_budget=len(files[1].text) + 300,
+    )
+    assert packer.rank(files)[1] > packer.rank(files)[2] > packer.rank(files)[0]
+
+    packed = packer.pack(files)
+    assert packed.included == ["game.py"]
+    assert packed.summarized == ["ui.py"]
+    assert packed.elided == ["utils.py"]
+    assert packed.tokens <= packer.token_budget
+    assert files[1].text in packed.text
+    assert "----- ui.py (signatures only)" in packed.text
+    assert packed.text.endswith("----- Omitted for length: utils.py")
+
+
+def test_pack_pinned(files):
+    files[2].pinned = True
+    packed = CodeContextPacker(target="ui.py", token_budget=10).pack(files)
+    assert packed.included == ["ui.py"]
+    assert packed.elided == ["utils.py", "game.py"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-s"])
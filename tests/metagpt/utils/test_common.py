@@ -6,6 +6,7 @@
 @File    : test_common.py
 @Modified by: mashenquan, 2023/11/21. Add unit tests.
 """
+import asyncio
 import importlib
 import os
 import platform
@@ -31,6 +32,7 @@ from metagpt.utils.common import (
     concat_namespace,
     import_class_inst,
     parse_recipient,
+    pop_closed_loops,
     print_members,
     read_file_block,
     read_json_file,
@@ -214,6 +216,15 @@ class TestGetProjectRoot:
         data = await aread(filename=pathname, encoding="utf-8")
         assert data == content
 
+    def test_pop_closed_loops(self):
+        closed, running = asyncio.new_event_loop(), asyncio.new_event_loop()
+        closed.close()
+        registry = {closed: "a", running: "b"}
+
+        assert pop_closed_loops(registry) == ["a"]
+        assert registry == {running: "b"}
+        running.close()
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
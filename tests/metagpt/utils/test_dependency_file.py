@@ -8,12 +8,14 @@
 """
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 from typing import Optional, Set, Union
 
 import pytest
 from pydantic import BaseModel
 
+from metagpt.utils import dependency_file
 from metagpt.utils.dependency_file import DependencyFile
 
 
@@ -61,5 +63,64 @@ async def test_dependency_file():
     assert not file.exists
 
 
+@pytest.mark.asyncio
+async def test_dependency_file_write_behind(tmp_path, mocker):
+    file = DependencyFile(workdir=tmp_path, flush_delay=0.1)
+    await file.update(filename="a.py", dependencies={"docs/design.md", "docs/task.md"})
+    await file.update(filename=tmp_path / "b.py", dependencies={"docs/design.md"})
+    await file.update(filename="c.py", dependencies={"docs/task.md"})
+    assert not file.exists
+
+    assert await file.get_dependents("docs/design.md") == {"a.py", "b.py"}
+    assert await file.get_dependents(tmp_path / "docs/task.md") == {"a.py", "c.py"}
+    await file.update(filename="a.py", dependencies={"docs/task.md"})
+    await file.update(filename="c.py", dependencies=None)
+    assert await file.get_dependents("docs/design.md") == {"b.py"}
+    assert await file.get_dependents("docs/task.md") == {"a.py"}
+
+    await asyncio.sleep(0.2)
+    assert file.exists
+    file1 = DependencyFile(workdir=tmp_path)
+    assert await file1.get_dependents("docs/design.md") == {"b.py"}
+
+    # the file is read only when changed by someone else
+    aread = mocker.spy(dependency_file, "aread")
+    await file.get("a.py")
+    aread.assert_not_called()
+    await file1.update(filename="d.py", dependencies={"docs/design.md"})
+    assert await file.get_dependents("docs/design.md") == {"b.py", "d.py"}
+    assert aread.call_count == 1
+
+    await file.update(filename="e.py", dependencies={"docs/design.md"})
+    file.flush_sync()
+    assert await DependencyFile(workdir=tmp_path).get("e.py") == {"docs/design.md"}
+
+
+@pytest.mark.asyncio
+async def test_dependency_file_debounce(tmp_path):
+    file = DependencyFile(workdir=tmp_path, flush_delay=0.1)
+    for i in range(4):  # a burst longer than the delay
+        await file.update(filename=f"{i}.py", dependencies={"docs/design.md"})
+        await asyncio.sleep(0.06)
+        assert not file.exists
+
+    await asyncio.sleep(0.1)
+    assert file.exists
+    assert await DependencyFile(workdir=tmp_path).get_dependents("docs/design.md") == {"0.py", "1.py", "2.py", "3.py"}
+
+
+def test_dependency_file_flush_after_loop_closed(tmp_path):
+    file = DependencyFile(workdir=tmp_path, flush_delay=0.05)
+    asyncio.run(file.update(filename="a.py", dependencies={"docs/design.md"}))  # the loop closes before the flush
+    assert not file.exists
+
+    async def update_and_wait():
+        await file.update(filename="b.py", dependencies={"docs/design.md"})
+        await asyncio.sleep(0.1)
+
+    asyncio.run(update_and_wait())
+    assert file.exists
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
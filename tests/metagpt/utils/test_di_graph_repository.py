@@ -7,15 +7,23 @@
 @Desc    : Unit tests for di_graph_repository.py
 """
 
+import json
 from pathlib import Path
 
+import networkx
 import pytest
 from pydantic import BaseModel
 
 from metagpt.const import DEFAULT_WORKSPACE_ROOT
-from metagpt.repo_parser import RepoParser
+from metagpt.repo_parser import (
+    DotClassAttribute,
+    DotClassInfo,
+    DotClassMethod,
+    DotClassRelationship,
+    RepoParser,
+)
 from metagpt.utils.di_graph_repository import DiGraphRepository
-from metagpt.utils.graph_repository import GraphRepository
+from metagpt.utils.graph_repository import SPO, GraphKeyword, GraphRepository
 
 
 @pytest.mark.asyncio
@@ -81,5 +89,93 @@ async def test_codes():
     print(data)
 
 
+@pytest.mark.asyncio
+async def test_select_delete_by_index(tmp_path):
+    graph = DiGraphRepository(name="test", root=tmp_path)
+    await graph.insert_many(
+        [
+            SPO(subject="a.py", predicate=GraphKeyword.IS, object_=GraphKeyword.SOURCE_CODE),
+            SPO(subject="a.py", predicate=GraphKeyword.HAS_CLASS, object_="a.py:A"),
+            SPO(subject="a.py:A", predicate=GraphKeyword.IS, object_=GraphKeyword.CLASS),
+            SPO(subject="b.py:B", predicate=GraphKeyword.IS, object_=GraphKeyword.CLASS),
+        ]
+    )
+    # One edge per subject and object: the predicate is replaced
+    await graph.insert(subject="a.py", predicate=GraphKeyword.HAS_FUNCTION, object_="a.py:A")
+
+    def triples(rows):
+        return sorted((i.subject, i.predicate, i.object_) for i in rows)
+
+    assert triples(await graph.select(subject="a.py")) == [
+        ("a.py", GraphKeyword.HAS_FUNCTION, "a.py:A"),
+        ("a.py", GraphKeyword.IS, GraphKeyword.SOURCE_CODE),
+    ]
+    assert await graph.select(subject="a.py", predicate=GraphKeyword.HAS_CLASS) == []
+    assert triples(await graph.select(predicate=GraphKeyword.IS, object_=GraphKeyword.CLASS)) == [
+        ("a.py:A", GraphKeyword.IS, GraphKeyword.CLASS),
+        ("b.py:B", GraphKeyword.IS, GraphKeyword.CLASS),
+    ]
+    assert triples(await graph.select(object_="a.py:A")) == [("a.py", GraphKeyword.HAS_FUNCTION, "a.py:A")]
+    assert len(await graph.select(subject="a.py", object_="a.py:A", predicate=GraphKeyword.IS)) == 0
+    assert len(await graph.select()) == 4
+
+    assert await graph.delete(predicate=GraphKeyword.IS, object_=GraphKeyword.CLASS) == 2
+    assert await graph.select(object_=GraphKeyword.CLASS) == []
+    deleted = await graph.delete_many(
+        [
+            SPO(subject="a.py", predicate=GraphKeyword.HAS_FUNCTION, object_="a.py:A"),
+            SPO(subject="a.py", predicate=GraphKeyword.HAS_CLASS, object_=GraphKeyword.SOURCE_CODE),
+        ]
+    )
+    assert deleted == 1
+    assert triples(await graph.select()) == [("a.py", GraphKeyword.IS, GraphKeyword.SOURCE_CODE)]
+    assert triples(await graph.select(subject="a.py")) == triples(await graph.select())
+
+
+@pytest.mark.asyncio
+async def test_save_load(tmp_path):
+    graph = DiGraphRepository(name="test", root=tmp_path)
+    spos = [SPO(subject=f"s{i % 7}", predicate=f"p{i % 3}", object_=f"o{i}") for i in range(50)]
+    await graph.insert_many(spos)
+    await graph.save()
+
+    loaded = await DiGraphRepository.load_from(graph.pathname)
+    assert await loaded.select() == await graph.select()
+    assert await loaded.select(predicate="p1", subject="s1") == await graph.select(predicate="p1", subject="s1")
+    assert len(graph.json()) < len(json.dumps(networkx.node_link_data(graph.repo)))
+
+    # Graphs saved in the `networkx.node_link_data` format are still loaded
+    old = DiGraphRepository(name="old", root=tmp_path).load_json(json.dumps(networkx.node_link_data(graph.repo)))
+    assert await old.select(object_="o7") == [SPO(subject="s0", predicate="p1", object_="o7")]
+
+
+@pytest.mark.asyncio
+async def test_update_graph_db_with_class_views(tmp_path):
+    graph = DiGraphRepository(name="test", root=tmp_path)
+    class_views = [
+        DotClassInfo(
+            name="Game",
+            package="game.py:Game",
+            attributes={
+                "board": DotClassAttribute(
+                    name="board", type_="Board", description="board : Board", compositions=["Board"]
+                )
+            },
+            methods={"move": DotClassMethod(name="move", description="move(direction)")},
+            compositions=["Board"],
+        )
+    ]
+    await GraphRepository.update_graph_db_with_class_views(graph, class_views)
+    relationship_views = [DotClassRelationship(src="game.py:Game", dest="board.py:Board", relationship="Composite")]
+    await GraphRepository.update_graph_db_with_class_relationship_views(graph, relationship_views)
+
+    assert await graph.select(subject="game.py", predicate=GraphKeyword.HAS_CLASS) == [
+        SPO(subject="game.py", predicate=GraphKeyword.HAS_CLASS, object_="game.py:Game")
+    ]
+    assert await graph.select(subject="game.py:Game", predicate=GraphKeyword.HAS_CLASS_METHOD)
+    assert await graph.select(subject="game.py:Game", predicate=GraphKeyword.IS_COMPOSITE_OF)
+    assert await graph.select(subject="game.py:Game", object_="board.py:Board")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
@@ -13,7 +13,7 @@ from pathlib import Path
 import pytest
 
 from metagpt.utils.common import awrite
-from metagpt.utils.git_repository import GitRepository
+from metagpt.utils.git_repository import ChangeType, GitRepository
 
 
 async def mock_file(filename, content=""):
@@ -100,6 +100,8 @@ async def test_dependency_file():
     assert not dependancy_file.exists
 
     await dependancy_file.update(filename="a/b.txt", dependencies={"c/d.txt", "e/f.txt"})
+    assert not dependancy_file.exists  # written behind
+    await dependancy_file.flush()
     assert dependancy_file.exists
 
     repo.delete_repository()
@@ -121,5 +123,37 @@ async def test_git_open():
     shutil.rmtree(path=str(local_path), ignore_errors=True)
 
 
+@pytest.mark.asyncio
+async def test_git_snapshot(mocker):
+    local_path = Path(__file__).parent / "git5"
+    repo, subdir = await mock_repo(local_path)
+    repo.add_change(repo.changed_files)
+    repo.commit("commit1")
+    file_repo = repo.new_file_repository("subdir")
+
+    with repo.snapshot():
+        spy = mocker.spy(repo._repository.index.__class__, "diff")
+        assert not repo.changed_files
+        assert set(file_repo.all_files) == {"c.txt"}
+
+        await file_repo.save("c.txt", "changed")
+        await file_repo.save("d.txt", "new")
+        await file_repo.save("__pycache__/d.pyc", "ignored")
+        await mock_file(local_path / "a.txt", "not saved by FileRepository")
+        assert file_repo.changed_files == {"c.txt": ChangeType.MODIFIED, "d.txt": ChangeType.UNTRACTED}
+        assert set(file_repo.all_files) == {"c.txt", "d.txt"}
+
+        await file_repo.save("c.txt", "")  # same content as committed
+        await file_repo.delete("d.txt")
+        assert not file_repo.changed_files
+        assert set(file_repo.all_files) == {"c.txt"}
+        assert spy.call_count == 1  # the working tree was scanned once
+
+    # outside the snapshot, the working tree is scanned on each access
+    assert repo.changed_files == {"a.txt": ChangeType.MODIFIED}  # the dependency file is written behind
+
+    repo.delete_repository()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
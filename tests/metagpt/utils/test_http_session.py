@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : unittest of the shared http sessions
+
+import asyncio
+
+import aiohttp
+import aiohttp.web
+import pytest
+
+from metagpt.configs.http_config import HTTPConfig
+from metagpt.utils.ahttp_client import apost
+from metagpt.utils.http_session import (
+    close_http_sessions,
+    get_aiohttp_session,
+    get_http_session_manager,
+    get_httpx_client,
+    http_retry,
+)
+
+
+@pytest.fixture
+def counting_server():
+    peers = []
+    statuses = []
+
+    async def handler(request):
+        peers.append(request.transport.get_extra_info("peername"))
+        return aiohttp.web.json_response({"ok": True}, status=statuses.pop(0) if statuses else 200)
+
+    async def start():
+        runner = aiohttp.web.ServerRunner(aiohttp.web.Server(handler))
+        await runner.setup()
+        site = aiohttp.web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        _, port, *_ = site._server.sockets[0].getsockname()
+        return runner, f"http://127.0.0.1:{port}"
+
+    return start, peers, statuses
+
+
+@pytest.mark.asyncio
+async def test_shared_session_reuses_connections(counting_server):
+    start, peers, _ = counting_server
+    runner, url = await start()
+    try:
+        assert get_aiohttp_session() is get_aiohttp_session()
+        for _ in range(3):
+            assert await apost(url=url, as_json=True) == {"ok": True}
+        assert len(peers) == 3
+        assert len(set(peers)) == 1  # keep-alive: one connection for all requests
+
+        client = get_httpx_client()
+        assert client is get_httpx_client()
+        assert (await client.get(url)).json() == {"ok": True}
+    finally:
+        await close_http_sessions()
+        await runner.cleanup()
+    assert get_aiohttp_session() is not None  # recreated after close
+    await close_http_sessions()
+
+
+@pytest.mark.asyncio
+async def test_http_retry(counting_server, mocker):
+    mocker.patch.object(
+        get_http_session_manager(), "_config", HTTPConfig(max_retries=1, retry_min_wait=0, retry_max_wait=0)
+    )
+    start, peers, statuses = counting_server
+    runner, url = await start()
+    try:
+        statuses.append(503)
+        assert await apost(url=url, as_json=True) == {"ok": True}
+        assert len(peers) == 2
+
+        statuses.extend([503, 503])
+        with pytest.raises(aiohttp.ClientResponseError):
+            await apost(url=url, as_json=True)
+
+        calls = []
+
+        @http_retry
+        async def bad_request():
+            calls.append(1)
+            raise ValueError("not retryable")
+
+        with pytest.raises(ValueError):
+            await bad_request()
+        assert len(calls) == 1
+    finally:
+        await close_http_sessions()
+        await runner.cleanup()
+
+
+def test_closed_loop_sessions_dropped():
+    manager = get_http_session_manager()
+
+    async def open_sessions():
+        return get_aiohttp_session(), get_httpx_client()
+
+    loop = asyncio.new_event_loop()
+    session, _ = loop.run_until_complete(open_sessions())
+    loop.close()
+    assert manager._sessions[loop] is session
+
+    asyncio.run(open_sessions())
+    assert loop not in manager._sessions and loop not in manager._clients
+    assert session.closed  # detached from its connector without touching the closed loop
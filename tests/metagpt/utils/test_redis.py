@@ -5,33 +5,54 @@
 @Author  : mashenquan
 @File    : test_redis.py
 """
-from unittest.mock import AsyncMock
-
 import pytest
 
-from metagpt.utils.redis import Redis
+from metagpt.configs.redis_config import RedisConfig
+from metagpt.utils.redis import Redis, close_connection_pools, get_connection_pool
+from tests.mock.mock_redis import MockRedis
+
+
+@pytest.fixture
+def mock_redis(mocker):
+    client = MockRedis()
+    mocker.patch("redis.asyncio.Redis", return_value=client)
+    return client
+
+
+@pytest.fixture
+def redis_config():
+    return RedisConfig(host="localhost", port=6379, password="mockpwd", db="0")
 
 
 @pytest.mark.asyncio
-async def test_redis(mocker):
-    async def async_mock_from_url(*args, **kwargs):
-        mock_client = AsyncMock()
-        mock_client.set.return_value = None
-        mock_client.get.return_value = b"test"
-        return mock_client
-
-    mocker.patch("aioredis.from_url", return_value=async_mock_from_url())
-    mock_config = mocker.Mock()
-    mock_config.to_url.return_value = "http://mock.com"
-    mock_config.username = "mockusername"
-    mock_config.password = "mockpwd"
-    mock_config.db = "0"
-
-    conn = Redis(mock_config)
+async def test_redis(mock_redis, redis_config):
+    conn = Redis(redis_config)
     await conn.set("test", "test", timeout_sec=0)
     assert await conn.get("test") == b"test"
     await conn.close()
 
 
+@pytest.mark.asyncio
+async def test_redis_pool(redis_config):
+    pool = get_connection_pool(redis_config)
+    assert get_connection_pool(RedisConfig(**redis_config.model_dump())) is pool
+    assert get_connection_pool(redis_config.model_copy(update={"db": "1"})) is not pool
+    await close_connection_pools()
+    assert get_connection_pool(redis_config) is not pool
+
+
+@pytest.mark.asyncio
+async def test_redis_batch(mock_redis, redis_config):
+    conn = Redis(redis_config)
+    assert await conn.mset({"a": "1", "b": "2"}, timeout_sec=60)
+    assert await conn.mget(["a", "b", "c"]) == [b"1", b"2", None]
+    assert mock_redis.expiry == {"a": 60, "b": 60}
+
+    assert await conn.write(sets={"s": "x"}, appends={"l1": ["1", "2"], "l2": ["3"]}, timeout_sec=60)
+    assert await conn.write(appends={"l1": ["4"]}, deletes=["l2"])
+    assert await conn.lrange_many(["l1", "l2"]) == [[b"1", b"2", b"4"], []]
+    assert mock_redis.round_trips == 5
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
@@ -15,6 +15,7 @@ from metagpt.config2 import Config
 from metagpt.configs.s3_config import S3Config
 from metagpt.utils.common import aread
 from metagpt.utils.s3 import S3
+from tests.mock.mock_s3 import MockS3Client
 
 
 @pytest.mark.asyncio
@@ -68,5 +69,70 @@ async def test_s3(mocker):
         pass
 
 
+@pytest.fixture
+def mock_s3(mocker):
+    client = MockS3Client()
+    mocker.patch.object(aioboto3.Session, "client", return_value=client)
+    return client
+
+
+@pytest.fixture
+def s3_config():
+    return S3Config(
+        access_key="mock_access_key",
+        secret_key="mock_secret_key",
+        endpoint="http://mock.endpoint",
+        bucket="mock_bucket",
+        multipart_threshold=1000,
+        part_size=300,
+        max_concurrency=2,
+    )
+
+
+@pytest.mark.asyncio
+async def test_s3_multipart(mock_s3, s3_config, tmp_path):
+    data = bytes(range(256)) * 5
+    local_path = tmp_path / "data.bin"
+    local_path.write_bytes(data)
+
+    async with S3(s3_config) as conn:
+        assert await conn.upload_file(s3_config.bucket, str(local_path), "data.bin", skip_unchanged=True)
+        assert sorted(i[2] for i in mock_s3.calls if i[0] == "upload_part") == [1, 2, 3, 4, 5]
+        assert mock_s3.peak == 2
+        assert mock_s3.objects[(s3_config.bucket, "data.bin")][0] == data
+
+        # The ETag of the multipart upload matches the local file
+        assert not await conn.upload_file(s3_config.bucket, str(local_path), "data.bin", skip_unchanged=True)
+        assert len([i for i in mock_s3.calls if i[0] == "upload_part"]) == 5
+
+        downloaded = tmp_path / "downloaded.bin"
+        await conn.download_file(s3_config.bucket, "data.bin", str(downloaded), chunk_size=64)
+        assert downloaded.read_bytes() == data
+        ranges = {i[2] for i in mock_s3.calls if i[0] == "get_object" and i[2]}
+        assert ranges == {"bytes=300-599", "bytes=600-899", "bytes=900-1199", "bytes=1200-1279"}
+    assert mock_s3.closed
+
+
+@pytest.mark.asyncio
+async def test_s3_dir(mock_s3, s3_config, tmp_path):
+    local_dir = tmp_path / "local"
+    for name, content in {"a.txt": b"a", "sub/b.txt": b"b" * 10, "sub/c.bin": b"c" * 1500}.items():
+        (local_dir / name).parent.mkdir(parents=True, exist_ok=True)
+        (local_dir / name).write_bytes(content)
+
+    async with S3(s3_config) as conn:
+        uploaded = await conn.upload_dir(s3_config.bucket, local_dir, prefix="out/")
+        assert uploaded == ["out/a.txt", "out/sub/b.txt", "out/sub/c.bin"]
+        (local_dir / "a.txt").write_bytes(b"changed")
+        assert await conn.upload_dir(s3_config.bucket, local_dir, prefix="out") == ["out/a.txt"]
+
+        download_dir = tmp_path / "download"
+        downloaded = await conn.download_prefix(s3_config.bucket, "out/", download_dir)
+        assert sorted(i.relative_to(download_dir).as_posix() for i in downloaded) == ["a.txt", "sub/b.txt", "sub/c.bin"]
+        assert (download_dir / "sub/c.bin").read_bytes() == b"c" * 1500
+        assert (download_dir / "a.txt").read_bytes() == b"changed"
+        assert await conn.download_prefix(s3_config.bucket, "out/", download_dir) == []
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
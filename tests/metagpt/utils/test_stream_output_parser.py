@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : test_stream_output_parser.py
+"""
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+from metagpt.utils.stream_output_parser import StreamAborted, StreamOutputParser
+
+
+class Output(BaseModel):
+    name: str = ""
+    files: List[str] = []
+    detail: dict = {}
+
+
+MAPPING = {"name": (str, ...), "files": (List[str], ...), "detail": (dict, ...)}
+
+
+def stream(parser: StreamOutputParser, text: str, size: int = 3):
+    for i in range(0, len(text), size):
+        parser.feed(text[i : i + size])
+
+
+def test_json_fields_complete_in_order():
+    events = []
+    parser = StreamOutputParser(Output, MAPPING, on_field=lambda k, v: events.append((k, v, len(parser.text))))
+    text = '[CONTENT]\n{"name": "a, {b}", "files": ["x.py", "y.py"], "detail": {"k": [1, "}"]}}\n[/CONTENT]'
+
+    stream(parser, text)
+
+    assert [i[:2] for i in events] == [
+        ("name", "a, {b}"),
+        ("files", ["x.py", "y.py"]),
+        ("detail", {"k": [1, "}"]}),
+    ]
+    assert events[0][2] < text.index('"files"') + 3  # reported before the rest arrives
+    assert parser.missing == []
+
+
+def test_json_invalid_field_aborts_stream():
+    parser = StreamOutputParser(Output, MAPPING)
+    with pytest.raises(StreamAborted):
+        stream(parser, '[CONTENT]\n{"name": "a", "files": "not a list", "detail": {}}\n[/CONTENT]')
+
+    assert parser.aborted
+    assert list(parser.fields) == ["name"]
+    assert "files" in parser.invalid
+    assert parser.missing == ["files", "detail"]
+
+    parser.reset()
+    stream(parser, '[CONTENT]\n{"files": ["x.py"], "detail": {}}\n[/CONTENT]')
+    assert parser.fields == {"name": "a", "files": ["x.py"], "detail": {}}
+    assert not parser.invalid
+
+
+def test_json_undecodable_field_is_left_to_close():
+    parser = StreamOutputParser(Output, MAPPING)
+    content = '[CONTENT]\n{"name": "a\nb", "files": []}\n[/CONTENT]'  # unescaped newline
+
+    parser.close(content)
+
+    assert parser.fields == {"files": []}
+    assert parser.missing == ["name", "detail"]
+    assert parser.contents == [content]
+
+
+def test_markdown_sections():
+    events = []
+    parser = StreamOutputParser(Output, MAPPING, schema="markdown", on_field=lambda k, v: events.append(k))
+    text = '[CONTENT]\n## name\nsnake\n\n## files\n["main.py", "game.py"]\n\n## detail\n{}\n[/CONTENT]'
+
+    stream(parser, text[: text.index("## detail")])
+    assert events == ["name"]  # a section is complete when the next one starts
+    stream(parser, text[text.index("## detail") : text.index("## detail") + 3])
+    assert events == ["name", "files"]
+    assert parser.fields["files"] == ["main.py", "game.py"]
+
+    parser.close(text)
+    assert parser.missing == ["detail"]  # markdown gives a str, not a dict
+    assert "detail" in parser.invalid
+
+
+def test_close_without_stream():
+    parser = StreamOutputParser(Output, MAPPING, schema="markdown", required_keys=["name"])
+
+    parser.close("[CONTENT]\n## Name:\nsnake\n")
+
+    assert parser.fields == {"name": "snake"}
+    assert parser.missing == []
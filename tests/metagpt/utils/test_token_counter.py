@@ -5,9 +5,19 @@
 @Author  : alexanderwu
 @File    : test_token_counter.py
 """
+import time
+import uuid
+
 import pytest
+import tiktoken
 
-from metagpt.utils.token_counter import count_input_tokens, count_output_tokens
+from metagpt.logs import logger
+from metagpt.utils.token_counter import (
+    count_input_tokens,
+    count_output_tokens,
+    count_output_tokens_batch,
+    get_encoding,
+)
 
 
 def test_count_message_tokens():
@@ -69,5 +79,44 @@ def test_count_string_tokens_gpt_4():
     assert count_output_tokens(string, model="gpt-4-0314") == 4
 
 
+def test_count_string_tokens_batch():
+    strings = ["Hello, world!", "", "Hello, world!", uuid.uuid4().hex]
+    assert count_output_tokens_batch(strings, model="gpt-4-0314") == [
+        count_output_tokens(i, model="gpt-4-0314") for i in strings
+    ]
+
+
+def _count_input_tokens_uncached(messages, model):
+    """The token counting before encoders and contents were cached, as the baseline of the benchmark."""
+    encoding = tiktoken.encoding_for_model(model)
+    num_tokens = 0
+    for message in messages:
+        num_tokens += 3
+        for value in message.values():
+            num_tokens += len(encoding.encode(value))
+    return num_tokens + 3
+
+
+def test_count_message_tokens_benchmark(mocker):
+    """A growing conversation is re-counted on every request, only the new tail should be encoded."""
+    model = "gpt-4-turbo"
+    conversation = [
+        {"role": "user" if i % 2 else "assistant", "content": f"{uuid.uuid4().hex} " * 200} for i in range(50)
+    ]
+
+    start = time.perf_counter()
+    expected = [_count_input_tokens_uncached(conversation[: i + 1], model) for i in range(len(conversation))]
+    uncached = time.perf_counter() - start
+
+    encode = mocker.spy(get_encoding(model), "encode")
+    start = time.perf_counter()
+    actual = [count_input_tokens(conversation[: i + 1], model) for i in range(len(conversation))]
+    cached = time.perf_counter() - start
+
+    logger.info(f"count tokens of a growing conversation: uncached {uncached:.3f}s, cached {cached:.3f}s")
+    assert actual == expected
+    assert encode.call_count <= len(conversation) + 2  # each content once, plus the two roles if not seen before
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-s"])
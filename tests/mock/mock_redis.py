@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+
+class MockRedis:
+    """An in-memory stand-in for `redis.asyncio.Redis`, recording the number of round trips."""
+
+    def __init__(self, **kwargs):
+        self.data: dict = {}
+        self.expiry: dict = {}
+        self.round_trips = 0
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.round_trips += 1
+        self._set(key, value, ex)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return MockPipeline(self)
+
+    async def close(self, close_connection_pool=None):
+        pass
+
+    def _set(self, key, value, ex=None):
+        self.data[key] = value.encode("utf-8") if isinstance(value, str) else value
+        self._expire(key, ex)
+
+    def _expire(self, key, ex):
+        if ex:
+            self.expiry[key] = ex.total_seconds() if isinstance(ex, timedelta) else ex
+
+
+class MockPipeline:
+    def __init__(self, client: MockRedis):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return command
+
+    async def execute(self):
+        self.client.round_trips += 1
+        results = [getattr(self, f"_{name}")(*args, **kwargs) for name, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+    def _set(self, key, value, ex=None):
+        self.client._set(key, value, ex)
+        return True
+
+    def _delete(self, key):
+        return int(self.client.data.pop(key, None) is not None)
+
+    def _rpush(self, key, *values):
+        items = self.client.data.setdefault(key, [])
+        items.extend(i.encode("utf-8") for i in values)
+        return len(items)
+
+    def _expire(self, key, ex):
+        self.client._expire(key, ex)
+        return True
+
+    def _lrange(self, key, start, end):
+        items = self.client.data.get(key, [])
+        return items[start:] if end == -1 else items[start : end + 1]
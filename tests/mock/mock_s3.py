@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+
+
+class MockBody:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+        self.url = "https://mock"
+
+    async def read(self, size: int = -1) -> bytes:
+        end = len(self.data) if size < 0 else self.offset + size
+        data = self.data[self.offset : end]
+        self.offset += len(data)
+        return data
+
+    def close(self):
+        pass
+
+
+class MockS3Client:
+    """An in-memory stand-in for the aioboto3 S3 client, recording the calls and the peak number of concurrent part
+    transfers."""
+
+    def __init__(self):
+        self.objects: dict[tuple[str, str], tuple[bytes, str]] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.calls = []
+        self.running = self.peak = 0
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.closed = True
+
+    async def put_object(self, Body, Bucket, Key):
+        self.calls.append(("put_object", Key))
+        self.objects[(Bucket, Key)] = (Body, hashlib.md5(Body).hexdigest())
+
+    async def head_object(self, Bucket, Key):
+        self.calls.append(("head_object", Key))
+        if (Bucket, Key) not in self.objects:
+            raise KeyError(Key)
+        data, etag = self.objects[(Bucket, Key)]
+        return {"ContentLength": len(data), "ETag": f'"{etag}"'}
+
+    async def get_object(self, Bucket, Key, Range=None, IfMatch=None):
+        self.calls.append(("get_object", Key, Range))
+        data, etag = self.objects[(Bucket, Key)]
+        assert IfMatch in (None, f'"{etag}"')
+        if Range:
+            start, end = map(int, Range.removeprefix("bytes=").split("-"))
+            await self._transfer()
+            data = data[start : end + 1]
+        return {"Body": MockBody(data), "ContentLength": len(data), "ETag": f'"{etag}"'}
+
+    async def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        keys = sorted(k for b, k in self.objects if b == Bucket and k.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start : start + 2]
+        rsp = {"Contents": [{"Key": k, "ETag": f'"{self.objects[(Bucket, k)][1]}"'} for k in page]}
+        if start + 2 < len(keys):
+            rsp.update(IsTruncated=True, NextContinuationToken=str(start + 2))
+        return rsp
+
+    async def create_multipart_upload(self, Bucket, Key):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    async def upload_part(self, Body, Bucket, Key, PartNumber, UploadId):
+        self.calls.append(("upload_part", Key, PartNumber))
+        await self._transfer()
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f'"{hashlib.md5(Body).hexdigest()}"'}
+
+    async def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        uploaded = self.uploads.pop(UploadId)
+        parts = [uploaded[i["PartNumber"]] for i in MultipartUpload["Parts"]]
+        digest = hashlib.md5(b"".join(hashlib.md5(i).digest() for i in parts)).hexdigest()
+        self.objects[(Bucket, Key)] = (b"".join(parts), f"{digest}-{len(parts)}")
+
+    async def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+
+    async def _transfer(self):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1